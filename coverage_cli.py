@@ -0,0 +1,164 @@
+"""
+Pokrycie kolorem (np. procent terenów zielonych) dla wielu obrazów – bez GUI.
+
+Przykłady:
+    python coverage_cli.py kafle/ -o wynik.csv
+    python coverage_cli.py "kafle/*.jpg" --h-min 70 --h-max 160 --s-min 0.2 --v-min 0.2 --format json
+Progi mają to samo znaczenie co w panelu „Analiza koloru” aplikacji.
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from grafix.analysis import GREEN_BOUNDS, HSVTable, normalize_bounds
+from grafix.io.image_file import is_image_path, read_image
+
+FIELDS = ("path", "width", "height", "pixels", "covered", "percent", "error")
+
+
+def collect_paths(inputs):
+    """Pliki z listy argumentów: katalogi (obrazy PPM/JPEG w środku), wzorce glob, pliki."""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            found = [
+                os.path.join(item, name)
+                for name in sorted(os.listdir(item))
+                if is_image_path(name)
+            ]
+        elif any(ch in item for ch in "*?["):
+            found = sorted(
+                p
+                for p in glob.glob(item, recursive=True)
+                if os.path.isfile(p) and is_image_path(p)
+            )
+        else:
+            found = [item]
+        paths.extend(found)
+    # bez duplikatów, w kolejności podania
+    return list(dict.fromkeys(paths))
+
+
+def coverage_of_file(task):
+    """Wynik dla jednego pliku (uruchamiane w procesie roboczym)."""
+    path, bounds = task
+    row = dict.fromkeys(FIELDS, "")
+    row["path"] = path
+    try:
+        w, h, pixels = read_image(path)
+        table = HSVTable(pixels)  # bez pamięci planów – każdy plik raz
+        covered = table.count(*bounds) if pixels else 0
+        row.update(
+            width=w,
+            height=h,
+            pixels=len(pixels),
+            covered=covered,
+            percent=round(100.0 * covered / len(pixels), 4) if pixels else 0.0,
+        )
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+    return row
+
+
+def iter_results(paths, bounds, workers=None):
+    """Wyniki w kolejności plików, oddawane na bieżąco (pula procesów dla workers != 1)."""
+    tasks = [(p, bounds) for p in paths]
+    if workers == 1 or len(tasks) <= 1:
+        yield from map(coverage_of_file, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(coverage_of_file, tasks, chunksize=4)
+
+
+class _CsvWriter:
+    def __init__(self, out):
+        self.out = out
+        self.writer = csv.DictWriter(out, fieldnames=FIELDS)
+        self.writer.writeheader()
+
+    def write(self, row):
+        self.writer.writerow(row)
+        self.out.flush()
+
+    def close(self):
+        pass
+
+
+class _JsonWriter:
+    """Tablica JSON zapisywana strumieniowo – element po elemencie."""
+
+    def __init__(self, out):
+        self.out = out
+        self.first = True
+        out.write("[")
+
+    def write(self, row):
+        self.out.write("\n  " if self.first else ",\n  ")
+        self.out.write(json.dumps(row, ensure_ascii=False))
+        self.out.flush()
+        self.first = False
+
+    def close(self):
+        self.out.write("\n]\n")
+
+
+WRITERS = {"csv": _CsvWriter, "json": _JsonWriter}
+
+
+def build_parser():
+    h_min, h_max, s_min, v_min = GREEN_BOUNDS
+    p = argparse.ArgumentParser(
+        description="Procent pikseli w zakresie HSV dla wielu obrazów PPM/JPEG."
+    )
+    p.add_argument("inputs", nargs="+", help="pliki, katalogi lub wzorce glob")
+    p.add_argument("--h-min", type=float, default=h_min, help="początek zakresu H [°]")
+    p.add_argument("--h-max", type=float, default=h_max, help="koniec zakresu H [°]")
+    p.add_argument("--s-min", type=float, default=s_min, help="minimalne nasycenie (0..1)")
+    p.add_argument("--v-min", type=float, default=v_min, help="minimalna jasność (0..1)")
+    p.add_argument("--format", choices=sorted(WRITERS), default="csv")
+    p.add_argument("-o", "--output", help="plik wynikowy (domyślnie stdout)")
+    p.add_argument(
+        "-j", "--workers", type=int, default=None, help="liczba procesów (domyślnie: CPU)"
+    )
+    return p
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    bounds = normalize_bounds(args.h_min, args.h_max, args.s_min, args.v_min)
+    paths = collect_paths(args.inputs)
+    if not paths:
+        print("Brak plików do przetworzenia.", file=sys.stderr)
+        return 2
+
+    out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    writer = WRITERS[args.format](out)
+    errors = 0
+    total_px = total_cov = 0
+    try:
+        for row in iter_results(paths, bounds, args.workers):
+            writer.write(row)
+            if row["error"]:
+                errors += 1
+            else:
+                total_px += row["pixels"]
+                total_cov += row["covered"]
+        writer.close()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    overall = 100.0 * total_cov / total_px if total_px else 0.0
+    print(
+        f"Plików: {len(paths)}, błędów: {errors}, pokrycie łączne: {overall:.2f}%",
+        file=sys.stderr,
+    )
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+python -m grafix – potok operacji na obrazie bez GUI.
+
+Przykłady:
+    python -m grafix in.ppm out.jpg -s "levels: in_min=20; in_max=230" -s gaussian -s threshold_otsu
+    python -m grafix -p potok.json
+    python -m grafix --list
+"""
+import argparse
+import sys
+import time
+
+from .pipeline import available_steps, load_pipeline, parse_step, run_pipeline, steps_from_spec
+
+
+def build_parser():
+    p = argparse.ArgumentParser(
+        prog="python -m grafix",
+        description="Łańcuch operacji (load → … → save) na obrazie PPM/JPEG bez GUI.",
+    )
+    p.add_argument("input", nargs="?", help="obraz wejściowy (PPM/JPEG)")
+    p.add_argument("output", nargs="?", help="obraz wynikowy (.ppm/.jpg)")
+    p.add_argument("-p", "--pipeline", help="plik potoku JSON/YAML")
+    p.add_argument(
+        "-s",
+        "--step",
+        action="append",
+        default=[],
+        help='krok „rodzaj” albo „rodzaj: k=v; k2=v2” (można powtarzać)',
+    )
+    p.add_argument("-q", "--quality", type=int, default=None, help="jakość JPEG (1–100)")
+    p.add_argument("--list", action="store_true", help="lista dostępnych operacji")
+    return p
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for kind, label in available_steps():
+            print(f"{kind:28s} {label}")
+        return 0
+
+    try:
+        spec = load_pipeline(args.pipeline) if args.pipeline else {}
+        # kroki z pliku, potem z linii poleceń
+        steps = steps_from_spec(spec) + [parse_step(s) for s in args.step]
+    except Exception as e:
+        print(f"Błąd potoku: {e}", file=sys.stderr)
+        return 2
+
+    src = args.input or spec.get("input")
+    dst = args.output or spec.get("output")
+    if not src or not dst:
+        parser.error("podaj obraz wejściowy i wynikowy (argumenty albo input/output w pliku)")
+    quality = args.quality if args.quality is not None else spec.get("quality", 90)
+
+    t0 = time.perf_counter()
+    try:
+        w, h = run_pipeline(src, dst, steps, quality=quality)
+    except Exception as e:
+        print(f"Błąd: {e}", file=sys.stderr)
+        return 1
+    dt = time.perf_counter() - t0
+    print(f"{src} → {dst}: {w}×{h}, kroków: {len(steps)}, {dt:.2f} s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,371 @@
+# grafix/adjustments.py
+"""
+Nieniszczący stos korekt obrazu.
+
+Obraz trzyma oryginalne piksele oraz uporządkowaną listę operacji (levels,
+jasność, filtry, progi, morfologia …). Wynik liczony jest leniwie, a wyjście
+każdego etapu jest zapamiętywane – zmiana parametru jednej operacji przelicza
+obraz dopiero od tego etapu. Kolejne operacje punktowe (LUT) są składane
+w jedną tablicę i stosowane w jednym przebiegu.
+"""
+import ast
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .image_ops import (
+    Color,
+    add_lut,
+    apply_point_ops,
+    brightness_lut,
+    div_lut,
+    levels_lut,
+    mul_lut,
+    to_grayscale_avg,
+    to_grayscale_luma,
+)
+from .filters import (
+    filter_box_blur,
+    filter_custom,
+    filter_gaussian,
+    filter_median,
+    filter_sharpen,
+    filter_sobel,
+)
+from .histogram import (
+    histogram_clahe,
+    histogram_equalize,
+    histogram_equalize_color,
+    histogram_stretch,
+)
+from .thresholds import (
+    threshold_adaptive,
+    threshold_entropy,
+    threshold_manual,
+    threshold_mean_iterative,
+    threshold_multi_otsu,
+    threshold_otsu,
+    threshold_percent_black,
+)
+from .morphology import apply_morphology
+
+
+@dataclass
+class AdjustmentSpec:
+    """
+    Opis rodzaju operacji.
+    - apply(pixels, w, h, **params) → nowe piksele,
+    - lut(**params) → LUT (tylko operacje punktowe na kanałach – można je składać),
+    - radius: zasięg sąsiedztwa (0 = punktowa, None = globalna, zależy od całego obrazu),
+    - label: nazwa wyświetlana w UI.
+    """
+
+    label: str
+    apply: Optional[Callable] = None
+    lut: Optional[Callable] = None
+    radius: Optional[Callable] = None  # radius(**params) → int albo None
+
+    def neighbourhood(self, params) -> Optional[int]:
+        if self.lut is not None:
+            return 0
+        if self.radius is None:
+            return None
+        return self.radius(**params)
+
+    def run(self, pixels, w, h, params):
+        if self.lut is not None:
+            return apply_point_ops(pixels, [self.lut(**params)])
+        return self.apply(pixels, w, h, **params)
+
+
+ADJUSTMENTS: Dict[str, AdjustmentSpec] = {}
+
+
+def register_adjustment(kind, label, apply=None, lut=None, radius=None):
+    if apply is None and lut is None:
+        raise ValueError("Operacja musi mieć apply albo lut.")
+    ADJUSTMENTS[kind] = AdjustmentSpec(label, apply=apply, lut=lut, radius=radius)
+
+
+def _kernel_radius(kernel):
+    return max(len(kernel), max(len(row) for row in kernel)) // 2
+
+
+def _morph_radius(mode, se):
+    r = _kernel_radius(se)
+    return 2 * r if mode in ("open", "close") else r
+
+
+# --- operacje punktowe (LUT) ---
+register_adjustment("levels", "Levels", lut=levels_lut)
+register_adjustment("add", "Dodawanie stałej", lut=add_lut)
+register_adjustment("mul", "Mnożenie stałej", lut=mul_lut)
+register_adjustment("div", "Dzielenie stałej", lut=div_lut)
+register_adjustment("brightness", "Jasność", lut=brightness_lut)
+
+# --- operacje punktowe (na całym pikselu) ---
+register_adjustment(
+    "gray_avg",
+    "Skala szarości (średnia)",
+    apply=lambda px, w, h: to_grayscale_avg(px),
+    radius=lambda: 0,
+)
+register_adjustment(
+    "gray_luma",
+    "Skala szarości (luma)",
+    apply=lambda px, w, h: to_grayscale_luma(px),
+    radius=lambda: 0,
+)
+register_adjustment(
+    "threshold_manual",
+    "Binaryzacja ręczna",
+    apply=lambda px, w, h, T: threshold_manual(px, T),
+    radius=lambda T: 0,
+)
+register_adjustment(
+    "threshold_adaptive",
+    "Binaryzacja lokalna",
+    apply=threshold_adaptive,
+    radius=lambda method="sauvola", window=15, k=None: int(window) // 2,
+)
+
+# --- filtry (sąsiedztwo) ---
+register_adjustment(
+    "box_blur", "Filtr wygładzający", apply=filter_box_blur, radius=lambda size=3: size // 2
+)
+register_adjustment(
+    "median", "Filtr medianowy", apply=filter_median, radius=lambda size=3: size // 2
+)
+register_adjustment("sobel", "Filtr Sobela", apply=filter_sobel, radius=lambda: 1)
+register_adjustment("sharpen", "Filtr wyostrzający", apply=filter_sharpen, radius=lambda: 1)
+register_adjustment("gaussian", "Filtr Gaussa", apply=filter_gaussian, radius=lambda: 2)
+register_adjustment(
+    "custom", "Maska własna", apply=filter_custom, radius=_kernel_radius
+)
+register_adjustment(
+    "morphology", "Morfologia", apply=apply_morphology, radius=_morph_radius
+)
+
+# --- operacje globalne (zależą od histogramu całego obrazu) ---
+register_adjustment(
+    "hist_stretch",
+    "Histogram – rozszerzenie",
+    apply=lambda px, w, h: histogram_stretch(px),
+)
+register_adjustment(
+    "hist_equalize",
+    "Histogram – equalizacja",
+    apply=lambda px, w, h: histogram_equalize(px),
+)
+register_adjustment(
+    "hist_equalize_color",
+    "Histogram – equalizacja (kolor)",
+    apply=lambda px, w, h, space="ycbcr": histogram_equalize_color(px, space),
+)
+register_adjustment("clahe", "CLAHE", apply=histogram_clahe)
+register_adjustment(
+    "threshold_percent_black",
+    "Binaryzacja Percent Black",
+    apply=lambda px, w, h, percent_black: threshold_percent_black(px, percent_black),
+)
+register_adjustment(
+    "threshold_mean_iterative",
+    "Binaryzacja Mean Iterative",
+    apply=lambda px, w, h: threshold_mean_iterative(px),
+)
+register_adjustment(
+    "threshold_entropy",
+    "Binaryzacja Entropy",
+    apply=lambda px, w, h: threshold_entropy(px),
+)
+register_adjustment(
+    "threshold_otsu",
+    "Binaryzacja Otsu",
+    apply=lambda px, w, h: threshold_otsu(px),
+)
+register_adjustment(
+    "threshold_multi_otsu",
+    "Wielopoziomowe Otsu",
+    apply=lambda px, w, h, classes=3: threshold_multi_otsu(px, classes),
+)
+
+
+@dataclass
+class Adjustment:
+    kind: str
+    params: dict = field(default_factory=dict)
+
+    @property
+    def spec(self) -> AdjustmentSpec:
+        try:
+            return ADJUSTMENTS[self.kind]
+        except KeyError:
+            raise ValueError(f"Nieznana operacja: {self.kind}") from None
+
+    def label(self) -> str:
+        txt = self.params_text()
+        return f"{self.spec.label} ({txt})" if txt else self.spec.label
+
+    def params_text(self) -> str:
+        return "; ".join(f"{k}={v!r}" for k, v in self.params.items())
+
+    def to_dict(self):
+        return {"kind": self.kind, "params": dict(self.params)}
+
+    @staticmethod
+    def from_dict(d: dict) -> "Adjustment":
+        return Adjustment(d["kind"], dict(d.get("params", {})))
+
+
+def parse_params_text(txt: str) -> dict:
+    """Parsuje tekst „k=v; k2=v2” (wartości jako literały Pythona)."""
+    params = {}
+    for part in txt.split(";"):
+        part = part.strip()
+        if not part:
+            continue
+        if "=" not in part:
+            raise ValueError(f"Oczekiwano „nazwa=wartość”: {part}")
+        key, val = part.split("=", 1)
+        params[key.strip()] = ast.literal_eval(val.strip())
+    return params
+
+
+class AdjustmentStack:
+    """
+    Oryginał + lista operacji z pamięcią wyników pośrednich.
+    _cache[i] – wynik po etapie i (None = nieaktualny / nieprzechowywany).
+    """
+
+    def __init__(self, w: int, h: int, base: List[Color]):
+        self.w = w
+        self.h = h
+        self.base = base
+        self.ops: List[Adjustment] = []
+        self._cache: List[Optional[List[Color]]] = []
+
+    def __len__(self):
+        return len(self.ops)
+
+    # ---------- edycja ----------
+    PROBE_SIZE = 16  # bok wycinka, na którym sprawdzane są parametry etapu
+
+    def _validate(self, spec: AdjustmentSpec, params: dict):
+        """
+        Błędne parametry zgłaszamy od razu przy dodaniu/zmianie etapu, a nie
+        dopiero przy ewaluacji (która dla obrazu poza ekranem może nie nastąpić):
+        LUT jest tania, pozostałe operacje uruchamiamy na małym wycinku oryginału.
+        """
+        if spec.lut is not None:
+            spec.lut(**params)
+            return
+        spec.neighbourhood(params)
+        pw, ph = min(self.w, self.PROBE_SIZE), min(self.h, self.PROBE_SIZE)
+        if pw > 0 and ph > 0:
+            spec.run(_crop(self.base, self.w, 0, 0, pw, ph), pw, ph, params)
+
+    def push(self, kind: str, **params) -> int:
+        op = Adjustment(kind, params)
+        self._validate(op.spec, params)  # spec – walidacja rodzaju
+        self.ops.append(op)
+        self._cache.append(None)
+        return len(self.ops) - 1
+
+    def set_params(self, index: int, **params):
+        self._validate(self.ops[index].spec, params)
+        self.ops[index].params = params
+        self._invalidate_from(index)
+
+    def remove(self, index: int):
+        del self.ops[index]
+        del self._cache[index]
+        self._invalidate_from(index)
+
+    def clear(self):
+        self.ops.clear()
+        self._cache.clear()
+
+    def _invalidate_from(self, index: int):
+        for i in range(index, len(self._cache)):
+            self._cache[i] = None
+
+    # ---------- serializacja ----------
+    def to_list(self):
+        return [op.to_dict() for op in self.ops]
+
+    # ---------- ewaluacja ----------
+    def is_clean(self) -> bool:
+        return not self.ops or self._cache[-1] is not None
+
+    def _last_valid(self) -> Tuple[int, List[Color]]:
+        for i in range(len(self.ops) - 1, -1, -1):
+            if self._cache[i] is not None:
+                return i, self._cache[i]
+        return -1, self.base
+
+    def _run(self, pixels, w, h, start, store):
+        """Wykonuje etapy od `start`; sąsiednie LUT-y składa w jeden przebieg."""
+        ops = self.ops
+        i = start
+        while i < len(ops):
+            spec = ops[i].spec
+            if spec.lut is not None:
+                luts = []
+                j = i
+                while j < len(ops) and ops[j].spec.lut is not None:
+                    luts.append(ops[j].spec.lut(**ops[j].params))
+                    j += 1
+                pixels = apply_point_ops(pixels, luts)
+                i = j
+            else:
+                pixels = spec.run(pixels, w, h, ops[i].params)
+                i += 1
+            if store:
+                self._cache[i - 1] = pixels
+        return pixels
+
+    def evaluate(self) -> List[Color]:
+        """Pełny wynik – liczony tylko od pierwszego nieaktualnego etapu."""
+        last, pixels = self._last_valid()
+        if last == len(self.ops) - 1:
+            return pixels
+        return self._run(pixels, self.w, self.h, last + 1, store=True)
+
+    def evaluate_region(self, x0: int, y0: int, x1: int, y1: int):
+        """
+        Wynik tylko dla prostokąta [x0,x1)×[y0,y1) (np. widoczny fragment).
+        Operacje lokalne liczone są na wycinku powiększonym o sumę promieni;
+        gdy w nieaktualnej części stosu jest operacja globalna – pełna ewaluacja.
+        Zwraca (w, h, piksele wycinka); nic nie zapisuje w pamięci etapów.
+        """
+        x0, y0 = max(0, x0), max(0, y0)
+        x1, y1 = min(self.w, x1), min(self.h, y1)
+        if x1 <= x0 or y1 <= y0:
+            return 0, 0, []
+
+        last, pixels = self._last_valid()
+        margin = 0
+        for op in self.ops[last + 1 :]:
+            r = op.spec.neighbourhood(op.params)
+            if r is None:
+                pixels = self.evaluate()
+                last, margin = len(self.ops) - 1, 0
+                break
+            margin += r
+
+        # wycinek z marginesem (na brzegach obrazu margines się nie mieści –
+        # tam filtry i tak powielają krawędź, więc wynik jest identyczny)
+        cx0, cy0 = max(0, x0 - margin), max(0, y0 - margin)
+        cx1, cy1 = min(self.w, x1 + margin), min(self.h, y1 + margin)
+        cw, ch = cx1 - cx0, cy1 - cy0
+        crop = _crop(pixels, self.w, cx0, cy0, cx1, cy1)
+        crop = self._run(crop, cw, ch, last + 1, store=False)
+        rw, rh = x1 - x0, y1 - y0
+        return rw, rh, _crop(crop, cw, x0 - cx0, y0 - cy0, x0 - cx0 + rw, y0 - cy0 + rh)
+
+
+def _crop(pixels, w, x0, y0, x1, y1):
+    out = []
+    for y in range(y0, y1):
+        base = y * w
+        out.extend(pixels[base + x0 : base + x1])
+    return out
@@ -0,0 +1,134 @@
+# grafix/analysis.py
+"""
+Analiza koloru obrazu – jaki procent pikseli mieści się w zakresie HSV
+(np. tereny zielone na zdjęciach lotniczych).
+
+HSV liczone jest raz na obraz, dla każdego unikalnego koloru (zdjęcia mają
+zwykle wielokrotnie mniej kolorów niż pikseli), i zapamiętywane razem z
+liczbą wystąpień. Zmiana progów H/S/V to już tylko przejście po tablicy
+kolorów – bez ponownej konwersji pikseli.
+"""
+import colorsys
+from collections import Counter
+from itertools import compress
+
+from .planes import cached_plane, register_plane
+
+# indeks koloru w kostce 256³: (r << 16) | (g << 8) | b
+_KEY_R = [v << 16 for v in range(256)]
+_KEY_G = [v << 8 for v in range(256)]
+
+# domyślny zakres – zieleń
+GREEN_BOUNDS = (70.0, 160.0, 0.2, 0.2)  # h_min, h_max [°], s_min, v_min
+
+
+def normalize_bounds(h_min, h_max, s_min, v_min):
+    """Zakres H obcięty do [0, 360] i uporządkowany (min <= max)."""
+    h_min = max(0.0, min(360.0, float(h_min)))
+    h_max = max(0.0, min(360.0, float(h_max)))
+    if h_max < h_min:
+        h_min, h_max = h_max, h_min
+    return h_min, h_max, float(s_min), float(v_min)
+
+
+class HSVTable:
+    """
+    Unikalne kolory obrazu: liczba wystąpień oraz H (stopnie), S, V (0..1)
+    – te same wartości co colorsys.rgb_to_hsv dla pojedynczego piksela.
+    """
+
+    def __init__(self, pixels):
+        self.total = len(pixels)
+        counts = Counter(pixels)
+        self.colors = list(counts)
+        self.counts = list(counts.values())
+        hsv = [
+            colorsys.rgb_to_hsv(r / 255.0, g / 255.0, b / 255.0)
+            for r, g, b in self.colors
+        ]
+        self.h = [h * 360.0 for h, _s, _v in hsv]
+        self.s = [s for _h, s, _v in hsv]
+        self.v = [v for _h, _s, v in hsv]
+        self._sel_bounds = None
+        self._sel = None
+        self._cube = None  # kostka 256³ dla wyboru _cube_sel
+        self._cube_sel = None
+
+    def selection(self, h_min, h_max, s_min, v_min):
+        """Dla każdego unikalnego koloru: czy spełnia warunki (pamięć ostatnich progów)."""
+        bounds = (h_min, h_max, s_min, v_min)
+        if bounds != self._sel_bounds:
+            self._sel = [
+                h_min <= h <= h_max and s >= s_min and v >= v_min
+                for h, s, v in zip(self.h, self.s, self.v)
+            ]
+            self._sel_bounds = bounds
+        return self._sel
+
+    def count(self, h_min, h_max, s_min, v_min):
+        """Liczba pikseli spełniających warunki."""
+        return sum(compress(self.counts, self.selection(h_min, h_max, s_min, v_min)))
+
+    def cube(self, h_min, h_max, s_min, v_min):
+        """
+        Kostka 256³ (bajt na kolor RGB, 1 = w zakresie) – szybsza klasyfikacja
+        pikseli niż słownik z kluczami-krotkami. Budowana raz na obraz; przy
+        zmianie progów przestawiane są tylko kolory, których wybór się zmienił.
+        Kostka (16 MB) żyje tak długo jak tablica, czyli wpis w pamięci planów
+        (PlaneCache, size=4 → do ~64 MB); usunięcie wpisu zwalnia ją razem z nim.
+        """
+        sel = self.selection(h_min, h_max, s_min, v_min)
+        if self._cube is None:
+            cube = bytearray(1 << 24)
+            for r, g, b in compress(self.colors, sel):
+                cube[(r << 16) | (g << 8) | b] = 1
+            self._cube = cube
+        elif sel is not self._cube_sel:
+            cube = self._cube
+            for (r, g, b), now, old in zip(self.colors, sel, self._cube_sel):
+                if now != old:
+                    cube[(r << 16) | (g << 8) | b] = now
+        self._cube_sel = sel
+        return self._cube
+
+
+register_plane("hsv", HSVTable)
+
+
+def hsv_table(pixels):
+    """Tablica HSV obrazu – liczona raz na listę pikseli (pamięć planów)."""
+    return cached_plane(pixels, "hsv")
+
+
+def color_coverage(pixels, h_min, h_max, s_min, v_min):
+    """
+    Pokrycie kolorem: (liczba pikseli w zakresie, liczba wszystkich, procent).
+    Warunek jak w GUI: h_min <= H <= h_max, S >= s_min, V >= v_min (H w stopniach).
+    """
+    bounds = normalize_bounds(h_min, h_max, s_min, v_min)
+    if not pixels:
+        return 0, 0, 0.0
+    table = hsv_table(pixels)
+    count = table.count(*bounds)
+    return count, table.total, 100.0 * count / table.total
+
+
+def coverage_overlay_region(pixels, w, bounds, x0, y0, x1, y1, color=(255, 0, 255)):
+    """
+    Piksele nakładki dla prostokąta [x0,x1)×[y0,y1) obrazu o szerokości w
+    (np. widoczny fragment): w zakresie HSV – `color`, poza nim – oryginał
+    przyciemniony o połowę. Bez maski całego obrazu.
+    """
+    cube = hsv_table(pixels).cube(*normalize_bounds(*bounds))
+    R, G = _KEY_R, _KEY_G
+    dim = [v // 2 for v in range(256)]
+    out = []
+    for y in range(y0, y1):
+        base = y * w
+        out.extend(
+            [
+                color if cube[R[r] + G[g] + b] else (dim[r], dim[g], dim[b])
+                for r, g, b in pixels[base + x0 : base + x1]
+            ]
+        )
+    return out
@@ -1,18 +1,17 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import math
-import colorsys
 
 from .constants import APP_TITLE, APP_SIZE, COL_PREV
+from .profiling import Profiler
 from .utils import parts
 from .selection import Selection
-from .shapes import Line, Rect, Circle, shape_from_dict
+from .shapes import Line, Rect, Circle, BezierCurve, shape_from_dict
 from .io import save_scene, load_scene, scene_to_dict
 from .render import CanvasSurface
 
 from tkinter.filedialog import asksaveasfilename, askopenfilename
-from .io.jpeg_io import read_jpeg, write_jpeg
-from .image_ops import linear_color_scale
+from .io.jpeg_io import write_jpeg
 
 
 from .rgbcube.cube_points import RGBCubePointsWindow
@@ -20,30 +19,11 @@ from .rgbcube.cube_sliced import RGBCubeSliceWindow
 from .hsvcone.hsv_cone_window import HSVConeWindow
 from .hsvcone.cone_points import HSVConePointsWindow
 
-from .image_ops import linear_color_scale
-from .image_ops import (
-    add_constant,
-    mul_constant,
-    div_constant,
-    change_brightness,
-    to_grayscale_avg,
-    to_grayscale_luma,
-)
-from .filters import (
-    filter_box_blur,
-    filter_median,
-    filter_sobel,
-    filter_sharpen,
-    filter_gaussian,
-    filter_custom,
-)
-from .histogram import compute_histogram, histogram_stretch, histogram_equalize
-from .thresholds import (
-    threshold_manual,
-    threshold_percent_black,
-    threshold_mean_iterative,
-    threshold_entropy,
-)
+from .adjustments import parse_params_text
+from .analysis import color_coverage, coverage_overlay_region, normalize_bounds
+from .histogram_window import HistogramWindow
+from .morphology import MORPH_MODES
+from .thresholds import ADAPTIVE_DEFAULT_K, ADAPTIVE_METHODS
 from .bezier.editor import BezierEditorWindow
 
 
@@ -95,11 +75,18 @@ class App(tk.Tk):
         self.brightness_var = tk.IntVar(value=0)
 
         # --- (HISTOGRAM / BINARYZACJA) ---
+        self.clahe_tiles_var = tk.IntVar(value=8)  # siatka kafli CLAHE (n×n)
+        self.clahe_clip_var = tk.DoubleVar(value=2.0)  # limit kontrastu CLAHE
         self.thresh_manual_var = tk.IntVar(value=128)
         self.thresh_percent_var = tk.DoubleVar(value=50.0)  # Percent Black (%)
+        self.thresh_classes_var = tk.IntVar(value=3)  # liczba klas (multi-Otsu)
+        self.thresh_adapt_method_var = tk.StringVar(value="sauvola")
+        self.thresh_adapt_window_var = tk.IntVar(value=25)  # okno lokalne (px)
+        self.thresh_adapt_k_var = tk.StringVar(value="")  # puste = domyślne k
 
         # --- Bezier Editor ---
         self.bezier_editor_win = None
+        self.histogram_win = None
         self.polygon_editor_win = None  # okno do zadania 7 (wielokąty)
 
         # --- Analiza koloru / terenów zielonych ---
@@ -112,6 +99,27 @@ class App(tk.Tk):
         self.color_s_min_var = tk.DoubleVar(value=0.2)  # minimalne nasycenie
         self.color_v_min_var = tk.DoubleVar(value=0.2)  # minimalna jasność
         self.green_result_var = tk.StringVar(value="Brak obliczeń.")
+        self.color_live_var = tk.BooleanVar(value=True)  # przeliczaj przy zmianie progów
+        self.color_mask_var = tk.BooleanVar(value=False)  # nakładka maski na obraz
+        self._coverage_photo = None
+        self._coverage_after = None
+        self._coverage_obj = None  # obraz i progi bieżącej nakładki maski
+        self._coverage_bounds = None
+        for var in (
+            self.color_h_min_var,
+            self.color_h_max_var,
+            self.color_s_min_var,
+            self.color_v_min_var,
+        ):
+            var.trace_add("write", self._on_color_bounds_changed)
+
+        # pomiar czasu operacji – metody owijane przed budową UI (przyciski
+        # zapamiętują metody w chwili tworzenia)
+        self.profiler = Profiler()
+        self._load_job = None  # wczytywanie obrazu w tle
+        self.perf_status = tk.StringVar(value="")
+        self.perf_memory_var = tk.BooleanVar(value=False)
+        self._install_profiling()
 
         self._build_ui()
         self._bind_canvas()
@@ -289,6 +297,30 @@ class App(tk.Tk):
             side="left", padx=4
         )
 
+        # --- Stos korekt (nieniszczący) ---
+        adj = ttk.LabelFrame(panel1, text="Stos korekt obrazu")
+        adj.grid(row=14, column=0, sticky="ew", pady=(6, 0))
+        adj.columnconfigure(0, weight=1)
+
+        self.adj_list = tk.Listbox(adj, height=5, exportselection=False)
+        self.adj_list.grid(row=0, column=0, sticky="ew", padx=2, pady=2)
+        self.adj_list.bind("<<ListboxSelect>>", self._on_adjustment_selected)
+
+        ttk.Label(adj, text="Parametry (nazwa=wartość; …):").grid(
+            row=1, column=0, sticky="w"
+        )
+        self.adj_params = ttk.Entry(adj)
+        self.adj_params.grid(row=2, column=0, sticky="ew", padx=2)
+
+        arow = ttk.Frame(adj)
+        arow.grid(row=3, column=0, sticky="ew", pady=(2, 2))
+        ttk.Button(
+            arow, text="Zmień parametry", command=self.apply_adjustment_params
+        ).pack(side="left", padx=2)
+        ttk.Button(arow, text="Usuń etap", command=self.remove_adjustment).pack(
+            side="left", padx=2
+        )
+
         # ======================================================================
         # == PANEL 2 (kolumna 2): Zadanie 4b (filtry) + zadanie 5 + 6 (Bézier)
         # ======================================================================
@@ -329,7 +361,7 @@ class App(tk.Tk):
         hist.grid(row=1, column=0, sticky="ew", pady=(8, 0))
         hist.columnconfigure(1, weight=1)
 
-        # Histogram – 3 przyciski
+        # Histogram – przyciski
         hrow = ttk.Frame(hist)
         hrow.grid(row=0, column=0, columnspan=3, sticky="ew", pady=(2, 4))
         ttk.Button(hrow, text="Pokaż", command=self.show_histogram).pack(
@@ -341,10 +373,26 @@ class App(tk.Tk):
         ttk.Button(hrow, text="Equalizacja", command=self.apply_hist_equalize).pack(
             side="left", padx=2
         )
+        ttk.Button(
+            hrow, text="Equalizacja (kolor)", command=self.apply_hist_equalize_color
+        ).pack(side="left", padx=2)
+
+        # CLAHE – equalizacja lokalna w siatce kafli
+        hrow2 = ttk.Frame(hist)
+        hrow2.grid(row=1, column=0, columnspan=3, sticky="ew", pady=(0, 4))
+        ttk.Label(hrow2, text="CLAHE, kafle:").pack(side="left")
+        ttk.Entry(hrow2, textvariable=self.clahe_tiles_var, width=4).pack(
+            side="left", padx=2
+        )
+        ttk.Label(hrow2, text="limit").pack(side="left")
+        ttk.Entry(hrow2, textvariable=self.clahe_clip_var, width=5).pack(
+            side="left", padx=2
+        )
+        ttk.Button(hrow2, text="OK", command=self.apply_hist_clahe).pack(side="left")
 
         # Binaryzacja ręczna
         brow1 = ttk.Frame(hist)
-        brow1.grid(row=1, column=0, columnspan=3, sticky="ew", pady=1)
+        brow1.grid(row=2, column=0, columnspan=3, sticky="ew", pady=1)
         ttk.Label(brow1, text="Próg ręczny:").pack(side="left")
         ttk.Entry(brow1, textvariable=self.thresh_manual_var, width=6).pack(
             side="left", padx=4
@@ -353,9 +401,32 @@ class App(tk.Tk):
             side="left"
         )
 
+        # Binaryzacja lokalna (Bradley / Niblack / Sauvola)
+        brow_ad = ttk.Frame(hist)
+        brow_ad.grid(row=3, column=0, columnspan=3, sticky="ew", pady=1)
+        ttk.Label(brow_ad, text="Lokalny:").pack(side="left")
+        ttk.Combobox(
+            brow_ad,
+            textvariable=self.thresh_adapt_method_var,
+            values=ADAPTIVE_METHODS,
+            state="readonly",
+            width=8,
+        ).pack(side="left", padx=2)
+        ttk.Label(brow_ad, text="okno").pack(side="left")
+        ttk.Entry(brow_ad, textvariable=self.thresh_adapt_window_var, width=4).pack(
+            side="left", padx=2
+        )
+        ttk.Label(brow_ad, text="k").pack(side="left")
+        ttk.Entry(brow_ad, textvariable=self.thresh_adapt_k_var, width=5).pack(
+            side="left", padx=2
+        )
+        ttk.Button(brow_ad, text="OK", command=self.apply_threshold_adaptive).pack(
+            side="left"
+        )
+
         # Percent Black
         brow2 = ttk.Frame(hist)
-        brow2.grid(row=2, column=0, columnspan=3, sticky="ew", pady=1)
+        brow2.grid(row=4, column=0, columnspan=3, sticky="ew", pady=1)
         ttk.Label(brow2, text="% Black:").pack(side="left")
         ttk.Entry(brow2, textvariable=self.thresh_percent_var, width=6).pack(
             side="left", padx=4
@@ -369,13 +440,30 @@ class App(tk.Tk):
             hist,
             text="Mean Iterative",
             command=self.apply_threshold_mean_iterative,
-        ).grid(row=3, column=0, columnspan=3, sticky="ew", pady=(4, 2))
+        ).grid(row=5, column=0, columnspan=3, sticky="ew", pady=(4, 2))
 
         ttk.Button(
             hist,
             text="Entropy",
             command=self.apply_threshold_entropy,
-        ).grid(row=4, column=0, columnspan=3, sticky="ew", pady=(2, 4))
+        ).grid(row=6, column=0, columnspan=3, sticky="ew", pady=2)
+
+        ttk.Button(
+            hist,
+            text="Otsu",
+            command=self.apply_threshold_otsu,
+        ).grid(row=7, column=0, columnspan=3, sticky="ew", pady=2)
+
+        # Wielopoziomowe Otsu
+        brow3 = ttk.Frame(hist)
+        brow3.grid(row=8, column=0, columnspan=3, sticky="ew", pady=(2, 4))
+        ttk.Label(brow3, text="Multi-Otsu, klasy:").pack(side="left")
+        ttk.Spinbox(
+            brow3, from_=2, to=8, width=4, textvariable=self.thresh_classes_var
+        ).pack(side="left", padx=4)
+        ttk.Button(brow3, text="OK", command=self.apply_threshold_multi_otsu).pack(
+            side="left"
+        )
 
         # --- Krzywa Béziera (zadanie 6) ---
         bez = ttk.LabelFrame(panel2, text="Krzywa Béziera (6)")
@@ -401,8 +489,31 @@ class App(tk.Tk):
 
         # --- Status bar ---
         self.status = tk.StringVar(value="Gotowe.")
-        ttk.Label(self, textvariable=self.status, anchor="w", padding=(8, 4)).grid(
-            row=1, column=0, columnspan=3, sticky="ew"
+        bar = ttk.Frame(self)
+        bar.grid(row=1, column=0, columnspan=3, sticky="ew")
+        ttk.Label(bar, textvariable=self.status, anchor="w", padding=(8, 4)).pack(
+            side="left", fill="x", expand=True
+        )
+        # czas ostatniej operacji + zapis śledzenia
+        ttk.Button(bar, text="Zapisz trace", command=self.save_profile_trace).pack(
+            side="right", padx=(4, 8)
+        )
+        ttk.Checkbutton(
+            bar,
+            text="Pamięć",
+            variable=self.perf_memory_var,
+            command=lambda: self.profiler.set_trace_memory(self.perf_memory_var.get()),
+        ).pack(side="right")
+        ttk.Label(bar, textvariable=self.perf_status, anchor="e", padding=(8, 4)).pack(
+            side="right"
+        )
+        # postęp wczytywania w tle (widoczny tylko w trakcie)
+        self.load_progress_var = tk.DoubleVar(value=0.0)
+        self.load_bar = ttk.Progressbar(
+            bar, variable=self.load_progress_var, maximum=100.0, length=160
+        )
+        self.load_cancel_btn = ttk.Button(
+            bar, text="Anuluj", command=self.cancel_image_load
         )
 
         self._set_params_hint()
@@ -481,12 +592,24 @@ class App(tk.Tk):
             command=self.compute_color_coverage,
         ).grid(row=2, column=0, columnspan=2, sticky="ew", pady=(4, 2))
 
+        opts = ttk.Frame(color_an)
+        opts.grid(row=3, column=0, columnspan=2, sticky="w")
+        ttk.Checkbutton(opts, text="Na żywo", variable=self.color_live_var).pack(
+            side="left"
+        )
+        ttk.Checkbutton(
+            opts,
+            text="Pokaż maskę",
+            variable=self.color_mask_var,
+            command=self.compute_color_coverage,
+        ).pack(side="left", padx=(8, 0))
+
         # Etykieta z wynikiem
         ttk.Label(
             color_an,
             textvariable=self.green_result_var,
             foreground="darkgreen",
-        ).grid(row=3, column=0, columnspan=2, sticky="w", pady=(2, 0))
+        ).grid(row=4, column=0, columnspan=2, sticky="w", pady=(2, 0))
 
     def _bind_canvas(self):
         self.canvas.bind("<Button-1>", self.on_down)
@@ -504,6 +627,58 @@ class App(tk.Tk):
         self.canvas.bind("<Delete>", self.on_delete)
         self.bind_all("<Control-d>", self.duplicate_selected)
 
+    # --- Profilowanie ----------
+    # operacje mierzone: przyciski (prefiksy) i wybrane metody wewnętrzne
+    PROFILED_PREFIXES = ("apply_", "load_", "save_", "show_", "compute_")
+    PROFILED_METHODS = (
+        "_apply_adjustment",
+        "_push_history",
+        "_load_scene_from_dict",
+        "_place_raster",
+        "_finish_image_load",
+        "undo",
+        "redo",
+        "clear_all",
+        "change_zoom",
+    )
+
+    def _install_profiling(self):
+        names = [
+            n
+            for n in dir(type(self))
+            if n.startswith(self.PROFILED_PREFIXES) and n != "save_profile_trace"
+        ]
+        self.profiler.instrument(
+            self, names + list(self.PROFILED_METHODS), self._profile_args
+        )
+        self.profiler.on_span_end = self._on_profiled
+
+    def _profile_args(self):
+        from .shapes.image import RasterImage
+
+        obj = self.sel.obj if hasattr(self, "sel") else None
+        if isinstance(obj, RasterImage):
+            return {"size": (obj.src_w, obj.src_h)}
+        return {}
+
+    def _on_profiled(self, event):
+        self.perf_status.set(self.profiler.summary(event))
+
+    def save_profile_trace(self):
+        path = asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("Chrome trace", "*.json")],
+            title="Zapisz śledzenie (Chrome trace)",
+        )
+        if not path:
+            return
+        try:
+            self.profiler.dump_chrome_trace(path)
+        except Exception as e:
+            messagebox.showerror("Profilowanie", f"Nie udało się zapisać:\n{e}")
+            return
+        self._set_status(f"Zapisano trace ({len(self.profiler.events)} zdarzeń): {path}")
+
     # --- Historia ----------
     def _scene_to_dict(self):
         sel_idx = None
@@ -524,6 +699,7 @@ class App(tk.Tk):
             o = shape_from_dict(d)
             o.draw(self.surface, self.canvas)
             self.objects.append(o)
+        self._refresh_coverage_overlay()
         idx = data.get("selected_index", None)
         if idx is not None and 0 <= idx < len(self.objects):
             self.sel.set(self.canvas, self.objects[idx])
@@ -613,12 +789,15 @@ class App(tk.Tk):
             label = "cx,cy,r"
         elif t in ("rasterimage", "image"):
             label = "x,y,w,h"
+        elif t == "beziercurve":
+            label = "x0,y0;x1,y1;…"
         else:
             label = "Parametry"
         self.params_label.config(text=f"(wybór) {t}: {label}")
         self.params.delete(0, tk.END)
         self.params.insert(0, self.sel.obj.params_text())
         self._set_status(f"Select → {t}: {self.sel.obj.params_text()}")
+        self._refresh_adjustments_list()
 
     # --- Actions ---
     def draw_from_fields(self):
@@ -657,6 +836,7 @@ class App(tk.Tk):
             return
         self.sel.obj.update_canvas(self.surface, self.canvas)
         self.sel._update_visual(self.canvas)
+        self._refresh_coverage_overlay()
         self._reflect_selected_to_ui()
         self._push_history("Zastosuj parametry")
 
@@ -669,6 +849,8 @@ class App(tk.Tk):
             dup = Line(o.x1 + 15, o.y1 + 15, o.x2 + 15, o.y2 + 15)
         elif isinstance(o, Rect):
             dup = Rect(o.x1 + 15, o.y1 + 15, o.x2 + 15, o.y2 + 15)
+        elif isinstance(o, BezierCurve):
+            dup = BezierCurve([(x + 15, y + 15) for x, y in o.points], o.degree)
         else:
             dup = Circle(o.cx + 15, o.cy + 15, o.r)
         self._add_object(dup)
@@ -684,6 +866,7 @@ class App(tk.Tk):
         self.surface.clear_tag(self.sel.obj.oid)
         self.objects = [oo for oo in self.objects if oo is not self.sel.obj]
         self.sel.clear(self.canvas)
+        self._refresh_coverage_overlay()
         self._push_history("Usuń")
 
     def clear_all(self):
@@ -693,6 +876,7 @@ class App(tk.Tk):
         self.sel.clear(self.canvas)
         # odtwórz surface (zniknął _surface po delete("all")):
         self.canvas._surface = self.surface = CanvasSurface(self.canvas)
+        self._refresh_coverage_overlay()
         self._set_status("Wyczyszczono.")
         self._push_history("Wyczyszczono")
 
@@ -714,6 +898,7 @@ class App(tk.Tk):
         self.canvas._surface = self.surface = CanvasSurface(self.canvas)
         for o in objs:
             self._add_object(o)
+        self._refresh_coverage_overlay()
         if objs:
             self.sel.set(self.canvas, objs[-1])
             self._reflect_selected_to_ui()
@@ -787,6 +972,9 @@ class App(tk.Tk):
         # RESIZE
         if self.mode.get() == "select" and self.sel.resizing and self.sel.obj:
             self.sel.resize_to(self.canvas, e.x, e.y)
+            if self._coverage_obj is self.sel.obj:
+                # nakładka nie pasuje do nowego rozmiaru – wraca po puszczeniu
+                self.canvas.delete("coverage_overlay")
             self.params.delete(0, tk.END)
             self.params.insert(0, self.sel.obj.params_text())
             return
@@ -796,6 +984,8 @@ class App(tk.Tk):
             dy = e.y - self.sel.drag_last[1]
             if dx or dy:
                 self.sel.move_by(self.canvas, dx, dy)
+                if self._coverage_obj is self.sel.obj:
+                    self.canvas.move("coverage_overlay", dx, dy)
                 self.sel.drag_last = (e.x, e.y)
                 self._update_pixel_overlay()
                 self.params.delete(0, tk.END)
@@ -825,12 +1015,14 @@ class App(tk.Tk):
         ):
             self.sel.drag_last = None
             self.sel._update_visual(self.canvas)
+            self._refresh_coverage_overlay()
             self._reflect_selected_to_ui()
             self._push_history("Przesunięcie")
             return
         # end resize
         if self.mode.get() == "select" and self.sel.resizing:
             self.sel.end_resize(self.canvas)
+            self._refresh_coverage_overlay()
             self._reflect_selected_to_ui()
             self._push_history("Zmiana rozmiaru")
             return
@@ -866,71 +1058,116 @@ class App(tk.Tk):
                 self._reflect_selected_to_ui()
                 self._push_history("Rysunek myszą")
 
-    def _place_raster(self, w, h, pixels, src=None):
+    def _place_raster(self, w, h, pixels, src=None, label="Wczytano PPM", ppm=None):
         from .shapes.image import RasterImage
 
         # domyślnie od (10,10)
         img = RasterImage(10, 10, w, h, pixels, src=src)
+        if ppm is not None:
+            img.seed_ppm(ppm)  # PhotoImage prosto z danych z wątku wczytywania
         self._add_object(img)
         self.sel.set(self.canvas, img)
         self._reflect_selected_to_ui()
-        self._push_history("Wczytano PPM")
+        self._push_history(label)
 
-    def load_ppm_auto(self):
-        from tkinter.filedialog import askopenfilename
-        from tkinter import messagebox
-        from .io.ppm import read_ppm_auto
+    # --- wczytywanie w tle (podgląd → pełny obraz) ---
+    def _load_image_async(self, path, kind, label):
+        from .io.loader import ImageLoadJob
+
+        if self._load_job is not None:
+            self._load_job.cancel()  # nowy plik zastępuje poprzednie wczytywanie
+            self._finish_image_load(self._load_job, cancelled=True)
+        job = ImageLoadJob(path, kind)
+        job.label = label
+        job.preview_photo = None
+        self._load_job = job
+        self.load_progress_var.set(0.0)
+        self.load_bar.pack(side="right", padx=4)
+        self.load_cancel_btn.pack(side="right")
+        self._set_status(f"Wczytywanie: {path}")
+        job.start()
+        self.after(40, self._poll_image_load, job)
+
+    def _poll_image_load(self, job):
+        if job is not self._load_job:
+            return
+        if job.preview is not None and job.preview_photo is None:
+            self._show_load_preview(job)
+        self.load_progress_var.set(job.progress * 100.0)
+        if job.done:
+            self._finish_image_load(job)
+        else:
+            self.after(40, self._poll_image_load, job)
+
+    LOAD_PREVIEW_MAX_SIDE = 2048  # górna granica wyświetlanego podglądu [px]
+
+    def _show_load_preview(self, job):
+        """
+        Podgląd w niskiej rozdzielczości: dane PPM przygotowane w wątku roboczym,
+        tu tylko PhotoImage(data=…) i powiększenie zoom(k) – oba w Tk (C), bez
+        pracy na pikselach w Pythonie. Powiększenie ku rozmiarowi docelowemu,
+        ale nie ponad LOAD_PREVIEW_MAX_SIDE.
+        """
+        pw, ph, _ppx, full_w, full_h = job.preview
+        photo = tk.PhotoImage(data=job.preview_ppm, format="PPM")
+        cap = self.LOAD_PREVIEW_MAX_SIDE // max(pw, ph)
+        k = max(1, min(full_w // pw, full_h // ph, cap))
+        if k > 1:
+            photo = photo.zoom(k)
+        job.preview_photo = photo
+        # poza listą obiektów: bez tagu „shape”, nie reaguje na mysz
+        self.canvas.create_image(
+            10, 10, image=photo, anchor="nw", state="disabled", tags=("load_preview",)
+        )
+        self._set_status(f"Wczytywanie (podgląd {pw}×{ph}): {job.path}")
+
+    def cancel_image_load(self):
+        if self._load_job is not None:
+            self._load_job.cancel()
+            self._set_status("Anulowanie wczytywania…")
+
+    def _finish_image_load(self, job, cancelled=False):
+        if job.preview_photo is not None:
+            self.canvas.delete("load_preview")
+            job.preview_photo = None
+        if job is self._load_job:
+            self._load_job = None
+            self.load_bar.pack_forget()
+            self.load_cancel_btn.pack_forget()
+        if cancelled or job.cancelled:
+            self._set_status(f"Anulowano wczytywanie: {job.path}")
+            return
+        if job.error is not None:
+            messagebox.showerror("Wczytywanie", f"Nie udało się wczytać pliku:\n{job.error}")
+            return
+        w, h, pixels = job.result
+        self._place_raster(w, h, pixels, src=job.path, label=job.label, ppm=job.result_ppm)
+        job.result_ppm = None
+        self._set_status(f"{job.label}: {job.path} ({w}×{h})")
 
+    def load_ppm_auto(self):
         path = askopenfilename(
             filetypes=[("PPM", "*.ppm;*.pnm")], title="Wczytaj PPM (P3/P6)"
         )
         if not path:
             return
-        try:
-            w, h, pixels, fmt = read_ppm_auto(path)  # fmt: "P3" lub "P6"
-        except Exception as e:
-            messagebox.showerror("PPM", f"Nie udało się wczytać pliku PPM:\n{e}")
-            return
-
-        # wstaw obraz jako RasterImage (zachowujemy ścieżkę źródłową)
-        self._place_raster(w, h, pixels, src=path)
-        self._set_status(f"Wczytano {fmt}: {path}")
+        self._load_image_async(path, "ppm", "Wczytano PPM")
 
     def load_ppm_p3(self):
-        from tkinter.filedialog import askopenfilename
-        from .io.ppm import read_ppm_p3
-
         path = askopenfilename(
             filetypes=[("PPM P3", "*.ppm;*.pnm;*.pbm;*.pgm")], title="Wczytaj PPM P3"
         )
         if not path:
             return
-        try:
-            w, h, pixels = read_ppm_p3(path)
-        except Exception as e:
-            from tkinter import messagebox
-
-            messagebox.showerror("PPM P3", f"Nie udało się wczytać:\n{e}")
-            return
-        self._place_raster(w, h, pixels, src=path)
+        self._load_image_async(path, "p3", "Wczytano PPM P3")
 
     def load_ppm_p6(self):
-        from tkinter.filedialog import askopenfilename
-        from .io.ppm import read_ppm_p6
-
         path = askopenfilename(
             filetypes=[("PPM P6", "*.ppm;*.pnm")], title="Wczytaj PPM P6"
         )
         if not path:
             return
-        try:
-            w, h, pixels = read_ppm_p6(path)
-        except Exception as e:
-            from tkinter import messagebox
-
-            messagebox.showerror("PPM P6", f"Nie udało się wczytać:\n{e}")
-            return
-        self._place_raster(w, h, pixels, src=path)
+        self._load_image_async(path, "p6", "Wczytano PPM P6")
 
     # --- JPEG ---
     def load_jpeg(self):
@@ -939,20 +1176,7 @@ class App(tk.Tk):
         )
         if not path:
             return
-        try:
-            w, h, pixels = read_jpeg(path)
-        except Exception as e:
-            messagebox.showerror("JPEG", f"Nie udało się wczytać JPEG:\n{e}")
-            return
-        from .shapes.image import RasterImage
-
-        img = RasterImage(
-            10, 10, src_w=w, src_h=h, src_pixels=pixels, w=w, h=h, src=path
-        )
-        self._add_object(img)
-        self.sel.set(self.canvas, img)
-        self._reflect_selected_to_ui()
-        self._push_history("Wczytano JPEG")
+        self._load_image_async(path, "jpeg", "Wczytano JPEG")
 
     def save_as_jpeg(self):
         if not self.sel.obj:
@@ -1034,9 +1258,9 @@ class App(tk.Tk):
             messagebox.showerror("Levels", "Podaj dwie liczby: in_min,in_max (0..255).")
             return
         try:
-            obj.src_pixels = linear_color_scale(obj.src_pixels, in_min, in_max)
-            obj.update_canvas(self.surface, self.canvas)
-            self._push_history("Levels")
+            self._apply_adjustment(
+                obj, "levels", "Levels", in_min=in_min, in_max=in_max
+            )
         except Exception as e:
             messagebox.showerror("Levels", f"Błąd skalowania kolorów:\n{e}")
 
@@ -1842,6 +2066,7 @@ class App(tk.Tk):
         obj.update_canvas(self.surface, self.canvas)
         self.sel._update_visual(self.canvas)
         self._update_pixel_overlay()
+        self._refresh_coverage_overlay()
         self._reflect_selected_to_ui()
         self._push_history("Zoom")
 
@@ -1991,9 +2216,7 @@ class App(tk.Tk):
             messagebox.showerror("Dodawanie", "Podaj liczbę całkowitą.")
             return
         try:
-            obj.src_pixels = add_constant(obj.src_pixels, val)
-            obj.update_canvas(self.surface, self.canvas)
-            self._push_history("Dodawanie stałej")
+            self._apply_adjustment(obj, "add", "Dodawanie stałej", value=val)
         except Exception as e:
             messagebox.showerror("Dodawanie", f"Błąd:\n{e}")
 
@@ -2007,9 +2230,7 @@ class App(tk.Tk):
             messagebox.showerror("Mnożenie", "Podaj liczbę (float).")
             return
         try:
-            obj.src_pixels = mul_constant(obj.src_pixels, val)
-            obj.update_canvas(self.surface, self.canvas)
-            self._push_history("Mnożenie stałej")
+            self._apply_adjustment(obj, "mul", "Mnożenie stałej", value=val)
         except Exception as e:
             messagebox.showerror("Mnożenie", f"Błąd:\n{e}")
 
@@ -2023,9 +2244,7 @@ class App(tk.Tk):
             messagebox.showerror("Dzielenie", "Podaj liczbę (float).")
             return
         try:
-            obj.src_pixels = div_constant(obj.src_pixels, val)
-            obj.update_canvas(self.surface, self.canvas)
-            self._push_history("Dzielenie stałej")
+            self._apply_adjustment(obj, "div", "Dzielenie stałej", value=val)
         except Exception as e:
             messagebox.showerror("Dzielenie", f"Błąd:\n{e}")
 
@@ -2039,9 +2258,7 @@ class App(tk.Tk):
             messagebox.showerror("Jasność", "Podaj liczbę całkowitą.")
             return
         try:
-            obj.src_pixels = change_brightness(obj.src_pixels, delta)
-            obj.update_canvas(self.surface, self.canvas)
-            self._push_history("Zmiana jasności")
+            self._apply_adjustment(obj, "brightness", "Zmiana jasności", delta=delta)
         except Exception as e:
             messagebox.showerror("Jasność", f"Błąd:\n{e}")
 
@@ -2050,9 +2267,7 @@ class App(tk.Tk):
         if obj is None:
             return
         try:
-            obj.src_pixels = to_grayscale_avg(obj.src_pixels)
-            obj.update_canvas(self.surface, self.canvas)
-            self._push_history("Skala szarości (średnia)")
+            self._apply_adjustment(obj, "gray_avg", "Skala szarości (średnia)")
         except Exception as e:
             messagebox.showerror("Skala szarości", f"Błąd:\n{e}")
 
@@ -2061,12 +2276,84 @@ class App(tk.Tk):
         if obj is None:
             return
         try:
-            obj.src_pixels = to_grayscale_luma(obj.src_pixels)
-            obj.update_canvas(self.surface, self.canvas)
-            self._push_history("Skala szarości (luma)")
+            self._apply_adjustment(obj, "gray_luma", "Skala szarości (luma)")
         except Exception as e:
             messagebox.showerror("Skala szarości", f"Błąd:\n{e}")
 
+    # --- Stos korekt ---
+    def _apply_adjustment(self, obj, kind, label, **params):
+        """Dodaje operację do stosu korekt obrazu (nieniszcząco) i odświeża widok."""
+        idx = obj.push_adjustment(kind, **params)
+        try:
+            with self.profiler.span("render", kind=kind):
+                obj.update_canvas(self.surface, self.canvas)
+        except Exception:
+            obj.remove_adjustment(idx)
+            obj.update_canvas(self.surface, self.canvas)
+            raise
+        self._refresh_coverage_overlay()
+        self._refresh_adjustments_list()
+        self._push_history(label)
+
+    def _refresh_adjustments_list(self):
+        from .shapes.image import RasterImage
+
+        self.adj_list.delete(0, tk.END)
+        self.adj_params.delete(0, tk.END)
+        obj = self.sel.obj
+        if not isinstance(obj, RasterImage) or obj.adjustments is None:
+            return
+        for i, op in enumerate(obj.adjustments.ops):
+            self.adj_list.insert(tk.END, f"{i + 1}. {op.label()}")
+
+    def _selected_adjustment(self):
+        """Zwraca (obraz, indeks etapu) albo (None, None)."""
+        from .shapes.image import RasterImage
+
+        obj = self.sel.obj
+        sel = self.adj_list.curselection()
+        if not isinstance(obj, RasterImage) or obj.adjustments is None or not sel:
+            return None, None
+        return obj, sel[0]
+
+    def _on_adjustment_selected(self, e=None):
+        obj, idx = self._selected_adjustment()
+        if obj is None:
+            return
+        self.adj_params.delete(0, tk.END)
+        self.adj_params.insert(0, obj.adjustments.ops[idx].params_text())
+
+    def apply_adjustment_params(self):
+        obj, idx = self._selected_adjustment()
+        if obj is None:
+            messagebox.showinfo("Stos korekt", "Wybierz etap z listy.")
+            return
+        old = dict(obj.adjustments.ops[idx].params)
+        try:
+            params = parse_params_text(self.adj_params.get())
+            obj.set_adjustment_params(idx, **params)
+            obj.update_canvas(self.surface, self.canvas)
+        except Exception as e:
+            obj.set_adjustment_params(idx, **old)
+            obj.update_canvas(self.surface, self.canvas)
+            messagebox.showerror("Stos korekt", f"Błędne parametry:\n{e}")
+            return
+        self._refresh_coverage_overlay()
+        self._refresh_adjustments_list()
+        self.adj_list.selection_set(idx)
+        self._push_history("Zmiana parametrów etapu")
+
+    def remove_adjustment(self):
+        obj, idx = self._selected_adjustment()
+        if obj is None:
+            messagebox.showinfo("Stos korekt", "Wybierz etap z listy.")
+            return
+        obj.remove_adjustment(idx)
+        obj.update_canvas(self.surface, self.canvas)
+        self._refresh_coverage_overlay()
+        self._refresh_adjustments_list()
+        self._push_history("Usunięto etap korekty")
+
     # --- Filtry ---
     def _require_raster_with_size(self):
         obj = self._require_raster_image()
@@ -2077,48 +2364,31 @@ class App(tk.Tk):
         h = obj.src_h
         return obj, w, h
 
-    def _apply_filter_and_update(self, func, label):
+    def _apply_filter_and_update(self, kind, label, **params):
         obj, w, h = self._require_raster_with_size()
         if obj is None:
             return
         try:
-            new_pixels = func(obj.src_pixels, w, h)
-            obj.src_pixels = new_pixels
-            obj.update_canvas(self.surface, self.canvas)
-            self._push_history(label)
+            self._apply_adjustment(obj, kind, label, **params)
         except Exception as e:
             messagebox.showerror("Filtr", f"Błąd filtra ({label}):\n{e}")
 
     def apply_filter_box(self):
         self._apply_filter_and_update(
-            lambda pixels, w, h: filter_box_blur(pixels, w, h, size=3),
-            "Filtr wygładzający (box blur)",
+            "box_blur", "Filtr wygładzający (box blur)", size=3
         )
 
     def apply_filter_median(self):
-        self._apply_filter_and_update(
-            lambda pixels, w, h: filter_median(pixels, w, h, size=3),
-            "Filtr medianowy",
-        )
+        self._apply_filter_and_update("median", "Filtr medianowy", size=3)
 
     def apply_filter_sobel(self):
-        self._apply_filter_and_update(
-            lambda pixels, w, h: filter_sobel(pixels, w, h),
-            "Filtr Sobela",
-        )
+        self._apply_filter_and_update("sobel", "Filtr Sobela")
 
     def apply_filter_sharpen(self):
-        self._apply_filter_and_update(
-            lambda pixels, w, h: filter_sharpen(pixels, w, h),
-            "Filtr wyostrzający",
-        )
+        self._apply_filter_and_update("sharpen", "Filtr wyostrzający")
 
     def apply_filter_gaussian(self):
-
-        self._apply_filter_and_update(
-            lambda pixels, w, h: filter_gaussian(pixels, w, h),
-            "Filtr Gaussa",
-        )
+        self._apply_filter_and_update("gaussian", "Filtr Gaussa")
 
     def apply_filter_custom(self):
         obj, w, h = self._require_raster_with_size()
@@ -2162,17 +2432,16 @@ class App(tk.Tk):
                 # messagebox.showwarning("Maska", "Uwaga: najlepiej używać masek o nieparzystym rozmiarze.")
                 pass
 
-            new_pixels = filter_custom(obj.src_pixels, w, h, kernel)
-            obj.src_pixels = new_pixels
-            obj.update_canvas(self.surface, self.canvas)
-            self._push_history("Filtr: maska własna")
+            self._apply_adjustment(
+                obj, "custom", "Filtr: maska własna", kernel=kernel
+            )
         except Exception as e:
             messagebox.showerror("Maska własna", f"Błąd parsowania / splotu:\n{e}")
 
     # --- Zadanie 5a: Histogram ---
 
     def show_histogram(self):
-        """Otwiera okno z histogramem jasności (luminancja)."""
+        """Otwiera okno histogramu (jasność, R, G, B, odcień) – odświeżane na żywo."""
         from .shapes.image import RasterImage
 
         if not self.sel.obj:
@@ -2183,29 +2452,11 @@ class App(tk.Tk):
             messagebox.showinfo("Histogram", "Histogram działa na obrazach PPM/JPEG.")
             return
 
-        hist = compute_histogram(obj.src_pixels)
-        total = sum(hist) or 1
-        max_count = max(hist) or 1
-
-        top = tk.Toplevel(self)
-        top.title("Histogram jasności (luminancja)")
-        cv = tk.Canvas(top, width=512, height=200, bg="white")
-        cv.pack(fill="both", expand=True)
-
-        # oś X: 0..255 (rozciągnięte na szerokość 512 px, czyli 2 px na bin)
-        w = 512
-        h = 200
-        for i, count in enumerate(hist):
-            x0 = i * 2
-            x1 = x0 + 2
-            # wysokość słupka proporcjonalna do max_count
-            bar_h = int(count / max_count * (h - 20))
-            y0 = h - bar_h
-            y1 = h
-            cv.create_rectangle(x0, y0, x1, y1, fill="#444", outline="")
-
-        cv.create_line(0, h - 1, w, h - 1, fill="black")
-        cv.create_text(10, 10, anchor="nw", text=f"N = {total}", fill="black")
+        if self.histogram_win is not None:
+            self.histogram_win.image = obj
+            self.histogram_win.lift()
+            return
+        self.histogram_win = HistogramWindow(self, obj)
 
     def apply_hist_stretch(self):
         """Rozszerzenie histogramu dla zaznaczonego obrazu."""
@@ -2220,9 +2471,7 @@ class App(tk.Tk):
             return
 
         try:
-            obj.src_pixels = histogram_stretch(obj.src_pixels)
-            obj.update_canvas(self.surface, self.canvas)
-            self._push_history("Histogram – rozszerzenie")
+            self._apply_adjustment(obj, "hist_stretch", "Histogram – rozszerzenie")
         except Exception as e:
             messagebox.showerror("Histogram", f"Błąd rozszerzania histogramu:\n{e}")
 
@@ -2239,12 +2488,44 @@ class App(tk.Tk):
             return
 
         try:
-            obj.src_pixels = histogram_equalize(obj.src_pixels)
-            obj.update_canvas(self.surface, self.canvas)
-            self._push_history("Histogram – equalizacja")
+            self._apply_adjustment(obj, "hist_equalize", "Histogram – equalizacja")
         except Exception as e:
             messagebox.showerror("Histogram", f"Błąd equalizacji histogramu:\n{e}")
 
+    def apply_hist_equalize_color(self):
+        """Equalizacja luminancji z zachowaniem koloru (YCbCr)."""
+        obj = self._require_raster_image()
+        if obj is None:
+            return
+        try:
+            self._apply_adjustment(
+                obj, "hist_equalize_color", "Histogram – equalizacja (kolor)"
+            )
+        except Exception as e:
+            messagebox.showerror("Histogram", f"Błąd equalizacji histogramu:\n{e}")
+
+    def apply_hist_clahe(self):
+        """CLAHE – equalizacja adaptacyjna z ograniczeniem kontrastu."""
+        obj = self._require_raster_image()
+        if obj is None:
+            return
+        try:
+            tiles = int(self.clahe_tiles_var.get())
+            clip = float(self.clahe_clip_var.get())
+        except Exception:
+            messagebox.showerror("Histogram", "Podaj liczbę kafli i limit kontrastu.")
+            return
+        try:
+            self._apply_adjustment(
+                obj,
+                "clahe",
+                f"CLAHE ({tiles}×{tiles}, limit {clip:g})",
+                tiles=tiles,
+                clip_limit=clip,
+            )
+        except Exception as e:
+            messagebox.showerror("Histogram", f"Błąd CLAHE:\n{e}")
+
     # --- Zadanie 5b: Binaryzacja ---
 
     def _require_raster_image(self):
@@ -2272,12 +2553,36 @@ class App(tk.Tk):
             messagebox.showerror("Binaryzacja", "Podaj próg 0..255.")
             return
         try:
-            obj.src_pixels = threshold_manual(obj.src_pixels, T)
-            obj.update_canvas(self.surface, self.canvas)
-            self._push_history(f"Binaryzacja ręczna T={T}")
+            self._apply_adjustment(
+                obj, "threshold_manual", f"Binaryzacja ręczna T={T}", T=T
+            )
         except Exception as e:
             messagebox.showerror("Binaryzacja", f"Błąd binaryzacji ręcznej:\n{e}")
 
+    def apply_threshold_adaptive(self):
+        obj = self._require_raster_image()
+        if obj is None:
+            return
+        method = self.thresh_adapt_method_var.get()
+        try:
+            window = int(self.thresh_adapt_window_var.get())
+            k_txt = self.thresh_adapt_k_var.get().strip()
+            k = float(k_txt) if k_txt else ADAPTIVE_DEFAULT_K[method]
+        except Exception:
+            messagebox.showerror("Binaryzacja", "Podaj rozmiar okna (px) i współczynnik k.")
+            return
+        try:
+            self._apply_adjustment(
+                obj,
+                "threshold_adaptive",
+                f"Binaryzacja lokalna {method} (okno {window}, k={k:g})",
+                method=method,
+                window=window,
+                k=k,
+            )
+        except Exception as e:
+            messagebox.showerror("Binaryzacja", f"Błąd binaryzacji lokalnej:\n{e}")
+
     def apply_threshold_percent_black(self):
         obj = self._require_raster_image()
         if obj is None:
@@ -2288,9 +2593,12 @@ class App(tk.Tk):
             messagebox.showerror("Binaryzacja", "Podaj procent czarnego (0..100).")
             return
         try:
-            obj.src_pixels = threshold_percent_black(obj.src_pixels, p)
-            obj.update_canvas(self.surface, self.canvas)
-            self._push_history(f"Binaryzacja Percent Black ({p:.1f}%)")
+            self._apply_adjustment(
+                obj,
+                "threshold_percent_black",
+                f"Binaryzacja Percent Black ({p:.1f}%)",
+                percent_black=p,
+            )
         except Exception as e:
             messagebox.showerror("Binaryzacja", f"Błąd Percent Black:\n{e}")
 
@@ -2299,9 +2607,9 @@ class App(tk.Tk):
         if obj is None:
             return
         try:
-            obj.src_pixels = threshold_mean_iterative(obj.src_pixels)
-            obj.update_canvas(self.surface, self.canvas)
-            self._push_history("Binaryzacja Mean Iterative")
+            self._apply_adjustment(
+                obj, "threshold_mean_iterative", "Binaryzacja Mean Iterative"
+            )
         except Exception as e:
             messagebox.showerror("Binaryzacja", f"Błąd Mean Iterative:\n{e}")
 
@@ -2310,12 +2618,38 @@ class App(tk.Tk):
         if obj is None:
             return
         try:
-            obj.src_pixels = threshold_entropy(obj.src_pixels)
-            obj.update_canvas(self.surface, self.canvas)
-            self._push_history("Binaryzacja Entropy")
+            self._apply_adjustment(obj, "threshold_entropy", "Binaryzacja Entropy")
         except Exception as e:
             messagebox.showerror("Binaryzacja", f"Błąd Entropy:\n{e}")
 
+    def apply_threshold_otsu(self):
+        obj = self._require_raster_image()
+        if obj is None:
+            return
+        try:
+            self._apply_adjustment(obj, "threshold_otsu", "Binaryzacja Otsu")
+        except Exception as e:
+            messagebox.showerror("Binaryzacja", f"Błąd Otsu:\n{e}")
+
+    def apply_threshold_multi_otsu(self):
+        obj = self._require_raster_image()
+        if obj is None:
+            return
+        try:
+            k = int(self.thresh_classes_var.get())
+        except Exception:
+            messagebox.showerror("Binaryzacja", "Podaj liczbę klas (2..8).")
+            return
+        try:
+            self._apply_adjustment(
+                obj,
+                "threshold_multi_otsu",
+                f"Wielopoziomowe Otsu ({k} klasy)",
+                classes=k,
+            )
+        except Exception as e:
+            messagebox.showerror("Binaryzacja", f"Błąd Multi-Otsu:\n{e}")
+
     def open_bezier_editor(self):
         """Otwiera (lub fokusuje) okno edytora krzywej Béziera."""
         if getattr(self, "bezier_editor_win", None) is not None:
@@ -2388,114 +2722,6 @@ class App(tk.Tk):
 
         return rows
 
-    def _pixels_to_binary(self, pixels):
-        """Zamienia listę pikseli RGB na obraz binarny 0/1."""
-        bin_img = []
-        for r, g, b in pixels:
-            if (r + g + b) / 3 >= 128:
-                bin_img.append(1)
-            else:
-                bin_img.append(0)
-        return bin_img
-
-    def _binary_to_pixels(self, bin_img):
-        """Zamienia obraz binarny 0/1 na piksele (0 lub 255, RGB)."""
-        pixels = []
-        for v in bin_img:
-            val = 255 if v else 0
-            pixels.append((val, val, val))
-        return pixels
-
-    def _morph_dilate(self, bin_img, w, h, se):
-        kh = len(se)
-        kw = len(se[0])
-        cy = kh // 2
-        cx = kw // 2
-        out = [0] * (w * h)
-
-        for y in range(h):
-            for x in range(w):
-                val = 0
-                for j in range(kh):
-                    for i in range(kw):
-                        if se[j][i] != 1:
-                            continue
-                        xx = x + i - cx
-                        yy = y + j - cy
-                        if 0 <= xx < w and 0 <= yy < h:
-                            if bin_img[yy * w + xx] == 1:
-                                val = 1
-                                break
-                    if val:
-                        break
-                out[y * w + x] = val
-        return out
-
-    def _morph_erode(self, bin_img, w, h, se):
-        kh = len(se)
-        kw = len(se[0])
-        cy = kh // 2
-        cx = kw // 2
-        out = [0] * (w * h)
-
-        for y in range(h):
-            for x in range(w):
-                val = 1
-                for j in range(kh):
-                    for i in range(kw):
-                        if se[j][i] != 1:
-                            continue
-                        xx = x + i - cx
-                        yy = y + j - cy
-                        if not (0 <= xx < w and 0 <= yy < h):
-                            val = 0
-                            break
-                        if bin_img[yy * w + xx] == 0:
-                            val = 0
-                            break
-                    if val == 0:
-                        break
-                out[y * w + x] = val
-        return out
-
-    def _morph_hit_or_miss(self, bin_img, w, h, se):
-        """Hit-or-miss z użyciem wartości 1 (obiekt), -1 (tło), 0 (don't care)."""
-        kh = len(se)
-        kw = len(se[0])
-        cy = kh // 2
-        cx = kw // 2
-        out = [0] * (w * h)
-
-        for y in range(h):
-            for x in range(w):
-                match = True
-                for j in range(kh):
-                    for i in range(kw):
-                        v = se[j][i]
-                        if v == 0:
-                            continue
-                        xx = x + i - cx
-                        yy = y + j - cy
-
-                        if v == 1:
-                            # musi trafić w 1
-                            if not (0 <= xx < w and 0 <= yy < h):
-                                match = False
-                                break
-                            if bin_img[yy * w + xx] != 1:
-                                match = False
-                                break
-                        elif v == -1:
-                            # musi trafić w tło (0); poza obrazem też traktujemy jako tło
-                            if 0 <= xx < w and 0 <= yy < h:
-                                if bin_img[yy * w + xx] != 0:
-                                    match = False
-                                    break
-                    if not match:
-                        break
-                out[y * w + x] = 1 if match else 0
-        return out
-
     def _apply_morph(self, mode, label):
         obj = self._require_raster_image()
         if obj is None:
@@ -2506,38 +2732,13 @@ class App(tk.Tk):
             messagebox.showerror("Morfologia", str(e))
             return
 
-        w = obj.src_w
-        h = obj.src_h
-        bin_img = self._pixels_to_binary(obj.src_pixels)
-
-        if mode == "dilate":
-            out = self._morph_dilate(bin_img, w, h, se)
-        elif mode == "erode":
-            out = self._morph_erode(bin_img, w, h, se)
-        elif mode == "open":
-            tmp = self._morph_erode(bin_img, w, h, se)
-            out = self._morph_dilate(tmp, w, h, se)
-        elif mode == "close":
-            tmp = self._morph_dilate(bin_img, w, h, se)
-            out = self._morph_erode(tmp, w, h, se)
-        elif mode == "thin":
-            hm = self._morph_hit_or_miss(bin_img, w, h, se)
-            out = [
-                1 if (bin_img[i] == 1 and hm[i] == 0) else 0
-                for i in range(len(bin_img))
-            ]
-        elif mode == "thicken":
-            hm = self._morph_hit_or_miss(bin_img, w, h, se)
-            out = [
-                1 if (bin_img[i] == 1 or hm[i] == 1) else 0 for i in range(len(bin_img))
-            ]
-        else:
+        if mode not in MORPH_MODES:
             messagebox.showerror("Morfologia", f"Nieznany tryb morfologii: {mode}")
             return
-
-        obj.src_pixels = self._binary_to_pixels(out)
-        obj.update_canvas(self.surface, self.canvas)
-        self._push_history(label)
+        try:
+            self._apply_adjustment(obj, "morphology", label, mode=mode, se=se)
+        except Exception as e:
+            messagebox.showerror("Morfologia", f"Błąd morfologii:\n{e}")
 
     def apply_morph_dilate(self):
         self._apply_morph("dilate", "Morfologia – dylatacja")
@@ -2557,6 +2758,15 @@ class App(tk.Tk):
     def apply_morph_thicken(self):
         self._apply_morph("thicken", "Morfologia – hit-or-miss (pogrubianie)")
 
+    def _color_bounds(self):
+        """Progi (h_min, h_max, s_min, v_min) z pól – H obcięte do [0, 360]."""
+        return normalize_bounds(
+            self.color_h_min_var.get(),
+            self.color_h_max_var.get(),
+            self.color_s_min_var.get(),
+            self.color_v_min_var.get(),
+        )
+
     def compute_color_coverage(self):
         """Liczy, jaki procent obrazu spełnia warunki koloru (domyślnie zieleń)."""
         obj = self._require_raster_image()
@@ -2564,10 +2774,7 @@ class App(tk.Tk):
             return
 
         try:
-            h_min = float(self.color_h_min_var.get())
-            h_max = float(self.color_h_max_var.get())
-            s_min = float(self.color_s_min_var.get())
-            v_min = float(self.color_v_min_var.get())
+            bounds = self._color_bounds()
         except Exception:
             messagebox.showerror(
                 "Analiza koloru",
@@ -2575,34 +2782,89 @@ class App(tk.Tk):
             )
             return
 
-        # normalizacja zakresu H do [0, 360] i upewnienie się, że min <= max
-        h_min = max(0.0, min(360.0, h_min))
-        h_max = max(0.0, min(360.0, h_max))
-        if h_max < h_min:
-            h_min, h_max = h_max, h_min
-
-        pixels = obj.src_pixels
-        total = len(pixels)
-        if total == 0:
+        if not obj.src_pixels:
             messagebox.showinfo("Analiza koloru", "Obraz jest pusty.")
             return
+        self._update_color_coverage(obj, bounds)
 
-        count = 0
-        # Pętla po pikselach – konwersja RGB -> HSV (stdlib: colorsys)
-        for r, g, b in pixels:
-            rn = r / 255.0
-            gn = g / 255.0
-            bn = b / 255.0
-            h, s, v = colorsys.rgb_to_hsv(rn, gn, bn)
-            h_deg = h * 360.0
-
-            if h_min <= h_deg <= h_max and s >= s_min and v >= v_min:
-                count += 1
-
-        percent = 100.0 * count / total
+    def _update_color_coverage(self, obj, bounds, status=True):
+        # HSV liczone raz na obraz (analysis.hsv_table) – tu tylko progi
+        _count, _total, percent = color_coverage(obj.src_pixels, *bounds)
+        h_min, h_max, s_min, v_min = bounds
         text = (
             f"Pokrycie kolorem (H∈[{h_min:.1f}°, {h_max:.1f}°], "
             f"S≥{s_min:.2f}, V≥{v_min:.2f}): {percent:.2f}%"
         )
         self.green_result_var.set(text)
-        self._set_status(text)
+        if status:
+            self._set_status(text)
+
+        if self.color_mask_var.get():
+            self._show_coverage_overlay(obj, bounds)
+        else:
+            self._clear_coverage_overlay()
+
+    def _on_color_bounds_changed(self, *_args):
+        """Zmiana progu H/S/V → przeliczenie (z opóźnieniem, bez komunikatów o błędach)."""
+        if not self.color_live_var.get():
+            return
+        if self._coverage_after is not None:
+            self.after_cancel(self._coverage_after)
+        self._coverage_after = self.after(150, self._live_color_coverage)
+
+    def _live_color_coverage(self):
+        from .shapes.image import RasterImage
+
+        self._coverage_after = None
+        obj = self.sel.obj
+        if not isinstance(obj, RasterImage) or not obj.src_pixels:
+            return
+        try:
+            bounds = self._color_bounds()
+        except Exception:
+            return  # pole w trakcie edycji
+        self._update_color_coverage(obj, bounds)
+
+    def _show_coverage_overlay(self, obj, bounds):
+        """
+        Nakładka maski pokrycia nad widoczną częścią obrazu (nie przechwytuje
+        kliknięć). Odświeżana po przesunięciu, zmianie rozmiaru i korektach
+        obrazu (_refresh_coverage_overlay).
+        """
+        self.canvas.delete("coverage_overlay")
+        self._coverage_photo = None
+        self._coverage_obj, self._coverage_bounds = obj, bounds
+        pixels, w = obj.src_pixels, obj.src_w
+        made = obj.region_photo(
+            self.canvas,
+            lambda x0, y0, x1, y1: coverage_overlay_region(
+                pixels, w, bounds, x0, y0, x1, y1
+            ),
+        )
+        if made is None:
+            return  # obraz poza ekranem
+        self._coverage_photo, dx, dy = made
+        self.canvas.create_image(
+            obj.x + dx,
+            obj.y + dy,
+            image=self._coverage_photo,
+            anchor="nw",
+            state="disabled",
+            tags=("coverage_overlay",),
+        )
+
+    def _refresh_coverage_overlay(self):
+        """Po zmianie obrazu (pozycja, rozmiar, piksele) – nakładka od nowa albo usunięta."""
+        obj = self._coverage_obj
+        if obj is None:
+            return
+        if not any(o is obj for o in self.objects) or not self.color_mask_var.get():
+            self._clear_coverage_overlay()
+            return
+        self._update_color_coverage(obj, self._coverage_bounds, status=False)
+
+    def _clear_coverage_overlay(self):
+        self.canvas.delete("coverage_overlay")
+        self._coverage_photo = None
+        self._coverage_obj = None
+        self._coverage_bounds = None
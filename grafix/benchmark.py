@@ -0,0 +1,303 @@
+# grafix/benchmark.py
+"""
+Pomiar wydajności operacji na obrazach: filtry, operacje punktowe, progi,
+histogram, morfologia, zapis/odczyt PPM i JPEG, budowa PhotoImage.
+
+Obrazy są syntetyczne (gradient + szum, powtarzalne ziarno) w kilku rozmiarach.
+Wynik: czas (najlepszy z powtórzeń), przepustowość [MPix/s] i szczytowa pamięć
+(tracemalloc, osobny przebieg). Wyniki zapisuje się do JSON i porównuje z
+zapisaną bazą – spowolnienie ponad próg jest zgłaszane jako regresja.
+
+    python -m grafix.benchmark --sizes 256 512 1024 -o wyniki.json
+    python -m grafix.benchmark --ops gaussian otsu --baseline baza.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from .adjustments import AdjustmentStack
+from .filters import (
+    filter_box_blur,
+    filter_custom,
+    filter_gaussian,
+    filter_median,
+    filter_sharpen,
+    filter_sobel,
+)
+from .histogram import color_histograms, histogram_clahe, histogram_equalize
+from .image_ops import (
+    add_lut,
+    apply_point_ops,
+    levels_lut,
+    mul_lut,
+    to_grayscale_luma,
+)
+from .morphology import apply_morphology
+from .planes import clear_plane_cache
+from .thresholds import threshold_adaptive, threshold_entropy, threshold_otsu
+
+# silnik obliczeń – projekt jest w czystym Pythonie (bez NumPy)
+ENGINE = "python"
+
+DEFAULT_SIZES = (256, 512, 1024)
+_CROSS = [[0, 1, 0], [1, 1, 1], [0, 1, 0]]
+
+
+def synthetic_image(size, seed=0):
+    """Obraz size×size: gradienty w kanałach + szum (powtarzalny dla ziarna)."""
+    rnd = random.Random(seed)
+    noise = [rnd.randrange(-24, 25) for _ in range(4096)]
+    px = []
+    k = 0
+    for y in range(size):
+        gy = (y * 255) // max(1, size - 1)
+        for x in range(size):
+            gx = (x * 255) // max(1, size - 1)
+            n = noise[k & 4095]
+            k += 7
+            px.append(
+                (
+                    min(255, max(0, gx + n)),
+                    min(255, max(0, gy - n)),
+                    min(255, max(0, ((gx + gy) >> 1) + n)),
+                )
+            )
+    return px
+
+
+# ---------- przypadki pomiarowe ----------
+# prepare(pixels, w, h, tmpdir) → funkcja bez argumentów (mierzona)
+
+def _op(fn):
+    return lambda px, w, h, tmp: (lambda: fn(px, w, h))
+
+
+def _io_ppm_write(px, w, h, tmp):
+    from .io.ppm import write_ppm_p6
+
+    path = os.path.join(tmp, "bench.ppm")
+    return lambda: write_ppm_p6(path, w, h, px)
+
+
+def _io_ppm_read(px, w, h, tmp):
+    from .io.ppm import read_ppm_auto, write_ppm_p6
+
+    path = os.path.join(tmp, "bench_r.ppm")
+    write_ppm_p6(path, w, h, px)
+    return lambda: read_ppm_auto(path)
+
+
+def _io_jpeg_write(px, w, h, tmp):
+    from .io.jpeg_io import write_jpeg
+
+    path = os.path.join(tmp, "bench.jpg")
+    return lambda: write_jpeg(path, w, h, px)
+
+
+def _io_jpeg_read(px, w, h, tmp):
+    from .io.jpeg_io import read_jpeg, write_jpeg
+
+    path = os.path.join(tmp, "bench_r.jpg")
+    write_jpeg(path, w, h, px)
+    return lambda: read_jpeg(path)
+
+
+_tk_root = None
+
+
+def _photo(px, w, h, tmp):
+    """RasterImage._photo_from_pixels – wymaga ekranu (Tk); bez niego przypadek jest pomijany."""
+    import tkinter as tk
+
+    from .shapes.image import RasterImage
+
+    global _tk_root
+    if _tk_root is None:
+        _tk_root = tk.Tk()
+        _tk_root.withdraw()
+    img = RasterImage(0, 0, w, h, px)
+    return lambda: img._photo_from_pixels(w, h, px)
+
+
+def _stack_chain(px, w, h, tmp):
+    def run():
+        stack = AdjustmentStack(w, h, px)
+        stack.push("levels", in_min=20, in_max=230)
+        stack.push("brightness", delta=10)
+        stack.push("gaussian")
+        stack.push("threshold_otsu")
+        return stack.evaluate()
+
+    return run
+
+
+CASES = [
+    # (nazwa, grupa, prepare)
+    ("levels_lut", "image_ops", _op(lambda px, w, h: apply_point_ops(px, [levels_lut(20, 230)]))),
+    (
+        "point_chain_fused",
+        "image_ops",
+        _op(lambda px, w, h: apply_point_ops(px, [add_lut(10), mul_lut(1.2), levels_lut(20, 230)])),
+    ),
+    ("gray_luma", "image_ops", _op(lambda px, w, h: to_grayscale_luma(px))),
+    ("box_blur_3", "filters", _op(filter_box_blur)),
+    ("median_3", "filters", _op(filter_median)),
+    ("sobel", "filters", _op(filter_sobel)),
+    ("sharpen", "filters", _op(filter_sharpen)),
+    ("gaussian", "filters", _op(filter_gaussian)),
+    ("custom_5x5", "filters", _op(lambda px, w, h: filter_custom(px, w, h, [[1] * 5] * 5))),
+    ("histogram_rgbh", "histogram", _op(lambda px, w, h: color_histograms(px))),
+    ("equalize", "histogram", _op(lambda px, w, h: histogram_equalize(px))),
+    ("clahe_8", "histogram", _op(histogram_clahe)),
+    ("otsu", "thresholds", _op(lambda px, w, h: threshold_otsu(px))),
+    ("entropy", "thresholds", _op(lambda px, w, h: threshold_entropy(px))),
+    ("sauvola_25", "thresholds", _op(lambda px, w, h: threshold_adaptive(px, w, h, "sauvola", 25))),
+    ("morph_open_3", "morphology", _op(lambda px, w, h: apply_morphology(px, w, h, "open", _CROSS))),
+    ("stack_chain", "adjustments", _stack_chain),
+    ("ppm_write", "io", _io_ppm_write),
+    ("ppm_read", "io", _io_ppm_read),
+    ("jpeg_write", "io", _io_jpeg_write),
+    ("jpeg_read", "io", _io_jpeg_read),
+    ("photo_from_pixels", "render", _photo),
+]
+
+
+def _measure(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        clear_plane_cache()  # każdy przebieg liczy plany od zera
+        t0 = time.perf_counter()
+        fn()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    clear_plane_cache()
+    tracemalloc.start()
+    fn()
+    _cur, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    clear_plane_cache()
+    return best, peak
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, ops=None, repeat=3, log=None):
+    """Wykonuje pomiary; ops – fragmenty nazw/grup do wybrania (None = wszystkie)."""
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            px = synthetic_image(size)
+            for name, group, prepare in CASES:
+                if ops and not any(o in name or o == group for o in ops):
+                    continue
+                row = {"name": name, "group": group, "engine": ENGINE, "size": size}
+                try:
+                    fn = prepare(px, size, size, tmp)
+                    seconds, peak = _measure(fn, repeat)
+                except Exception as e:  # np. brak ekranu dla Tk albo brak Pillow
+                    row["skipped"] = f"{type(e).__name__}: {e}"
+                else:
+                    row.update(
+                        seconds=round(seconds, 6),
+                        mpix_per_s=round(size * size / 1e6 / seconds, 3) if seconds else None,
+                        peak_mb=round(peak / 2**20, 2),
+                    )
+                results.append(row)
+                if log:
+                    log(_format_row(row))
+    return {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "engine": ENGINE,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def _format_row(row):
+    head = f"{row['name']:18s} {row['size']:>5d}²"
+    if "skipped" in row:
+        return f"{head}  pominięto ({row['skipped']})"
+    return (
+        f"{head}  {row['seconds'] * 1000:10.1f} ms  "
+        f"{row['mpix_per_s']:8.3f} MPix/s  {row['peak_mb']:8.2f} MB"
+    )
+
+
+def compare(report, baseline, threshold=0.10):
+    """
+    Porównanie z bazą: [(nazwa, rozmiar, czas bazy, czas, zmiana)].
+    Zmiana = czas / czas bazy − 1 (dodatnia = wolniej).
+    """
+    base = {
+        (r["name"], r["size"]): r["seconds"]
+        for r in baseline.get("results", [])
+        if "seconds" in r
+    }
+    rows = []
+    for r in report["results"]:
+        key = (r["name"], r["size"])
+        if "seconds" not in r or key not in base or not base[key]:
+            continue
+        change = r["seconds"] / base[key] - 1.0
+        rows.append((r["name"], r["size"], base[key], r["seconds"], change))
+    regressions = [row for row in rows if row[4] > threshold]
+    return rows, regressions
+
+
+def build_parser():
+    p = argparse.ArgumentParser(
+        prog="python -m grafix.benchmark",
+        description="Pomiar wydajności operacji na obrazach (rozmiary × operacje).",
+    )
+    p.add_argument(
+        "--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+        help="boki obrazów testowych, np. 256 512 1024 … 8192",
+    )
+    p.add_argument("--ops", nargs="+", help="nazwy/grupy operacji (fragmenty nazw)")
+    p.add_argument("--repeat", type=int, default=3, help="liczba powtórzeń (najlepszy czas)")
+    p.add_argument("-o", "--output", help="zapis wyników do JSON")
+    p.add_argument("--baseline", help="JSON z wcześniejszego przebiegu do porównania")
+    p.add_argument(
+        "--threshold", type=float, default=0.10,
+        help="dopuszczalne spowolnienie względem bazy (0.10 = 10%%)",
+    )
+    p.add_argument("--list", action="store_true", help="lista przypadków")
+    return p
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.list:
+        for name, group, _prepare in CASES:
+            print(f"{group:12s} {name}")
+        return 0
+
+    report = run_benchmarks(args.sizes, args.ops, args.repeat, log=print)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows, regressions = compare(report, baseline, args.threshold)
+        print("\nPorównanie z bazą:")
+        for name, size, t_base, t_new, change in rows:
+            flag = "  REGRESJA" if change > args.threshold else ""
+            print(f"{name:18s} {size:>5d}²  {t_base * 1000:10.1f} → {t_new * 1000:10.1f} ms  {change:+7.1%}{flag}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+# grafix/bezier/curves.py
+"""
+Obliczanie punktów krzywej Béziera.
+
+- de_casteljau – definicja (punkt dla jednego t), punkt odniesienia,
+- bezier_points – krzywa próbkowana w steps+1 punktach:
+  * baza Bernsteina B[i][k] = C(n,k) t_i^k (1-t_i)^(n-k) liczona raz na
+    (stopień, steps) i trzymana w pamięci – krzywa to jeden iloczyn macierzy,
+  * dla odcinków sześciennych – różnice w przód (3 dodawania na punkt i oś),
+- change_degree – ten sam odcinek innego stopnia (podwyższenie dokładne,
+  obniżenie – interpolacja krzywej w t = i/n),
+- flatten – adaptacyjny podział: krzywa dzielona (de Casteljau, t = 1/2), aż
+  każdy kawałek odchyla się od swojej cięciwy o mniej niż tolerancja w pikselach;
+  liczba punktów łamanej rośnie z długością i krzywizną na ekranie.
+"""
+import operator
+from functools import lru_cache
+from math import comb
+
+FLATNESS_TOLERANCE = 0.5  # px
+MAX_SUBDIVISION_DEPTH = 16
+
+
+def de_casteljau(points, t):
+    """Algorytm de Casteljau dla zadanych punktów kontrolnych."""
+    pts = [(float(x), float(y)) for (x, y) in points]
+    m = len(pts)
+    for r in range(1, m):
+        for i in range(m - r):
+            x1, y1 = pts[i]
+            x2, y2 = pts[i + 1]
+            pts[i] = ((1 - t) * x1 + t * x2, (1 - t) * y1 + t * y2)
+    return pts[0]
+
+
+@lru_cache(maxsize=32)
+def bernstein_basis(degree, steps):
+    """Wiersze bazy Bernsteina dla t = i/steps, i = 0..steps (krotki długości degree+1)."""
+    n = degree
+    coef = [comb(n, k) for k in range(n + 1)]
+    rows = []
+    for i in range(steps + 1):
+        t = i / steps
+        u = 1.0 - t
+        rows.append(tuple(coef[k] * t**k * u ** (n - k) for k in range(n + 1)))
+    return tuple(rows)
+
+
+def bezier_points_basis(points, steps=200):
+    """Punkty krzywej jako iloczyn bazy Bernsteina i współrzędnych punktów kontrolnych."""
+    xs = [float(x) for x, _y in points]
+    ys = [float(y) for _x, y in points]
+    mul = operator.mul
+    return [
+        (sum(map(mul, row, xs)), sum(map(mul, row, ys)))
+        for row in bernstein_basis(len(points) - 1, steps)
+    ]
+
+
+def cubic_forward_diff(p0, p1, p2, p3, steps=200):
+    """
+    Odcinek sześcienny metodą różnic w przód: wielomian a·t³ + b·t² + c·t + d
+    w krokach h = 1/steps ma stałą trzecią różnicę, więc kolejne punkty
+    to tylko dodawania.
+    """
+    h = 1.0 / steps
+    out = []
+    for axis in (0, 1):
+        v0, v1, v2, v3 = p0[axis], p1[axis], p2[axis], p3[axis]
+        a = -v0 + 3 * v1 - 3 * v2 + v3
+        b = 3 * v0 - 6 * v1 + 3 * v2
+        c = -3 * v0 + 3 * v1
+        f = float(v0)
+        d1 = a * h**3 + b * h**2 + c * h
+        d2 = 6 * a * h**3 + 2 * b * h**2
+        d3 = 6 * a * h**3
+        vals = [f]
+        for _ in range(steps):
+            f += d1
+            d1 += d2
+            d2 += d3
+            vals.append(f)
+        vals[-1] = float(v3)  # koniec dokładnie w P3 (bez narosłego błędu)
+        out.append(vals)
+    return list(zip(out[0], out[1]))
+
+
+def bezier_points(points, steps=200):
+    """Zwraca listę steps+1 punktów (x,y) na krzywej Béziera."""
+    if len(points) < 2:
+        return []
+    if len(points) == 4:
+        return cubic_forward_diff(*points, steps=steps)
+    return bezier_points_basis(points, steps)
+
+
+def elevate_degree(points):
+    """Podwyższenie stopnia o 1 bez zmiany kształtu: Q_i = i/(n+1)·P_(i-1) + (1 − i/(n+1))·P_i."""
+    pts = [(float(x), float(y)) for x, y in points]
+    m = len(pts)  # n + 1
+    out = [pts[0]]
+    for i in range(1, m):
+        a = i / m
+        (x0, y0), (x1, y1) = pts[i - 1], pts[i]
+        out.append((a * x0 + (1 - a) * x1, a * y0 + (1 - a) * y1))
+    out.append(pts[-1])
+    return out
+
+
+def _solve(a, b):
+    """Układ a·x = b (eliminacja Gaussa z wyborem elementu głównego); b – wektory (x, y)."""
+    m = len(a)
+    a = [list(row) + list(rhs) for row, rhs in zip(a, b)]
+    for c in range(m):
+        p = max(range(c, m), key=lambda r: abs(a[r][c]))
+        a[c], a[p] = a[p], a[c]
+        piv = a[c][c]
+        for r in range(c + 1, m):
+            f = a[r][c] / piv
+            if f:
+                a[r] = [v - f * w for v, w in zip(a[r], a[c])]
+    x = [None] * m
+    for r in range(m - 1, -1, -1):
+        row = a[r]
+        sx = row[m] - sum(row[k] * x[k][0] for k in range(r + 1, m))
+        sy = row[m + 1] - sum(row[k] * x[k][1] for k in range(r + 1, m))
+        x[r] = (sx / row[r], sy / row[r])
+    return x
+
+
+def change_degree(points, n):
+    """
+    Punkty kontrolne odcinka stopnia n o tych samych końcach. Podwyższenie
+    zachowuje kształt dokładnie; przy obniżeniu nowa krzywa przechodzi przez
+    punkty starej dla t = i/n (kształt przybliżony).
+    """
+    d = len(points) - 1
+    if n == d:
+        return [(float(x), float(y)) for x, y in points]
+    if n > d:
+        pts = points
+        for _ in range(n - d):
+            pts = elevate_degree(pts)
+        return pts
+    samples = [de_casteljau(points, i / n) for i in range(n + 1)]
+    pts = _solve(bernstein_basis(n, n), samples)
+    pts[0] = samples[0]
+    pts[-1] = samples[-1]
+    return pts
+
+
+def split_half(points):
+    """Podział krzywej w t = 1/2 na dwie krzywe tego samego stopnia (de Casteljau)."""
+    pts = list(points)
+    left = [pts[0]]
+    right = [pts[-1]]
+    while len(pts) > 1:
+        pts = [
+            ((x1 + x2) * 0.5, (y1 + y2) * 0.5)
+            for (x1, y1), (x2, y2) in zip(pts, pts[1:])
+        ]
+        left.append(pts[0])
+        right.append(pts[-1])
+    right.reverse()
+    return left, right
+
+
+def is_flat(points, tolerance):
+    """
+    Wszystkie punkty kontrolne leżą w odległości ≤ tolerance od cięciwy
+    P0–Pn – krzywa leży w ich otoczce wypukłej, więc też mieści się w tolerancji.
+    """
+    x0, y0 = points[0]
+    x1, y1 = points[-1]
+    dx = x1 - x0
+    dy = y1 - y0
+    len2 = dx * dx + dy * dy
+    tol2 = tolerance * tolerance
+    for px, py in points[1:-1]:
+        ax = px - x0
+        ay = py - y0
+        dot = ax * dx + ay * dy
+        if dot <= 0 or len2 == 0:
+            d2 = ax * ax + ay * ay
+        elif dot >= len2:
+            bx = px - x1
+            by = py - y1
+            d2 = bx * bx + by * by
+        else:
+            cross = ax * dy - ay * dx
+            d2 = cross * cross / len2
+        if d2 > tol2:
+            return False
+    return True
+
+
+def flatten(points, tolerance=FLATNESS_TOLERANCE, max_depth=MAX_SUBDIVISION_DEPTH):
+    """
+    Krzywa jako zwarta łamana [(x, y), ...]: kawałki dzielone na pół, dopóki
+    nie są płaskie z dokładnością do `tolerance` pikseli (lub do max_depth).
+    """
+    if len(points) < 2:
+        return []
+    pts = [(float(x), float(y)) for x, y in points]
+    out = [pts[0]]
+    stack = [(pts, 0)]
+    while stack:
+        seg, depth = stack.pop()
+        if depth >= max_depth or is_flat(seg, tolerance):
+            out.append(seg[-1])
+            continue
+        left, right = split_half(seg)
+        # najpierw lewa połowa → punkty wychodzą w kolejności t
+        stack.append((right, depth + 1))
+        stack.append((left, depth + 1))
+    return out
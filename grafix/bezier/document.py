@@ -0,0 +1,167 @@
+# grafix/bezier/document.py
+"""
+Dokument edytora Béziera: wiele niezależnych krzywych kawałkami Béziera.
+
+- Spline – punkty P0..P(d·k), k odcinków stopnia d (domyślnie sześcienne)
+  połączonych końcami; łamana liczona i trzymana osobno dla każdego odcinka,
+  więc przesunięcie punktu przelicza tylko odcinki, które go używają (1–2),
+- PointGrid – wspólny dla wszystkich krzywych indeks punktów kontrolnych
+  (siatka kubełków, aktualizowana przy przesuwaniu punktu),
+- BezierDocument – krzywe + indeks; wskazywanie punktu to przejrzenie kilku
+  komórek siatki zamiast wszystkich punktów wszystkich krzywych.
+"""
+from .curves import FLATNESS_TOLERANCE, flatten
+
+PICK_CELL = 32  # bok komórki indeksu [px]
+
+
+class Spline:
+    def __init__(self, points, degree=3):
+        self.degree = max(1, int(degree))
+        self.points = [(float(x), float(y)) for x, y in points]
+        if (len(self.points) - 1) % self.degree:
+            raise ValueError(
+                f"Liczba punktów musi być równa {self.degree}·k + 1 (jest {len(self.points)})"
+            )
+        self._tol = None
+        self._polys = []
+
+    @property
+    def segments(self):
+        return (len(self.points) - 1) // self.degree
+
+    def segment(self, i):
+        d = self.degree
+        return self.points[i * d : i * d + d + 1]
+
+    def segments_of_point(self, i):
+        """Odcinki używające punktu i (węzeł łączy dwa sąsiednie)."""
+        d = self.degree
+        seg = min(i // d, self.segments - 1)
+        if i % d == 0 and 0 < i < len(self.points) - 1:
+            return (seg - 1, seg)
+        return (seg,)
+
+    def move_point(self, i, x, y):
+        self.points[i] = (float(x), float(y))
+        if self._tol is not None:
+            for s in self.segments_of_point(i):
+                self._polys[s] = None
+
+    def polyline(self, tolerance=FLATNESS_TOLERANCE):
+        """Łamana całej krzywej; odcinki spoza pamięci podręcznej liczone od nowa."""
+        if self._tol != tolerance:
+            self._tol = tolerance
+            self._polys = [None] * self.segments
+        out = []
+        for s, poly in enumerate(self._polys):
+            if poly is None:
+                poly = self._polys[s] = flatten(self.segment(s), tolerance)
+            # węzeł jest końcem poprzedniego i początkiem następnego odcinka
+            out.extend(poly if not out else poly[1:])
+        return out
+
+    def bbox(self):
+        xs = [x for x, _y in self.points]
+        ys = [y for _x, y in self.points]
+        return (min(xs), min(ys), max(xs), max(ys))
+
+
+class PointGrid:
+    """
+    Siatka kubełków nad punktami (klucz → (x, y)); w przeciwieństwie do
+    PickIndex (voxels) punkty można dodawać, usuwać i przesuwać.
+    """
+
+    def __init__(self, cell=PICK_CELL):
+        self.cell = cell
+        self._cells = {}  # (kol, wiersz) → {klucz: None} (kolejność wstawienia)
+        self._pos = {}  # klucz → (x, y, komórka)
+
+    def __len__(self):
+        return len(self._pos)
+
+    def _cell_of(self, x, y):
+        return (int(x // self.cell), int(y // self.cell))
+
+    def insert(self, key, x, y):
+        c = self._cell_of(x, y)
+        self._pos[key] = (x, y, c)
+        self._cells.setdefault(c, {})[key] = None
+
+    def remove(self, key):
+        _x, _y, c = self._pos.pop(key)
+        bucket = self._cells[c]
+        del bucket[key]
+        if not bucket:
+            del self._cells[c]
+
+    def move(self, key, x, y):
+        _x, _y, c = self._pos[key]
+        nc = self._cell_of(x, y)
+        if nc != c:
+            self.remove(key)
+            self.insert(key, x, y)
+        else:
+            self._pos[key] = (x, y, c)
+
+    def nearest(self, x, y, radius):
+        """Klucz najbliższego punktu w odległości ≤ radius albo None."""
+        c0, r0 = self._cell_of(x - radius, y - radius)
+        c1, r1 = self._cell_of(x + radius, y + radius)
+        best, best_d2 = None, radius * radius
+        cells, pos = self._cells, self._pos
+        for c in range(c0, c1 + 1):
+            for r in range(r0, r1 + 1):
+                for key in cells.get((c, r), ()):
+                    px, py, _c = pos[key]
+                    d2 = (px - x) * (px - x) + (py - y) * (py - y)
+                    if d2 <= best_d2:
+                        best, best_d2 = key, d2
+        return best
+
+
+class BezierDocument:
+    """Krzywe o identyfikatorach cid; klucze indeksu to (cid, indeks punktu)."""
+
+    def __init__(self, cell=PICK_CELL):
+        self.curves = {}  # cid → Spline (kolejność dodania = kolejność rysowania)
+        self.index = PointGrid(cell)
+        self._next_id = 1
+
+    def __len__(self):
+        return len(self.curves)
+
+    def add(self, points, degree=3):
+        cid = self._next_id
+        self._next_id += 1
+        self.curves[cid] = Spline(points, degree)
+        self._index_curve(cid)
+        return cid
+
+    def remove(self, cid):
+        self._unindex_curve(cid)
+        del self.curves[cid]
+
+    def set_points(self, cid, points, degree):
+        """Nowy zestaw punktów krzywej (zmiana stopnia, pola tekstowe, nowy odcinek)."""
+        spline = Spline(points, degree)
+        self._unindex_curve(cid)
+        self.curves[cid] = spline
+        self._index_curve(cid)
+
+    def move_point(self, cid, i, x, y):
+        self.curves[cid].move_point(i, x, y)
+        self.index.move((cid, i), x, y)
+
+    def pick(self, x, y, radius=10):
+        """(cid, indeks punktu) najbliższego punktu kontrolnego albo None."""
+        return self.index.nearest(x, y, radius)
+
+    def _index_curve(self, cid):
+        for i, (x, y) in enumerate(self.curves[cid].points):
+            self.index.insert((cid, i), x, y)
+
+    def _unindex_curve(self, cid):
+        for i in range(len(self.curves[cid].points)):
+            self.index.remove((cid, i))
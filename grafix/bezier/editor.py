@@ -3,40 +3,55 @@ import tkinter as tk
 from tkinter import ttk
 import math
 
+from .curves import FLATNESS_TOLERANCE, change_degree
+from .document import BezierDocument
+from ..shapes import BezierCurve
+
 
 class BezierEditorWindow(tk.Toplevel):
     """
-    Edytor krzywej Béziera:
-    - stopień podany przez użytkownika (spinbox),
-    - punkty kontrolne można przesuwać myszą,
-    - punkty można edytować w polach tekstowych,
-    - krzywa przeliczana i rysowana w czasie rzeczywistym.
+    Edytor krzywych Béziera:
+    - dokument z wieloma niezależnymi krzywymi kawałkami Béziera
+      (domyślnie odcinki sześcienne łączone końcami),
+    - stopień odcinka podany przez użytkownika (spinbox),
+    - punkty kontrolne dowolnej krzywej można przesuwać myszą
+      (wspólny indeks punktów – kliknięcie wybiera też aktywną krzywą),
+    - punkty aktywnej krzywej można edytować w polach tekstowych,
+    - krzywe przeliczane i rysowane w czasie rzeczywistym,
+    - eksport krzywych do sceny głównego okna.
     """
 
+    CANVAS_W = 500
+    CANVAS_H = 320
+
     def __init__(self, master_app):
         super().__init__(master_app)
         self.master_app = master_app
         self.title("Krzywa Béziera")
         self.resizable(False, False)
 
-        # stopień krzywej: n → liczba punktów kontrolnych = n+1
+        # stopień odcinka: n → odcinek ma n+1 punktów kontrolnych
         self.degree_var = tk.IntVar(value=3)
 
-        # lista punktów kontrolnych [(x,y), ...]
-        # startowo cztery punkty na przekątnej
-        self.control_points = [
-            (80, 250),
-            (180, 80),
-            (320, 80),
-            (420, 250),
-        ]
+        # dopuszczalne odchylenie łamanej od krzywej [px]
+        self.tolerance_var = tk.DoubleVar(value=FLATNESS_TOLERANCE)
+        self.curve_info = tk.StringVar(value="")
 
-        # obiekty Entry dla X,Y każdego punktu
+        # dokument z krzywymi; startowo jedna krzywa sześcienna
+        self.doc = BezierDocument()
+        self.active = self.doc.add([(80, 250), (180, 80), (320, 80), (420, 250)])
+
+        # obiekty Entry dla X,Y każdego punktu aktywnej krzywej
         self.cp_entries = []
 
-        # indeks aktualnie przeciąganego punktu (albo None)
+        # indeks aktualnie przeciąganego punktu aktywnej krzywej (albo None)
         self._drag_index = None
 
+        # trwałe elementy Canvas (tworzone przy pierwszym rysowaniu)
+        self._curve_items = {}  # cid → linia krzywej
+        self._polygon_item = None
+        self._handles = []  # [(owal, etykieta)] dla punktów aktywnej krzywej
+
         self._build_ui()
         self._rebuild_cp_entries()
         self._redraw_all()
@@ -44,6 +59,11 @@ class BezierEditorWindow(tk.Toplevel):
         # przy zamknięciu okna wyczyść wskaźnik w App
         self.protocol("WM_DELETE_WINDOW", self._on_close)
 
+    @property
+    def control_points(self):
+        """Punkty kontrolne aktywnej krzywej."""
+        return self.doc.curves[self.active].points
+
     # ------------------------------------------------------------------ UI --
 
     def _build_ui(self):
@@ -69,11 +89,37 @@ class BezierEditorWindow(tk.Toplevel):
             top, text="Zastosuj punkty z pól", command=self._apply_from_entries
         ).pack(side="left", padx=8)
 
+        ttk.Label(top, text="Tolerancja [px]:").pack(side="left")
+        ttk.Spinbox(
+            top,
+            from_=0.1,
+            to=5.0,
+            increment=0.1,
+            width=4,
+            textvariable=self.tolerance_var,
+            command=self._redraw_all,
+        ).pack(side="left", padx=4)
+
+        # panel krzywych dokumentu
+        curves = ttk.Frame(main)
+        curves.pack(fill="x", pady=(0, 6))
+        ttk.Button(curves, text="Nowa krzywa", command=self._new_curve).pack(side="left")
+        ttk.Button(curves, text="Dodaj odcinek", command=self._append_segment).pack(
+            side="left", padx=4
+        )
+        ttk.Button(curves, text="Usuń krzywą", command=self._delete_curve).pack(
+            side="left"
+        )
+        ttk.Button(
+            curves, text="Eksportuj do sceny", command=self._export_to_scene
+        ).pack(side="left", padx=8)
+        ttk.Label(curves, textvariable=self.curve_info).pack(side="left", padx=4)
+
         # Środkowy panel: canvas na krzywą + punkty kontrolne
         self.canvas = tk.Canvas(
             main,
-            width=500,
-            height=320,
+            width=self.CANVAS_W,
+            height=self.CANVAS_H,
             bg="white",
             highlightthickness=1,
             highlightbackground="#ccc",
@@ -98,8 +144,9 @@ class BezierEditorWindow(tk.Toplevel):
 
     def _on_degree_changed(self):
         """
-        Użytkownik zmienił stopień n → liczba punktów = n+1.
-        Ucinamy lub dodajemy punkty.
+        Użytkownik zmienił stopień n → każdy odcinek aktywnej krzywej staje się
+        odcinkiem stopnia n o tych samych węzłach. Podwyższenie nie zmienia
+        kształtu, obniżenie go przybliża (curves.change_degree).
         """
         try:
             n = int(self.degree_var.get())
@@ -111,24 +158,16 @@ class BezierEditorWindow(tk.Toplevel):
             n = 10
         self.degree_var.set(n)
 
-        needed = n + 1
-        current = len(self.control_points)
-
-        if current > needed:
-            # utnij nadmiar
-            self.control_points = self.control_points[:needed]
-        elif current < needed:
-            # dodaj brakujące punkty mniej więcej równomiernie na linii
-            w = 500
-            h = 320
-            for i in range(current, needed):
-                t = i / max(1, needed - 1)
-                x = 50 + t * (w - 100)
-                y = h / 2
-                self.control_points.append((x, y))
+        spline = self.doc.curves[self.active]
+        if n == spline.degree:
+            return
+        points = [spline.points[0]]
+        for s in range(spline.segments):
+            points.extend(change_degree(spline.segment(s), n)[1:])
 
+        self.doc.set_points(self.active, points, n)
         self._rebuild_cp_entries()
-        self._redraw_all()
+        self._redraw_active()
 
     def _rebuild_cp_entries(self):
         """Buduje od nowa pola tekstowe dla punktów kontrolnych."""
@@ -155,7 +194,7 @@ class BezierEditorWindow(tk.Toplevel):
 
     def _apply_from_entries(self):
         """
-        Przepisuje współrzędne punktów z pól tekstowych do listy control_points.
+        Przepisuje współrzędne punktów z pól tekstowych do aktywnej krzywej.
         """
         new_points = []
         try:
@@ -175,128 +214,198 @@ class BezierEditorWindow(tk.Toplevel):
             )
             return
 
-        self.control_points = new_points
-        # zaktualizuj stopień = liczba punktów - 1
-        n = len(self.control_points) - 1
-        if n < 1:
-            n = 1
-        if n > 10:
-            n = 10
+        # stopień odcinka bez zmian, o ile liczba punktów do niego pasuje
+        n = self.doc.curves[self.active].degree
+        if (len(new_points) - 1) % n:
+            n = len(new_points) - 1
+        self.doc.set_points(self.active, new_points, n)
         self.degree_var.set(n)
         self._rebuild_cp_entries()
-        self._redraw_all()
+        self._redraw_active()
 
     def _update_entries_from_points(self):
         """Aktualizuje tekst w Entry na podstawie aktualnych control_points."""
-        for (ex, ey), (x, y) in zip(self.cp_entries, self.control_points):
-            ex.delete(0, "end")
-            ex.insert(0, str(int(round(x))))
-            ey.delete(0, "end")
-            ey.insert(0, str(int(round(y))))
+        for idx in range(min(len(self.cp_entries), len(self.control_points))):
+            self._update_entry(idx)
+
+    def _update_entry(self, idx):
+        if idx >= len(self.cp_entries):
+            return
+        ex, ey = self.cp_entries[idx]
+        x, y = self.control_points[idx]
+        ex.delete(0, "end")
+        ex.insert(0, str(int(round(x))))
+        ey.delete(0, "end")
+        ey.insert(0, str(int(round(y))))
+
+    # -------------------------------------------------- krzywe dokumentu --
+
+    def _clamp(self, x, y):
+        return (
+            max(0, min(x, self.CANVAS_W)),
+            max(0, min(y, self.CANVAS_H)),
+        )
+
+    def _new_curve(self):
+        """Nowa krzywa sześcienna (przesunięta względem poprzednich) jako aktywna."""
+        k = len(self.doc) % 8
+        dx, dy = 20 * k, 15 * k
+        points = [
+            self._clamp(x + dx, y + dy)
+            for x, y in ((60, 200), (140, 60), (260, 60), (340, 200))
+        ]
+        cid = self.doc.add(points, 3)
+        self._sync_curve_item(cid)
+        self._set_active(cid)
+
+    def _append_segment(self):
+        """
+        Dokłada do aktywnej krzywej odcinek tego samego stopnia. Nowe punkty
+        leżą na przedłużeniu ostatniego boku wielokąta kontrolnego, więc styczna
+        w węźle jest ciągła.
+        """
+        spline = self.doc.curves[self.active]
+        (qx, qy), (lx, ly) = spline.points[-2], spline.points[-1]
+        vx, vy = lx - qx, ly - qy
+        if math.hypot(vx, vy) < 1:
+            vx, vy = 40.0, 0.0
+        points = list(spline.points)
+        for k in range(1, spline.degree + 1):
+            points.append(self._clamp(lx + k * vx, ly + k * vy))
+        self.doc.set_points(self.active, points, spline.degree)
+        self._rebuild_cp_entries()
+        self._redraw_active()
+
+    def _delete_curve(self):
+        if len(self.doc) <= 1:
+            tk.messagebox.showinfo("Bézier", "Dokument musi zawierać co najmniej jedną krzywą.")
+            return
+        cid = self.active
+        self.canvas.delete(self._curve_items.pop(cid))
+        self.doc.remove(cid)
+        self._set_active(next(reversed(self.doc.curves)))
+
+    def _set_active(self, cid):
+        """Zmiana aktywnej krzywej: styl linii, uchwyty, pola tekstowe, stopień."""
+        old = self.active
+        self.active = cid
+        if old in self._curve_items:
+            self.canvas.itemconfigure(self._curve_items[old], fill="#8fa8e8", width=1)
+        self.degree_var.set(self.doc.curves[cid].degree)
+        self._rebuild_cp_entries()
+        self._redraw_active()
+
+    def _export_to_scene(self):
+        """Krzywe dokumentu jako kształty sceny (rasteryzacja odcinkami Bresenhama)."""
+        app = self.master_app
+        for spline in self.doc.curves.values():
+            app._add_object(BezierCurve(spline.points, spline.degree))
+        app._push_history(f"Eksport krzywych Béziera ({len(self.doc)})")
 
     # -------------------------------------------------- obsługa myszy ----
 
     def _on_canvas_down(self, event):
         """
         Kliknięcie:
-        - jeśli blisko jakiegoś punktu kontrolnego → zaczynamy go przeciągać.
+        - jeśli blisko punktu kontrolnego dowolnej krzywej → krzywa staje się
+          aktywna i zaczynamy przeciągać punkt.
         """
-        x, y = event.x, event.y
-        idx = self._find_point_near(x, y, radius=10)
+        hit = self.doc.pick(event.x, event.y, radius=10)
+        if hit is None:
+            self._drag_index = None
+            return
+        cid, idx = hit
+        if cid != self.active:
+            self._set_active(cid)
         self._drag_index = idx
 
     def _on_canvas_drag(self, event):
         if self._drag_index is None:
             return
-        x, y = event.x, event.y
         # ogranicz lekko do obszaru canvasa
-        x = max(0, min(x, int(self.canvas["width"])))
-        y = max(0, min(y, int(self.canvas["height"])))
-        pts = list(self.control_points)
-        pts[self._drag_index] = (x, y)
-        self.control_points = pts
-        # aktualizacja pól tekstowych i rysunku w czasie rzeczywistym
-        self._update_entries_from_points()
-        self._redraw_all()
+        x, y = self._clamp(event.x, event.y)
+        self.doc.move_point(self.active, self._drag_index, x, y)
+        # aktualizacja pola tekstowego i rysunku w czasie rzeczywistym
+        self._update_entry(self._drag_index)
+        self._update_lines()
+        self._move_handle(self._drag_index)
 
     def _on_canvas_up(self, event):
         self._drag_index = None
 
-    def _find_point_near(self, x, y, radius=10):
-        """
-        Zwraca indeks punktu kontrolnego, który jest najbliżej (x,y),
-        jeśli odległość <= radius; w przeciwnym razie None.
-        """
-        best = None
-        best_d2 = radius * radius
-        for i, (px, py) in enumerate(self.control_points):
-            dx = px - x
-            dy = py - y
-            d2 = dx * dx + dy * dy
-            if d2 <= best_d2:
-                best_d2 = d2
-                best = i
-        return best
-
     # ---------------------------------------------------- rysowanie -----
 
-    def _redraw_all(self):
-        self.canvas.delete("all")
+    # Elementy Canvas są trwałe: każda krzywa to jedna linia (create_line
+    # z wszystkimi punktami łamanej). Wielokąt kontrolny (też jedna linia)
+    # i uchwyty (owal + etykieta) są tylko dla aktywnej krzywej.
+    # Przeciąganie zmienia tylko coords – 2 linie + 2 elementy uchwytu.
 
-        if len(self.control_points) < 2:
-            return
+    HANDLE_R = 5
 
-        # rysuj wielokąt kontrolny (łączący punkty)
-        for i in range(len(self.control_points) - 1):
-            x1, y1 = self.control_points[i]
-            x2, y2 = self.control_points[i + 1]
-            self.canvas.create_line(x1, y1, x2, y2, fill="#cccccc", dash=(4, 2))
-
-        # rysuj krzywą Béziera (De Casteljau)
-        curve_points = self._compute_bezier_points(self.control_points, steps=200)
-        if len(curve_points) >= 2:
-            for i in range(len(curve_points) - 1):
-                x1, y1 = curve_points[i]
-                x2, y2 = curve_points[i + 1]
-                self.canvas.create_line(x1, y1, x2, y2, fill="#0040ff", width=2)
-
-        # rysuj punkty kontrolne
-        for idx, (x, y) in enumerate(self.control_points):
-            r = 5
-            self.canvas.create_oval(
-                x - r,
-                y - r,
-                x + r,
-                y + r,
-                fill="#ff0000",
-                outline="black",
-            )
-            self.canvas.create_text(
-                x + 12, y, text=f"P{idx}", anchor="w", fill="#000000", font=("", 8)
-            )
+    def _tolerance(self):
+        try:
+            tol = float(self.tolerance_var.get())
+        except (tk.TclError, ValueError):
+            tol = FLATNESS_TOLERANCE
+        return max(0.05, tol)
 
-    def _compute_bezier_points(self, points, steps=200):
-        """Zwraca listę punktów (x,y) na krzywej Béziera."""
-        n = len(points)
-        if n < 2:
-            return []
-
-        res = []
-        for i in range(steps + 1):
-            t = i / steps
-            x, y = self._de_casteljau(points, t)
-            res.append((x, y))
-        return res
-
-    def _de_casteljau(self, points, t):
-        """Algorytm de Casteljau dla zadanych punktów kontrolnych."""
-        pts = [(float(x), float(y)) for (x, y) in points]
-        m = len(pts)
-        for r in range(1, m):
-            for i in range(m - r):
-                x1, y1 = pts[i]
-                x2, y2 = pts[i + 1]
-                x = (1 - t) * x1 + t * x2
-                y = (1 - t) * y1 + t * y2
-                pts[i] = (x, y)
-        return pts[0]
+    def _redraw_all(self):
+        """Pełne odświeżenie wszystkich krzywych (start, zmiana tolerancji)."""
+        for cid in self.doc.curves:
+            self._sync_curve_item(cid)
+        self._redraw_active()
+
+    def _redraw_active(self):
+        """Odświeżenie aktywnej krzywej (stopień, pola tekstowe, nowy odcinek)."""
+        c = self.canvas
+        if self._polygon_item is None:
+            self._polygon_item = c.create_line(0, 0, 0, 0, fill="#cccccc", dash=(4, 2))
+        c.tag_raise(self._polygon_item)
+        self._sync_curve_item(self.active)
+        c.itemconfigure(self._curve_items[self.active], fill="#0040ff", width=2)
+        c.tag_raise(self._curve_items[self.active])
+
+        if len(self._handles) != len(self.control_points):
+            for oval, label in self._handles:
+                c.delete(oval, label)
+            self._handles = []
+            for idx in range(len(self.control_points)):
+                oval = c.create_oval(0, 0, 0, 0, fill="#ff0000", outline="black")
+                label = c.create_text(
+                    0, 0, text=f"P{idx}", anchor="w", fill="#000000", font=("", 8)
+                )
+                self._handles.append((oval, label))
+        for oval, label in self._handles:
+            c.tag_raise(oval)
+            c.tag_raise(label)
+
+        self._update_lines()
+        for idx in range(len(self.control_points)):
+            self._move_handle(idx)
+
+    def _sync_curve_item(self, cid):
+        """Linia krzywej cid (tworzona przy pierwszym użyciu) z bieżącą łamaną."""
+        poly = self.doc.curves[cid].polyline(self._tolerance())
+        coords = [v for p in poly for v in p]
+        item = self._curve_items.get(cid)
+        if item is None:
+            item = self._curve_items[cid] = self.canvas.create_line(
+                coords, fill="#8fa8e8", width=1
+            )
+        else:
+            self.canvas.coords(item, coords)
+        return poly
+
+    def _update_lines(self):
+        """Nowe współrzędne wielokąta kontrolnego i łamanej aktywnej krzywej."""
+        pts = self.control_points
+        self.canvas.coords(self._polygon_item, [v for p in pts for v in p])
+        poly = self._sync_curve_item(self.active)
+        self.curve_info.set(f"krzywe: {len(self.doc)}, punkty łamanej: {len(poly)}")
+
+    def _move_handle(self, idx):
+        x, y = self.control_points[idx]
+        r = self.HANDLE_R
+        oval, label = self._handles[idx]
+        self.canvas.coords(oval, x - r, y - r, x + r, y + r)
+        self.canvas.coords(label, x + 12, y)
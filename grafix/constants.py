@@ -4,6 +4,7 @@ APP_SIZE = "1000x650"
 COL_LINE = "#1f77b4"
 COL_RECT = "#2ca02c"
 COL_CIRC = "#d62728"
+COL_BEZIER = "#9467bd"
 COL_PREV = "#888888"
 COL_SEL = "#ffa500"
 
@@ -1,5 +1,7 @@
 import math
 
+from .planes import cached_plane
+
 
 def _clamp_byte(v: float) -> int:
     v = int(round(v))
@@ -118,10 +120,7 @@ def filter_median(pixels, w, h, size=3):
 
 
 def _to_gray_avg(pixels):
-    g_list = []
-    for r, g, b in pixels:
-        g_list.append(int(round((r + g + b) / 3.0)))
-    return g_list
+    return cached_plane(pixels, "avg")
 
 
 def filter_sobel(pixels, w, h):
@@ -1,14 +1,23 @@
 import math
+from collections import Counter
+from itertools import chain
 
+from .planes import cached_plane, luma_plane, plane_histogram
 
-def _luma(r, g, b):
-    """Luminancja (0..255) – używana do histogramu."""
-    y = 0.299 * r + 0.587 * g + 0.114 * b
-    if y < 0:
-        y = 0
-    elif y > 255:
-        y = 255
-    return int(round(y))
+
+def _luma_list(pixels):
+    """Jasność (0..255) każdego piksela – plan współdzielony z progowaniem."""
+    return cached_plane(pixels, "luma")
+
+
+def _histogram_of(gray):
+    return plane_histogram(gray)
+
+
+def _apply_gray_mapping(gray, mapping):
+    """Mapowanie jasności przez LUT (256 wartości) → piksele szare (v,v,v)."""
+    lut = [(v, v, v) for v in mapping]
+    return [lut[y] for y in gray]
 
 
 def compute_histogram(pixels):
@@ -16,11 +25,86 @@ def compute_histogram(pixels):
     Zwraca histogram (lista 256 elementów) zliczający wystąpienia jasności (luminancja).
     pixels: lista (R,G,B).
     """
-    hist = [0] * 256
-    for r, g, b in pixels:
-        y = _luma(r, g, b)
-        hist[y] += 1
-    return hist
+    return _histogram_of(_luma_list(pixels))
+
+
+# ---------- histogramy kanałów (R, G, B, luma, odcień) ----------
+
+HIST_CHANNELS = ("luma", "r", "g", "b", "hue")
+HUE_BINS = 360  # odcień w stopniach
+
+
+def color_histograms(pixels):
+    """
+    Histogramy R, G, B, jasności (256 binów) i odcienia H (360 binów, stopnie)
+    w jednym przebiegu: piksele zliczane są w C (Counter), a potem każdy
+    unikalny kolor dokładany jest do wszystkich histogramów naraz.
+    Piksele szare (S = 0) nie mają odcienia – nie trafiają do histogramu H.
+    """
+    counts = Counter(pixels)
+    colors = list(counts)
+    hr, hg, hb, hy = [0] * 256, [0] * 256, [0] * 256, [0] * 256
+    hh = [0] * HUE_BINS
+    for (r, g, b), n, y in zip(colors, counts.values(), luma_plane(colors)):
+        hr[r] += n
+        hg[g] += n
+        hb[b] += n
+        hy[y] += n
+        mx = max(r, g, b)
+        d = mx - min(r, g, b)
+        if d:
+            if mx == r:
+                hue = ((g - b) / d) % 6.0
+            elif mx == g:
+                hue = (b - r) / d + 2.0
+            else:
+                hue = (r - g) / d + 4.0
+            hh[int(hue * 60.0) % HUE_BINS] += n
+    return {"luma": hy, "r": hr, "g": hg, "b": hb, "hue": hh}
+
+
+class HistogramTracker:
+    """
+    Histogramy obrazu liczone w pasach po `band_rows` wierszy.
+    Przy kolejnym update() przeliczane są tylko pasy, których piksele się
+    zmieniły; pozostałe histogramy są brane z poprzedniego wywołania.
+    Pas rozpoznawany jest po skrócie (hash bajtów RGB pasa, liczony w C) –
+    bez trzymania kopii pikseli.
+    """
+
+    def __init__(self, band_rows=32):
+        self.band_rows = band_rows
+        self._w = None
+        self._bands = []  # [(skrót pasa, histogramy pasa)]
+        self.recomputed = 0  # ile pasów przeliczono w ostatnim update()
+
+    @property
+    def band_count(self):
+        return len(self._bands)
+
+    def update(self, pixels, w, h):
+        if w != self._w:
+            self._w = w
+            self._bands = []
+        step = max(1, self.band_rows * w)
+        old = self._bands
+        bands = []
+        self.recomputed = 0
+        for i, a in enumerate(range(0, w * h, step)):
+            chunk = pixels[a : a + step]
+            digest = (len(chunk), hash(bytes(chain.from_iterable(chunk))))
+            if i < len(old) and old[i][0] == digest:
+                bands.append(old[i])
+            else:
+                bands.append((digest, color_histograms(chunk)))
+                self.recomputed += 1
+        self._bands = bands
+        if not bands:
+            return color_histograms([])
+        return {
+            ch: [sum(col) for col in zip(*(b[1][ch] for b in bands))]
+            for ch in HIST_CHANNELS
+        }
 
 
 def histogram_stretch(pixels):
@@ -28,7 +112,8 @@ def histogram_stretch(pixels):
     Rozszerzenie histogramu – przeskalowanie luminancji tak, aby min → 0, max → 255.
     Wynik jest w skali szarości (R=G=B=luminancja).
     """
-    hist = compute_histogram(pixels)
+    gray = _luma_list(pixels)
+    hist = _histogram_of(gray)
     total = sum(hist)
     if total == 0:
         return pixels[:]
@@ -62,23 +147,12 @@ def histogram_stretch(pixels):
             v = 255
         mapping[i] = v
 
-    out = []
-    for r, g, b in pixels:
-        y = _luma(r, g, b)
-        v = mapping[y]
-        out.append((v, v, v))
-    return out
+    return _apply_gray_mapping(gray, mapping)
 
 
-def histogram_equalize(pixels):
-    """
-    Wyrównanie histogramu (histogram equalization) na luminancji.
-    Wynik jest w skali szarości (R=G=B=luminancja).
-    """
-    hist = compute_histogram(pixels)
+def _equalize_mapping(hist):
+    """LUT equalizacji (256 wartości) z histogramu albo None, gdy histogram jest zbyt wąski."""
     total = sum(hist)
-    if total == 0:
-        return pixels[:]
 
     # CDF (dystrybuanta)
     cdf = [0] * 256
@@ -90,12 +164,7 @@ def histogram_equalize(pixels):
     # najmniejsza wartość CDF > 0
     cdf_min = next((c for c in cdf if c > 0), 0)
     if cdf_min == 0 or cdf[-1] == cdf_min:
-        # obraz o bardzo wąskim histogramie → zwróć jak jest (w szarościach)
-        out = []
-        for r, g, b in pixels:
-            y = _luma(r, g, b)
-            out.append((y, y, y))
-        return out
+        return None
 
     denom = total - cdf_min
     mapping = [0] * 256
@@ -111,10 +180,231 @@ def histogram_equalize(pixels):
         elif val > 255:
             val = 255
         mapping[i] = val
+    return mapping
+
+
+def histogram_equalize(pixels):
+    """
+    Wyrównanie histogramu (histogram equalization) na luminancji.
+    Wynik jest w skali szarości (R=G=B=luminancja).
+    """
+    gray = _luma_list(pixels)
+    hist = _histogram_of(gray)
+    if sum(hist) == 0:
+        return pixels[:]
+
+    mapping = _equalize_mapping(hist)
+    if mapping is None:
+        # obraz o bardzo wąskim histogramie → zwróć jak jest (w szarościach)
+        return _apply_gray_mapping(gray, range(256))
+    return _apply_gray_mapping(gray, mapping)
 
+
+# ---------- equalizacja z zachowaniem koloru ----------
+
+# r + d dla d ∈ [-255, 255] → obcięte do 0..255 (indeks przesunięty o 255)
+_CLAMP = bytes(min(255, max(0, i - 255)) for i in range(766))
+
+
+def _reinsert_luma(pixels, gray, new_gray):
+    """
+    Nowa jasność przy zachowanej chrominancji (YCbCr): do każdego kanału dodajemy
+    ΔY = Y' − Y (Cb ∝ B − Y i Cr ∝ R − Y się nie zmieniają), z obcięciem do 0..255.
+    """
+    C = _CLAMP
+    return [
+        (C[r + d], C[g + d], C[b + d])
+        for (r, g, b), d in zip(
+            pixels, [ny - y + 255 for y, ny in zip(gray, new_gray)]
+        )
+    ]
+
+
+def histogram_equalize_color(pixels, space="ycbcr"):
+    """
+    Equalizacja histogramu bez utraty koloru:
+    - space="ycbcr": equalizacja luminancji Y, chrominancja Cb/Cr zachowana,
+    - space="hsv": equalizacja V = max(R,G,B), odcień i nasycenie zachowane.
+    """
+    if space not in ("ycbcr", "hsv"):
+        raise ValueError(f"Nieznana przestrzeń barw: {space}")
+    if not pixels:
+        return pixels[:]
+
+    if space == "ycbcr":
+        gray = _luma_list(pixels)
+        mapping = _equalize_mapping(_histogram_of(gray))
+        if mapping is None:
+            return pixels[:]
+        return _reinsert_luma(pixels, gray, gray.translate(bytes(mapping)))
+
+    vals = bytes([max(p) for p in pixels])
+    mapping = _equalize_mapping(_histogram_of(vals))
+    if mapping is None:
+        return pixels[:]
+    # skala kanałów f = V'/V dla każdej wartości V (S i H się nie zmieniają)
+    scale = [mapping[v] / v if v else 0.0 for v in range(256)]
+    out = []
+    for (r, g, b), v in zip(pixels, vals):
+        if v == 0:
+            m = mapping[0]
+            out.append((m, m, m))
+            continue
+        f = scale[v]
+        out.append((int(r * f + 0.5), int(g * f + 0.5), int(b * f + 0.5)))
+    return out
+
+
+# ---------- CLAHE (equalizacja adaptacyjna z limitem kontrastu) ----------
+
+
+def _clip_histogram(hist, limit):
+    """Obcina biny do `limit`, nadmiar rozkłada równo na wszystkie biny."""
+    excess = 0
     out = []
-    for r, g, b in pixels:
-        y = _luma(r, g, b)
-        v = mapping[y]
-        out.append((v, v, v))
+    for c in hist:
+        if c > limit:
+            excess += c - limit
+            out.append(limit)
+        else:
+            out.append(c)
+    if excess:
+        add, rest = divmod(excess, 256)
+        out = [c + add for c in out]
+        # reszta – co `step` binów, równomiernie po całym zakresie
+        if rest:
+            step = 256 // rest
+            for i in range(0, rest * step, step):
+                out[i] += 1
     return out
+
+
+def _tile_lut(hist, n, clip_limit):
+    """LUT kafla: obcięty histogram → dystrybuanta przeskalowana do 0..255."""
+    if n == 0:
+        return list(range(256))
+    if clip_limit > 0:
+        limit = max(1, int(clip_limit * n / 256))
+        hist = _clip_histogram(hist, limit)
+    scale = 255.0 / n
+    lut = []
+    cum = 0
+    for c in hist:
+        cum += c
+        lut.append(min(255, int(cum * scale + 0.5)))
+    return lut
+
+
+def _grid_weights(size, tiles):
+    """
+    Dla każdej współrzędnej: (indeks kafla lewego/górnego, prawego/dolnego, waga).
+    Interpolacja między środkami kafli; przed pierwszym i za ostatnim środkiem
+    używany jest tylko najbliższy kafel.
+    """
+    tile = size / tiles
+    out = []
+    for x in range(size):
+        t = (x + 0.5) / tile - 0.5  # pozycja względem środków kafli
+        i0 = int(math.floor(t))
+        frac = t - i0
+        if i0 < 0:
+            out.append((0, 0, 0.0))
+        elif i0 >= tiles - 1:
+            out.append((tiles - 1, tiles - 1, 0.0))
+        else:
+            out.append((i0, i0 + 1, frac))
+    return out
+
+
+CLAHE_WEIGHT_LEVELS = 32  # poziomy kwantyzacji wag interpolacji (błąd wagi ≤ 1/64)
+
+
+def clahe_gray(gray, w, h, tiles=8, clip_limit=2.0, levels=CLAHE_WEIGHT_LEVELS):
+    """
+    CLAHE na planie jasności (bytes) → nowy plan jasności (bytes).
+    - histogramy kafli tiles×tiles liczone w jednym przebiegu (Counter na kaflu),
+    - LUT kafla z histogramu obciętego do clip_limit·(średnia liczność binu),
+    - wynik: interpolacja dwuliniowa LUT-ów czterech najbliższych kafli.
+    Wagi interpolacji są kwantyzowane do `levels` poziomów, więc dla każdej
+    (pary kafli, poziomu wagi) powstaje gotowa tablica 256 bajtów, a ciąg
+    pikseli o tej samej wadze przechodzi przez bytes.translate (w C).
+    """
+    tx = max(1, min(int(tiles), w))
+    ty = max(1, min(int(tiles), h))
+    xs = [(i * w) // tx for i in range(tx + 1)]
+    ys = [(j * h) // ty for j in range(ty + 1)]
+
+    # LUT-y kafli
+    luts = []
+    for j in range(ty):
+        row_luts = []
+        for i in range(tx):
+            x0, x1 = xs[i], xs[i + 1]
+            data = b"".join(
+                gray[y * w + x0 : y * w + x1] for y in range(ys[j], ys[j + 1])
+            )
+            row_luts.append(_tile_lut(plane_histogram(data), len(data), clip_limit))
+        luts.append(row_luts)
+
+    def quantized(weights):
+        return [(i0, i1, int(wt * levels + 0.5)) for i0, i1, wt in weights]
+
+    cols = quantized(_grid_weights(w, tx))
+    rows = quantized(_grid_weights(h, ty))
+    # kolumny pogrupowane w odcinki o tej samej parze kafli i poziomie wagi
+    runs = []
+    start = 0
+    for x in range(1, w + 1):
+        if x == w or cols[x] != cols[start]:
+            runs.append((start, x) + cols[start])
+            start = x
+
+    vert = {}  # (j0, j1, ky, i) → (LUT kafla i zmieszany pionowo + 0.5, floaty)
+    row_tables = {}  # (j0, j1, ky) → [(x0, x1, tablica 256 bajtów), ...]
+
+    def mixed(j0, j1, ky, i):
+        v = vert.get((j0, j1, ky, i))
+        if v is None:
+            wy = ky / levels
+            top, bot = luts[j0][i], luts[j1][i]
+            v = vert[(j0, j1, ky, i)] = [t + wy * (b - t) + 0.5 for t, b in zip(top, bot)]
+        return v
+
+    def tables_for(j0, j1, ky):
+        out_runs = []
+        for x0, x1, i0, i1, kx in runs:
+            a = mixed(j0, j1, ky, i0)
+            if kx == 0:
+                table = bytes([int(v) for v in a])
+            else:
+                wx = kx / levels
+                table = bytes(
+                    [int(u + wx * (v - u)) for u, v in zip(a, mixed(j0, j1, ky, i1))]
+                )
+            out_runs.append((x0, x1, table))
+        return out_runs
+
+    out = bytearray(w * h)
+    for y in range(h):
+        key = rows[y]
+        row = row_tables.get(key)
+        if row is None:
+            row = row_tables[key] = tables_for(*key)
+        base = y * w
+        for x0, x1, table in row:
+            out[base + x0 : base + x1] = gray[base + x0 : base + x1].translate(table)
+    return bytes(out)
+
+
+def histogram_clahe(pixels, w, h, tiles=8, clip_limit=2.0, color=True):
+    """
+    Equalizacja adaptacyjna z ograniczeniem kontrastu (CLAHE) na luminancji.
+    color=True – chrominancja zachowana (YCbCr), False – wynik w skali szarości.
+    """
+    if not pixels:
+        return pixels[:]
+    gray = _luma_list(pixels)
+    new_gray = clahe_gray(gray, w, h, tiles, clip_limit)
+    if color:
+        return _reinsert_luma(pixels, gray, new_gray)
+    return _apply_gray_mapping(new_gray, range(256))
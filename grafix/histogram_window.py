@@ -0,0 +1,140 @@
+import tkinter as tk
+from tkinter import ttk
+import colorsys
+
+from .histogram import HistogramTracker
+
+
+class HistogramWindow(tk.Toplevel):
+    """
+    Okno histogramu obrazu (jasność, R, G, B, odcień H):
+    - odświeża się samo, gdy zmienią się piksele obrazu (wersja pikseli),
+    - słupki są tworzone raz na kanał – przy odświeżeniu zmienia się tylko coords,
+    - histogramy przeliczane są tylko dla zmienionych pasów obrazu.
+    """
+
+    WIDTH = 512
+    HEIGHT = 200
+    POLL_MS = 250  # co ile sprawdzamy wersję pikseli
+
+    CHANNELS = (
+        ("luma", "Jasność"),
+        ("r", "R"),
+        ("g", "G"),
+        ("b", "B"),
+        ("hue", "Odcień H"),
+    )
+    COLORS = {"luma": "#444", "r": "#c33", "g": "#3a3", "b": "#33c"}
+
+    def __init__(self, master, image):
+        super().__init__(master)
+        self.master_app = master
+        self.image = image
+        self.title("Histogram")
+        self.resizable(False, False)
+
+        self.channel = tk.StringVar(value="luma")
+        self.tracker = HistogramTracker()
+        self._hists = None
+        self._key = None  # (id obrazu, wersja pikseli) ostatnio policzonych histogramów
+        self._bars = []
+        self._bars_channel = None
+        self._after_id = None
+
+        self._build_ui()
+        self._poll()
+
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
+    def _on_close(self):
+        if self._after_id is not None:
+            self.after_cancel(self._after_id)
+        if getattr(self.master_app, "histogram_win", None) is self:
+            self.master_app.histogram_win = None
+        self.destroy()
+
+    # --- UI ---
+
+    def _build_ui(self):
+        top = ttk.Frame(self, padding=(6, 6, 6, 0))
+        top.pack(fill="x")
+        for key, label in self.CHANNELS:
+            ttk.Radiobutton(
+                top,
+                text=label,
+                value=key,
+                variable=self.channel,
+                command=self._draw,
+            ).pack(side="left", padx=2)
+
+        self.cv = tk.Canvas(self, width=self.WIDTH, height=self.HEIGHT, bg="white")
+        self.cv.pack(fill="both", expand=True)
+        self.cv.create_line(
+            0, self.HEIGHT - 1, self.WIDTH, self.HEIGHT - 1, fill="black"
+        )
+        self._info = self.cv.create_text(10, 10, anchor="nw", text="", fill="black")
+
+    # --- dane ---
+
+    def _current_image(self):
+        """Śledzony obraz; po Undo/usunięciu – aktualnie zaznaczony obraz."""
+        from .shapes.image import RasterImage
+
+        app = self.master_app
+        if any(o is self.image for o in app.objects):
+            return self.image
+        sel = app.sel.obj
+        if isinstance(sel, RasterImage):
+            self.image = sel
+            return sel
+        return None
+
+    def _poll(self):
+        img = self._current_image()
+        if img is not None:
+            key = (id(img), img.pixels_version)
+            if key != self._key:
+                self._key = key
+                self._hists = self.tracker.update(img.src_pixels, img.src_w, img.src_h)
+                self._draw()
+        self._after_id = self.after(self.POLL_MS, self._poll)
+
+    # --- rysowanie ---
+
+    def _make_bars(self, channel, n):
+        for item in self._bars:
+            self.cv.delete(item)
+        self._bars = []
+        for i in range(n):
+            if channel == "hue":
+                r, g, b = colorsys.hsv_to_rgb(i / n, 1.0, 1.0)
+                fill = f"#{int(r * 255):02x}{int(g * 255):02x}{int(b * 255):02x}"
+            else:
+                fill = self.COLORS[channel]
+            self._bars.append(self.cv.create_rectangle(0, 0, 0, 0, fill=fill, outline=""))
+        self._bars_channel = channel
+
+    def _draw(self):
+        if self._hists is None:
+            return
+        channel = self.channel.get()
+        hist = self._hists[channel]
+        n = len(hist)
+        if self._bars_channel != channel:
+            self._make_bars(channel, n)
+
+        h = self.HEIGHT
+        bw = self.WIDTH / n
+        max_count = max(hist) or 1
+        coords = self.cv.coords
+        for i, (item, count) in enumerate(zip(self._bars, hist)):
+            bar_h = int(count / max_count * (h - 20))
+            coords(item, i * bw, h - bar_h, (i + 1) * bw, h)
+
+        total = sum(hist)
+        bands = self.tracker.band_count
+        self.cv.itemconfigure(
+            self._info,
+            text=f"N = {total}   (przeliczone pasy: {self.tracker.recomputed}/{bands})",
+        )
+        self.cv.tag_raise(self._info)
@@ -1,7 +1,17 @@
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, messagebox
 import math
-import colorsys
+
+from ..playback import Playback, PlaybackBar
+from ..render.splat_buffer import SplatBuffer
+from ..voxels import (
+    PickIndex,
+    color_bins,
+    hsv_cone_grid,
+    hsv_slice_ppm,
+    image_cone_cloud,
+    rotation_matrix,
+)
 
 
 class HSVConePointsWindow(tk.Toplevel):
@@ -12,6 +22,8 @@ class HSVConePointsWindow(tk.Toplevel):
     - kliknięcie pokazuje przekrój (stałe V) po prawej.
     """
 
+    ROTATE_SPEED = 45.0  # °/s – obrót przy odtwarzaniu
+
     def __init__(self, master):
         super().__init__(master)
         self.master_app = master
@@ -31,12 +43,32 @@ class HSVConePointsWindow(tk.Toplevel):
         # Lista voxelowych punktów po rzutowaniu
         self._points = []  # (sx, sy, vi)
 
+        # indeks wyboru punktów (budowany leniwie po obrocie) i podgląd pod kursorem
+        self._pick = None
+        self._slice_index = None
+        self.hover_var = tk.BooleanVar(value=False)
+
+        # bufor pikseli widoku 3D i jego PhotoImage na Canvas
+        self._splats = None
+        self._photo = None
+        self._image_item = None
+        self._slice_photo = None  # obraz przekroju (dane z pamięci przekrojów)
+
+        # źródło punktów: siatka przestrzeni barw albo kolory zaznaczonego obrazu
+        self.source_var = tk.StringVar(value="grid")
+        self.cloud_info = tk.StringVar(value="")
+        self._cloud_image = None
+
+        # odtwarzanie (obrót) – klatki przez after()
+        self.playback = Playback(self, self._play_frame)
+
         self._build_ui()
         self._redraw_cone()
 
         self.protocol("WM_DELETE_WINDOW", self._on_close)
 
     def _on_close(self):
+        self.playback.stop()
         # wyczyszczenie referencji w App
         if hasattr(self.master_app, "hsv_cone_points_win"):
             self.master_app.hsv_cone_points_win = None
@@ -97,8 +129,32 @@ class HSVConePointsWindow(tk.Toplevel):
 
         rot.columnconfigure(1, weight=1)
 
+        self.playback_bar = PlaybackBar(left, self.playback, on_stop=self._redraw_cone)
+        self.playback_bar.pack(fill="x", pady=(6, 0))
+
+        src = ttk.LabelFrame(left, text="Źródło punktów")
+        src.pack(fill="x", pady=(6, 0))
+        ttk.Radiobutton(
+            src,
+            text="Siatka",
+            value="grid",
+            variable=self.source_var,
+            command=self._on_source_change,
+        ).grid(row=0, column=0, sticky="w", padx=4)
+        ttk.Radiobutton(
+            src,
+            text="Kolory obrazu (zaznaczony)",
+            value="image",
+            variable=self.source_var,
+            command=self._on_source_change,
+        ).grid(row=0, column=1, sticky="w", padx=4)
+        ttk.Label(src, textvariable=self.cloud_info, anchor="w").grid(
+            row=1, column=0, columnspan=2, sticky="ew", padx=4, pady=(0, 2)
+        )
+
         # klik w stożek → przekrój
         self.canvas_cone.bind("<Button-1>", self._on_click_cone)
+        self.canvas_cone.bind("<Motion>", self._on_hover_cone)
 
         # PRAWA: prosty przekrój
         right = ttk.Frame(main)
@@ -108,6 +164,9 @@ class HSVConePointsWindow(tk.Toplevel):
             right, text="Przekrój (prosty): kliknij w stożek, aby wybrać V", anchor="w"
         )
         self.slice_info.pack(fill="x", pady=(0, 4))
+        ttk.Checkbutton(
+            right, text="Podgląd pod kursorem", variable=self.hover_var
+        ).pack(anchor="w", pady=(0, 4))
 
         self.canvas_slice = tk.Canvas(
             right,
@@ -119,109 +178,118 @@ class HSVConePointsWindow(tk.Toplevel):
         )
         self.canvas_slice.pack(fill="both", expand=True)
 
-    # --- Obrót 3D ---
-
-    def _rotate_point(self, x, y, z, ax, ay, az):
-        # X
-        cosx, sinx = math.cos(ax), math.sin(ax)
-        y1 = y * cosx - z * sinx
-        z1 = y * sinx + z * cosx
-        x1 = x
-
-        # Y
-        cosy, siny = math.cos(ay), math.sin(ay)
-        x2 = x1 * cosy + z1 * siny
-        z2 = -x1 * siny + z1 * cosy
-        y2 = y1
-
-        # Z
-        cosz, sinz = math.cos(az), math.sin(az)
-        x3 = x2 * cosz - y2 * sinz
-        y3 = x2 * sinz + y2 * cosz
-        z3 = z2
-
-        return x3, y3, z3
-
-    def _hsv_to_hex(self, h, s, v):
-        r, g, b = colorsys.hsv_to_rgb(h, s, v)
-        return f"#{int(r*255):02x}{int(g*255):02x}{int(b*255):02x}"
-
     # --- Stożek 3D (punkty) ---
 
-    def _redraw_cone(self):
-        self.canvas_cone.delete("all")
-        self._points.clear()
-
+    def _redraw_cone(self, density=1.0):
+        """density < 1 – rzadsza siatka (odtwarzanie pod obciążeniem)."""
         w = int(self.canvas_cone["width"])
         h = int(self.canvas_cone["height"])
-        cx, cy = w / 2, h / 2
         scale = min(w, h) * 0.45
 
-        ax = math.radians(self.angle_x.get())
-        ay = math.radians(self.angle_y.get())
-        az = math.radians(self.angle_z.get())
-
-        voxels = []
-
-        for vi in range(self.steps_v):
-            v = vi / (self.steps_v - 1)
-            z = v - 0.5
-
-            for si in range(self.steps_s):
-                s = si / (self.steps_s - 1)
-
-                r = s * v
-
-                for hi in range(self.steps_h):
-                    hnorm = hi / self.steps_h
-                    angle = 2 * math.pi * hnorm
-
-                    x = r * math.cos(angle)
-                    y = r * math.sin(angle)
-
-                    xr, yr, zr = self._rotate_point(x, y, z, ax, ay, az)
-                    sx = cx + xr * scale
-                    sy = cy - yr * scale
-
-                    color = self._hsv_to_hex(hnorm, s, v)
-                    voxels.append((zr, sx, sy, vi, color))
+        rot = rotation_matrix(
+            math.radians(self.angle_x.get()),
+            math.radians(self.angle_y.get()),
+            math.radians(self.angle_z.get()),
+        )
+        if self._cloud_image is not None:
+            self._redraw_cloud(rot, w, h, scale)
+            return
 
-        # sortowanie po głębi
-        voxels.sort(key=lambda t: t[0])
+        steps_v = max(2, int(round(self.steps_v * density)))
+        steps_s = max(2, int(round(self.steps_s * density)))
+        steps_h = max(3, int(round(self.steps_h * density)))
+        grid = hsv_cone_grid(steps_v, steps_s, steps_h)
+        order, sx, sy = grid.project(rot, w / 2, h / 2, scale)  # sortowanie po głębi
 
         size = 5  # małe kwadraciki – efekt „z punktów”
-        for zr, sx, sy, vi, color in voxels:
-            self.canvas_cone.create_rectangle(
-                sx - size / 2,
-                sy - size / 2,
-                sx + size / 2,
-                sy + size / 2,
-                fill=color,
-                outline="",
-            )
-            self._points.append((sx, sy, vi))
+        # klucze rzadszej siatki nie pasują do self.steps_v – wtedy bez wyboru przekroju
+        self._points = grid.points(order, sx, sy) if steps_v == self.steps_v else []
+        self._pick = None
+        self._blit_cone(grid.splats(order, sx, sy), size)
+
+    def _redraw_cloud(self, rot, w, h, scale):
+        """Chmura kolorów obrazu: przedziały 32³, rozmiar i krycie wg liczności."""
+        img = self._cloud_image
+        grid = image_cone_cloud(img.src_pixels, img.src_w, self.steps_v)
+        order, sx, sy = grid.project(rot, w / 2, h / 2, scale)
+        self._points = grid.points(order, sx, sy)
+        self._pick = None
+        self._blit_cone(grid.sized_splats(order, sx, sy, 2, 14))
+
+    def _selected_image(self):
+        from ..shapes.image import RasterImage
+
+        obj = self.master_app.sel.obj
+        return obj if isinstance(obj, RasterImage) else None
+
+    def _on_source_change(self):
+        self._cloud_image = None
+        self.cloud_info.set("")
+        if self.source_var.get() == "image":
+            img = self._selected_image()
+            if img is None:
+                messagebox.showinfo("Chmura kolorów", "Zaznacz obraz w głównym oknie.")
+                self.source_var.set("grid")
+            else:
+                self._cloud_image = img
+                cb = color_bins(img.src_pixels, img.src_w)
+                self.cloud_info.set(
+                    f"{img.src_w}×{img.src_h}: {cb.samples} próbek (co {cb.step}. piksel), "
+                    f"{len(cb.counts)} przedziałów"
+                )
+        self._redraw_cone()
+
+    def _play_frame(self, dt, density):
+        """Klatka animacji: obrót wokół osi Y."""
+        a = self.angle_y.get() + self.ROTATE_SPEED * dt
+        self.angle_y.set((a + 180.0) % 360.0 - 180.0)
+        self._redraw_cone(density)
+
+    def _blit_cone(self, splats, size=None):
+        """Splaty → bufor pikseli → jeden PhotoImage (size=None: rozmiar podany w splacie)."""
+        canvas = self.canvas_cone
+        w = int(canvas["width"])
+        h = int(canvas["height"])
+        if self._splats is None or (self._splats.w, self._splats.h) != (w, h):
+            self._splats = SplatBuffer(w, h)
+        self._splats.clear()
+        if size is None:
+            self._splats.draw_sized(splats)
+        else:
+            self._splats.draw(splats, size)
+        self._photo = self._splats.photo()  # referencja – inaczej Tk zwolni obraz
+        if self._image_item is None:
+            self._image_item = canvas.create_image(0, 0, image=self._photo, anchor="nw")
+        else:
+            canvas.itemconfigure(self._image_item, image=self._photo)
 
     # --- Klik + prosty przekrój ---
 
     def _on_click_cone(self, event):
-        if not self._points:
+        """Przekrój dla voxela najbliższego kliknięciu."""
+        vi = self._pick_at(event.x, event.y)
+        if vi is not None:
+            self._draw_slice(vi)
+
+    def _on_hover_cone(self, event):
+        """Podgląd przekroju pod kursorem (gdy włączony) – tylko przy zmianie warstwy."""
+        if not self.hover_var.get():
             return
+        vi = self._pick_at(event.x, event.y)
+        if vi is not None and vi != self._slice_index:
+            self._draw_slice(vi)
 
-        ex, ey = event.x, event.y
-        best_vi = None
-        best_d2 = 1e9
-
-        for sx, sy, vi in self._points:
-            d2 = (sx - ex) ** 2 + (sy - ey) ** 2
-            if d2 < best_d2:
-                best_d2 = d2
-                best_vi = vi
-
-        if best_vi is not None:
-            self._draw_slice(best_vi)
+    def _pick_at(self, x, y):
+        """Klucz voxela najbliższego punktowi ekranu albo None."""
+        if not self._points:
+            return None
+        if self._pick is None:
+            self._pick = PickIndex(self._points)
+        return self._pick.nearest(x, y)
 
     def _draw_slice(self, vi):
         """Prosty przekrój: krążek HSV dla stałego V."""
+        self._slice_index = vi
         self.canvas_slice.delete("all")
 
         v = vi / (self.steps_v - 1)
@@ -232,28 +300,12 @@ class HSVConePointsWindow(tk.Toplevel):
         cx, cy = w / 2, h / 2
         R = min(w, h) / 2 - 10
 
-        samples_s = self.steps_s * 2
-        samples_h = self.steps_h * 2
-
-        for si in range(samples_s):
-            s = si / (samples_s - 1)
-            for hi in range(samples_h):
-                hnorm = hi / samples_h
-                ang = 2 * math.pi * hnorm
-                r = s * R
-
-                x = cx + r * math.cos(ang)
-                y = cy + r * math.sin(ang)
-
-                col = self._hsv_to_hex(hnorm, s, v)
-                self.canvas_slice.create_rectangle(
-                    x - 2,
-                    y - 2,
-                    x + 2,
-                    y + 2,
-                    fill=col,
-                    outline="",
-                )
+        # dysk liczony na piksel i trzymany w pamięci (klucz: V i rozmiar)
+        side = int(2 * R)
+        self._slice_photo = tk.PhotoImage(data=hsv_slice_ppm(v, side), format="PPM")
+        self.canvas_slice.create_image(
+            cx - side / 2, cy - side / 2, image=self._slice_photo, anchor="nw"
+        )
 
         self.canvas_slice.create_oval(
             cx - R,
@@ -1,7 +1,10 @@
 import tkinter as tk
 from tkinter import ttk
 import math
-import colorsys
+
+from ..playback import Playback, PlaybackBar
+from ..render.splat_buffer import SplatBuffer
+from ..voxels import PickIndex, hsv_cone_grid, hsv_slice_ppm, rotation_matrix
 
 
 class HSVConeWindow(tk.Toplevel):
@@ -13,6 +16,8 @@ class HSVConeWindow(tk.Toplevel):
     - po prawej rysowany jest przekrój (dysk HSV dla stałego V).
     """
 
+    ROTATE_SPEED = 45.0  # °/s – obrót przy odtwarzaniu
+
     def __init__(self, master):
         super().__init__(master)
         self.master_app = master
@@ -32,12 +37,27 @@ class HSVConeWindow(tk.Toplevel):
         # Lista punktów po rzutowaniu: (sx, sy, vi)
         self._points = []
 
+        # indeks wyboru punktów (budowany leniwie po obrocie) i podgląd pod kursorem
+        self._pick = None
+        self._slice_index = None
+        self.hover_var = tk.BooleanVar(value=False)
+
+        # bufor pikseli widoku 3D i jego PhotoImage na Canvas
+        self._splats = None
+        self._photo = None
+        self._image_item = None
+        self._slice_photo = None  # obraz przekroju (dane z pamięci przekrojów)
+
+        # odtwarzanie (obrót) – klatki przez after()
+        self.playback = Playback(self, self._play_frame)
+
         self._build_ui()
         self._redraw_cone()
 
         self.protocol("WM_DELETE_WINDOW", self._on_close)
 
     def _on_close(self):
+        self.playback.stop()
         if hasattr(self.master_app, "hsv_cone_win"):
             self.master_app.hsv_cone_win = None
         self.destroy()
@@ -97,8 +117,12 @@ class HSVConeWindow(tk.Toplevel):
 
         rot.columnconfigure(1, weight=1)
 
+        self.playback_bar = PlaybackBar(left, self.playback, on_stop=self._redraw_cone)
+        self.playback_bar.pack(fill="x", pady=(6, 0))
+
         # klik w stożek -> przekrój
         self.canvas_cone.bind("<Button-1>", self._on_click_cone)
+        self.canvas_cone.bind("<Motion>", self._on_hover_cone)
 
         # PRAWA: przekrój
         right = ttk.Frame(main)
@@ -110,6 +134,9 @@ class HSVConeWindow(tk.Toplevel):
             anchor="w",
         )
         self.slice_info.pack(fill="x", pady=(0, 4))
+        ttk.Checkbutton(
+            right, text="Podgląd pod kursorem", variable=self.hover_var
+        ).pack(anchor="w", pady=(0, 4))
 
         self.canvas_slice = tk.Canvas(
             right,
@@ -121,116 +148,85 @@ class HSVConeWindow(tk.Toplevel):
         )
         self.canvas_slice.pack(fill="both", expand=True)
 
-    # ---------------- 3D obrót ----------------
-
-    def _rotate_point(self, x, y, z, ax, ay, az):
-        # X
-        cosx, sinx = math.cos(ax), math.sin(ax)
-        y1 = y * cosx - z * sinx
-        z1 = y * sinx + z * cosx
-        x1 = x
-
-        # Y
-        cosy, siny = math.cos(ay), math.sin(ay)
-        x2 = x1 * cosy + z1 * siny
-        z2 = -x1 * siny + z1 * cosy
-        y2 = y1
-
-        # Z
-        cosz, sinz = math.cos(az), math.sin(az)
-        x3 = x2 * cosz - y2 * sinz
-        y3 = x2 * sinz + y2 * cosz
-        z3 = z2
-
-        return x3, y3, z3
-
-    def _hsv_to_rgb_hex(self, h, s, v):
-        r, g, b = colorsys.hsv_to_rgb(h, s, v)
-        return f"#{int(r*255):02x}{int(g*255):02x}{int(b*255):02x}"
-
     # ---------------- Stożek 3D ----------------
 
-    def _redraw_cone(self):
-        self.canvas_cone.delete("all")
-        self._points.clear()
-
+    def _redraw_cone(self, density=1.0):
+        """density < 1 – rzadsza siatka (odtwarzanie pod obciążeniem)."""
         w = int(self.canvas_cone["width"])
         h = int(self.canvas_cone["height"])
-        cx, cy = w / 2, h / 2
         scale = min(w, h) * 0.48
 
-        ax = math.radians(self.angle_x.get())
-        ay = math.radians(self.angle_y.get())
-        az = math.radians(self.angle_z.get())
-
-        voxels = []
-
-        for vi in range(self.steps_v):
-            v = vi / (self.steps_v - 1) if self.steps_v > 1 else 0.0
-            z = v - 0.5  # przesuwamy tak, żeby stożek był wyśrodkowany na osi Z
-
-            for si in range(self.steps_s):
-                s = si / (self.steps_s - 1) if self.steps_s > 1 else 0.0
-
-                # promień stożka rośnie z S i maleje z V -> klasyczny stożek
-                r_cone = s * v
-
-                for hi in range(self.steps_h):
-                    h_norm = hi / self.steps_h
-                    angle = 2 * math.pi * h_norm
-
-                    x = r_cone * math.cos(angle)
-                    y = r_cone * math.sin(angle)
-
-                    xr, yr, zr = self._rotate_point(x, y, z, ax, ay, az)
-                    sx = cx + xr * scale
-                    sy = cy - yr * scale
-
-                    color = self._hsv_to_rgb_hex(h_norm, s, v)
-                    voxels.append((zr, sx, sy, vi, color))
-
-        # sort po głębi (Z), żeby pseudo-3D się zgadzało
-        voxels.sort(key=lambda t: t[0])
-
-        base_size = scale / max(self.steps_v, self.steps_s, 1)
+        rot = rotation_matrix(
+            math.radians(self.angle_x.get()),
+            math.radians(self.angle_y.get()),
+            math.radians(self.angle_z.get()),
+        )
+        steps_v = max(2, int(round(self.steps_v * density)))
+        steps_s = max(2, int(round(self.steps_s * density)))
+        steps_h = max(3, int(round(self.steps_h * density)))
+        grid = hsv_cone_grid(steps_v, steps_s, steps_h)
+        # order – od najdalszych (sort po głębi), żeby pseudo-3D się zgadzało
+        order, sx, sy = grid.project(rot, w / 2, h / 2, scale)
+
+        base_size = scale / max(steps_v, steps_s, 1)
         size_pt = max(
             4, base_size * 1.8
         )  # trochę większe kwadraty, żeby nie było dziur
 
-        for zr, sx, sy, vi, color in voxels:
-            self.canvas_cone.create_rectangle(
-                sx - size_pt / 2,
-                sy - size_pt / 2,
-                sx + size_pt / 2,
-                sy + size_pt / 2,
-                fill=color,
-                outline="",
-            )
-            # zapisujemy tylko vi (indeks V) do przekroju
-            self._points.append((sx, sy, vi))
+        # klucz punktu = vi (indeks V) do przekroju;
+        # klucze rzadszej siatki nie pasują do self.steps_v – wtedy bez wyboru przekroju
+        self._points = grid.points(order, sx, sy) if steps_v == self.steps_v else []
+        self._pick = None
+        self._blit_cone(grid.splats(order, sx, sy), size_pt)
+
+    def _play_frame(self, dt, density):
+        """Klatka animacji: obrót wokół osi Y."""
+        a = self.angle_y.get() + self.ROTATE_SPEED * dt
+        self.angle_y.set((a + 180.0) % 360.0 - 180.0)
+        self._redraw_cone(density)
+
+    def _blit_cone(self, splats, size):
+        """Rysuje splaty do bufora pikseli i pokazuje go jako jeden PhotoImage."""
+        canvas = self.canvas_cone
+        w = int(canvas["width"])
+        h = int(canvas["height"])
+        if self._splats is None or (self._splats.w, self._splats.h) != (w, h):
+            self._splats = SplatBuffer(w, h)
+        self._splats.clear()
+        self._splats.draw(splats, size)
+        self._photo = self._splats.photo()  # referencja – inaczej Tk zwolni obraz
+        if self._image_item is None:
+            self._image_item = canvas.create_image(0, 0, image=self._photo, anchor="nw")
+        else:
+            canvas.itemconfigure(self._image_item, image=self._photo)
 
     # ---------------- Klik + przekrój ----------------
 
     def _on_click_cone(self, event):
         """Znajdź najbliższy punkt stożka i narysuj przekrój dla jego V."""
-        if not self._points:
-            return
-
-        ex, ey = event.x, event.y
-        best_vi = None
-        best_d2 = 1e9
+        vi = self._pick_at(event.x, event.y)
+        if vi is not None:
+            self._draw_slice(vi)
 
-        for sx, sy, vi in self._points:
-            d2 = (sx - ex) ** 2 + (sy - ey) ** 2
-            if d2 < best_d2:
-                best_d2 = d2
-                best_vi = vi
+    def _on_hover_cone(self, event):
+        """Podgląd przekroju pod kursorem (gdy włączony) – tylko przy zmianie warstwy."""
+        if not self.hover_var.get():
+            return
+        vi = self._pick_at(event.x, event.y)
+        if vi is not None and vi != self._slice_index:
+            self._draw_slice(vi)
 
-        if best_vi is not None:
-            self._draw_slice(best_vi)
+    def _pick_at(self, x, y):
+        """Klucz voxela najbliższego punktowi ekranu albo None."""
+        if not self._points:
+            return None
+        if self._pick is None:
+            self._pick = PickIndex(self._points)
+        return self._pick.nearest(x, y)
 
     def _draw_slice(self, vi):
         """Przekrój stożka dla stałego V – dysk H×S (tarcza HSV)."""
+        self._slice_index = vi
         self.canvas_slice.delete("all")
 
         v = vi / (self.steps_v - 1) if self.steps_v > 1 else 0.0
@@ -241,28 +237,12 @@ class HSVConeWindow(tk.Toplevel):
         cx, cy = w / 2, h / 2
         radius = min(w, h) / 2 - 10
 
-        samples_s = self.steps_s * 2
-        samples_h = self.steps_h * 2
-
-        for si in range(samples_s):
-            s = si / (samples_s - 1)
-            for hi in range(samples_h):
-                h_norm = hi / samples_h
-                angle = 2 * math.pi * h_norm
-                r = s * radius
-
-                x = cx + r * math.cos(angle)
-                y = cy + r * math.sin(angle)
-
-                color = self._hsv_to_rgb_hex(h_norm, s, v)
-                self.canvas_slice.create_rectangle(
-                    x - 2,
-                    y - 2,
-                    x + 2,
-                    y + 2,
-                    fill=color,
-                    outline="",
-                )
+        # dysk liczony na piksel i trzymany w pamięci (klucz: V i rozmiar)
+        side = int(2 * radius)
+        self._slice_photo = tk.PhotoImage(data=hsv_slice_ppm(v, side), format="PPM")
+        self.canvas_slice.create_image(
+            cx - side / 2, cy - side / 2, image=self._slice_photo, anchor="nw"
+        )
 
         # obrys koła
         self.canvas_slice.create_oval(
@@ -1,28 +1,14 @@
 # grafix/image_ops.py
-from typing import List, Tuple
+from typing import Callable, List, Sequence, Tuple
 
 Color = Tuple[int, int, int]
+Lut = List[int]  # 256 wartości 0..255 – odwzorowanie kanału 8-bit
 
 
 def clamp(v: int) -> int:
     return 0 if v < 0 else 255 if v > 255 else v
 
 
-def linear_color_scale(pixels: List[Color], in_min: int, in_max: int) -> List[Color]:
-    in_min = max(0, min(255, int(in_min)))
-    in_max = max(0, min(255, int(in_max)))
-    if in_max <= in_min:
-        return pixels[:]  # brak zmian
-    k = 255.0 / (in_max - in_min)
-    out: List[Color] = []
-    for r, g, b in pixels:
-        rr = clamp(int(round((r - in_min) * k)))
-        gg = clamp(int(round((g - in_min) * k)))
-        bb = clamp(int(round((b - in_min) * k)))
-        out.append((rr, gg, bb))
-    return out
-
-
 def _clamp_byte(v: float) -> int:
     v = int(round(v))
     if v < 0:
@@ -32,53 +18,105 @@ def _clamp_byte(v: float) -> int:
     return v
 
 
+# ---------- LUT (tablice 256 wartości) ----------
+#
+# Wszystkie operacje punktowe działają niezależnie na każdym kanale 8-bit,
+# więc wystarczy policzyć je raz dla 256 możliwych wartości, a potem tylko
+# odczytywać wynik z tablicy. Kolejne operacje składamy w jedną tablicę.
+
+IDENTITY_LUT: Lut = list(range(256))
+
+
+def lut_from_func(func: Callable[[int], float]) -> Lut:
+    """Buduje LUT z funkcji f(v) → wartość (zaokrąglona i obcięta do 0..255)."""
+    return [_clamp_byte(func(v)) for v in range(256)]
+
+
+def levels_lut(in_min: int, in_max: int) -> Lut:
+    """LUT dla liniowego skalowania [in_min, in_max] → [0, 255]."""
+    in_min = max(0, min(255, int(in_min)))
+    in_max = max(0, min(255, int(in_max)))
+    if in_max <= in_min:
+        return IDENTITY_LUT[:]  # brak zmian
+    k = 255.0 / (in_max - in_min)
+    return [clamp(int(round((v - in_min) * k))) for v in range(256)]
+
+
+def add_lut(value) -> Lut:
+    return lut_from_func(lambda v: v + value)
+
+
+def mul_lut(value) -> Lut:
+    return lut_from_func(lambda v: v * value)
+
+
+def div_lut(value) -> Lut:
+    if value == 0:
+        raise ValueError("Dzielenie przez zero jest niedozwolone.")
+    return lut_from_func(lambda v: v / value)
+
+
+def brightness_lut(delta) -> Lut:
+    return add_lut(delta)
+
+
+def compose_luts(*luts: Sequence[int]) -> Lut:
+    """
+    Składa LUT-y w kolejności wywołania: compose_luts(a, b) ≡ najpierw a, potem b.
+    Wynik to jedna tablica – cały łańcuch stosujemy w jednym przebiegu.
+    """
+    out = IDENTITY_LUT[:]
+    for lut in luts:
+        out = [lut[v] for v in out]
+    return out
+
+
+def apply_lut(pixels: List[Color], lut: Sequence[int]) -> List[Color]:
+    """Stosuje tę samą LUT do kanałów R, G, B wszystkich pikseli."""
+    return [(lut[r], lut[g], lut[b]) for r, g, b in pixels]
+
+
+def apply_lut_bytes(data: bytes, lut: Sequence[int]) -> bytes:
+    """Stosuje LUT do płaskiego bufora bajtów (np. plan szarości) – bytes.translate."""
+    return bytes(data).translate(bytes(lut))
+
+
+def apply_point_ops(pixels: List[Color], luts: Sequence[Sequence[int]]) -> List[Color]:
+    """Łańcuch operacji punktowych (levels → jasność → mnożenie …) w jednym przebiegu."""
+    if not luts:
+        return pixels[:]
+    return apply_lut(pixels, compose_luts(*luts))
+
+
+# ---------- operacje punktowe ----------
+
+
+def linear_color_scale(pixels: List[Color], in_min: int, in_max: int) -> List[Color]:
+    in_min = max(0, min(255, int(in_min)))
+    in_max = max(0, min(255, int(in_max)))
+    if in_max <= in_min:
+        return pixels[:]  # brak zmian
+    return apply_lut(pixels, levels_lut(in_min, in_max))
+
+
 def add_constant(pixels, value):
     """Dodawanie stałej do wszystkich kanałów (z ograniczeniem 0..255)."""
-    out = []
-    for r, g, b in pixels:
-        out.append(
-            (
-                _clamp_byte(r + value),
-                _clamp_byte(g + value),
-                _clamp_byte(b + value),
-            )
-        )
-    return out
+    return apply_lut(pixels, add_lut(value))
 
 
 def mul_constant(pixels, value):
     """Mnożenie wszystkich kanałów przez stałą."""
-    out = []
-    for r, g, b in pixels:
-        out.append(
-            (
-                _clamp_byte(r * value),
-                _clamp_byte(g * value),
-                _clamp_byte(b * value),
-            )
-        )
-    return out
+    return apply_lut(pixels, mul_lut(value))
 
 
 def div_constant(pixels, value):
     """Dzielenie wszystkich kanałów przez stałą (value != 0)."""
-    if value == 0:
-        raise ValueError("Dzielenie przez zero jest niedozwolone.")
-    out = []
-    for r, g, b in pixels:
-        out.append(
-            (
-                _clamp_byte(r / value),
-                _clamp_byte(g / value),
-                _clamp_byte(b / value),
-            )
-        )
-    return out
+    return apply_lut(pixels, div_lut(value))
 
 
 def change_brightness(pixels, delta):
     """Zmiana jasności – to samo co dodawanie, ale logicznie rozdzielone."""
-    return add_constant(pixels, delta)
+    return apply_lut(pixels, brightness_lut(delta))
 
 
 def to_grayscale_avg(pixels):
@@ -1,3 +1,12 @@
-from .json_io import save_scene, load_scene, scene_to_dict
-
+# Zapis/odczyt sceny (json_io) wymaga tkinter (okna dialogowe) i kształtów –
+# importowany leniwie, żeby odczyt/zapis obrazów (ppm, jpeg_io, image_file)
+# działał bez Tk, np. w `python -m grafix` na serwerze bez ekranu.
 __all__ = ["save_scene", "load_scene", "scene_to_dict"]
+
+
+def __getattr__(name):
+    if name in __all__:
+        from . import json_io
+
+        return getattr(json_io, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
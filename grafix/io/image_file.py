@@ -0,0 +1,42 @@
+# grafix/io/image_file.py
+"""Wczytywanie i zapis obrazu PPM (P3/P6) albo JPEG – bez GUI."""
+import os
+from typing import List, Tuple
+
+from .ppm import read_ppm_auto, write_ppm_p6
+
+Color = Tuple[int, int, int]
+
+PPM_EXTENSIONS = (".ppm", ".pnm")
+JPEG_EXTENSIONS = (".jpg", ".jpeg")
+IMAGE_EXTENSIONS = PPM_EXTENSIONS + JPEG_EXTENSIONS
+
+
+def is_image_path(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS
+
+
+def read_image(path: str) -> Tuple[int, int, List[Color]]:
+    """(w, h, piksele) – PPM rozpoznawany po nagłówku P3/P6, pozostałe przez Pillow."""
+    with open(path, "rb") as f:
+        magic = f.read(2)
+    if magic in (b"P3", b"P6"):
+        w, h, pixels, _fmt = read_ppm_auto(path)
+        return w, h, pixels
+    # Pillow potrzebny tylko dla JPEG
+    from .jpeg_io import read_jpeg
+
+    return read_jpeg(path)
+
+
+def write_image(path: str, w: int, h: int, pixels: List[Color], quality: int = 90):
+    """Zapis wg rozszerzenia: .ppm/.pnm → P6, .jpg/.jpeg → JPEG (Pillow)."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in PPM_EXTENSIONS:
+        write_ppm_p6(path, w, h, pixels)
+    elif ext in JPEG_EXTENSIONS:
+        from .jpeg_io import write_jpeg
+
+        write_jpeg(path, w, h, pixels, quality=quality)
+    else:
+        raise ValueError(f"Nieobsługiwane rozszerzenie pliku: {ext or path}")
@@ -8,16 +8,49 @@ except ImportError as e:
 
 Color = Tuple[int, int, int]
 
+# skale dekodowania DCT dostępne w trybie draft
+DRAFT_REDUCTIONS = (1, 2, 4, 8)
 
-def read_jpeg(path: str) -> Tuple[int, int, List[Color]]:
-    img = Image.open(path).convert("RGB")
+
+def _pixels_from_image(img) -> Tuple[int, int, List[Color]]:
+    """Obraz Pillow → (w, h, [(r,g,b)...]) – jeden bufor bajtów zamiast getdata()."""
+    if img.mode != "RGB":
+        img = img.convert("RGB")
     w, h = img.size
-    data = list(img.getdata())  # [(r,g,b)...] wierszami od góry
-    return w, h, data
+    it = iter(img.tobytes())
+    return w, h, list(zip(it, it, it))  # wierszami od góry
+
+
+def read_jpeg(path: str, reduce: int = 1) -> Tuple[int, int, List[Color]]:
+    """
+    Wczytuje JPEG. reduce ∈ {1, 2, 4, 8} – dekodowanie od razu w skali 1/reduce
+    (Image.draft, skalowanie DCT) – podgląd dużego pliku bez pełnego dekodowania.
+    """
+    if reduce not in DRAFT_REDUCTIONS:
+        raise ValueError(f"reduce musi być jednym z {DRAFT_REDUCTIONS}")
+    with Image.open(path) as img:
+        if reduce > 1:
+            w, h = img.size
+            img.draft("RGB", (-(-w // reduce), -(-h // reduce)))
+        return _pixels_from_image(img)
+
+
+def read_jpeg_preview(path: str, max_side: int) -> Tuple[int, int, List[Color]]:
+    """JPEG zdekodowany w największej redukcji, przy której dłuższy bok >= max_side."""
+    with Image.open(path) as img:
+        w, h = img.size
+    reduce = 1
+    for r in DRAFT_REDUCTIONS:
+        if max(w, h) // r >= max_side:
+            reduce = r
+    return read_jpeg(path, reduce)
 
 
 def write_jpeg(path: str, w: int, h: int, pixels: List[Color], quality: int = 90):
+    if len(pixels) != w * h:
+        raise ValueError("Liczba pikseli nie zgadza się z rozmiarem obrazu.")
     img = Image.new("RGB", (w, h))
+    # putdata czyta krotki w C – szybsze niż spłaszczanie listy do bytes + frombytes
     img.putdata(pixels)
     # subsampling=0 → najlepsza jakość, optimize=True → mniejsze pliki
     img.save(path, format="JPEG", quality=int(quality), optimize=True, subsampling=0)
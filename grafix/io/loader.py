@@ -0,0 +1,112 @@
+# grafix/io/loader.py
+"""
+Wczytywanie obrazu w wątku roboczym – GUI się nie blokuje.
+
+Zadanie najpierw przygotowuje podgląd w niskiej rozdzielczości (JPEG w trybie
+draft, P6 – co k-ty wiersz i piksel), potem wczytuje pełny obraz, raportując
+postęp, i koduje go do danych PPM (PhotoImage powstaje z nich bez pracy na
+pikselach w wątku GUI). Wątek GUI odpytuje stan zadania (after) – Tk nie jest
+wywoływany z wątku.
+"""
+import threading
+
+from .ppm import ppm_p6_bytes, read_ppm_auto, read_ppm_p3, read_ppm_p6, read_ppm_p6_preview
+
+
+class LoadCancelled(Exception):
+    pass
+
+
+def _read_full(kind, path, progress):
+    if kind == "p3":
+        return read_ppm_p3(path, progress)
+    if kind == "p6":
+        return read_ppm_p6(path, progress)
+    if kind == "jpeg":
+        from .jpeg_io import read_jpeg
+
+        return read_jpeg(path)
+    w, h, px, _fmt = read_ppm_auto(path, progress)
+    return w, h, px
+
+
+def _read_preview(kind, path, max_side):
+    """(w, h, piksele, pełne_w, pełne_h) albo None, gdy podgląd nie jest dostępny."""
+    if kind == "jpeg":
+        from PIL import Image
+
+        from .jpeg_io import read_jpeg_preview
+
+        with Image.open(path) as img:
+            full_w, full_h = img.size
+        if max(full_w, full_h) <= 2 * max_side:
+            return None  # mały plik – od razu pełny obraz
+        w, h, px = read_jpeg_preview(path, max_side)
+        return w, h, px, full_w, full_h
+    with open(path, "rb") as f:
+        magic = f.read(2)
+    if magic == b"P6" and kind in ("p6", "ppm"):
+        preview = read_ppm_p6_preview(path, max_side)
+        if preview is not None and preview[0] < preview[3]:
+            return preview
+    return None  # P3 (tekst) – podglądu nie da się zrobić bez parsowania całości
+
+
+class ImageLoadJob:
+    """
+    kind: "ppm" (P3/P6 wg nagłówka), "p3", "p6", "jpeg".
+    Stan (czytany z wątku GUI): progress, preview, result, error, cancelled, done.
+    """
+
+    def __init__(self, path, kind="ppm", preview_side=512):
+        self.path = path
+        self.kind = kind
+        self.preview_side = preview_side
+        self.progress = 0.0
+        self.preview = None  # (w, h, piksele, pełne_w, pełne_h)
+        self.preview_ppm = None  # podgląd zakodowany jako PPM (gotowy dla PhotoImage)
+        self.result = None  # (w, h, piksele)
+        self.result_ppm = None  # pełny obraz zakodowany jako PPM P6
+        self.error = None
+        self.cancelled = False
+        self.done = False
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    def _check(self, fraction=None):
+        if fraction is not None:
+            self.progress = fraction
+        if self._cancel.is_set():
+            raise LoadCancelled()
+
+    def _run(self):
+        try:
+            try:
+                preview = _read_preview(self.kind, self.path, self.preview_side)
+                if preview is not None:
+                    # kodowanie pikseli też tutaj – wątek GUI robi tylko PhotoImage(data=…)
+                    pw, ph, ppx, _fw, _fh = preview
+                    self.preview_ppm = ppm_p6_bytes(pw, ph, ppx)
+                self.preview = preview
+            except Exception:
+                self.preview = None  # podgląd jest opcjonalny
+            self._check()
+            result = _read_full(self.kind, self.path, self._check)
+            self._check()
+            w, h, px = result
+            self.result_ppm = ppm_p6_bytes(w, h, px)
+            self._check(1.0)
+            self.result = result
+        except LoadCancelled:
+            self.cancelled = True
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
@@ -58,7 +58,8 @@ def _p3_token_stream(path: str, chunk_size: int = 1 << 20) -> Iterator[str]:
             yield buf.decode("ascii", errors="strict")
 
 
-def read_ppm_p3(path: str) -> Tuple[int, int, List[Tuple[int, int, int]]]:
+def read_ppm_p3(path: str, progress=None) -> Tuple[int, int, List[Tuple[int, int, int]]]:
+    """progress(ułamek 0..1) – wołane co pewną liczbę próbek (może przerwać wyjątkiem)."""
     ts = _p3_token_stream(path)
     try:
         magic = next(ts)
@@ -80,6 +81,8 @@ def read_ppm_p3(path: str) -> Tuple[int, int, List[Tuple[int, int, int]]]:
         if len(vals) >= expected:
             break
         vals.append(int(t))
+        if progress is not None and not len(vals) & 0xFFFF:
+            progress(len(vals) / expected)
     if len(vals) < expected:
         raise ValueError(f"Za mało próbek RGB: {len(vals)} < {expected}")
     px: List[Tuple[int, int, int]] = []
@@ -95,50 +98,57 @@ def read_ppm_p3(path: str) -> Tuple[int, int, List[Tuple[int, int, int]]]:
 # ---------- P6 (binarny) ----------
 
 
-def read_ppm_p6(path: str) -> Tuple[int, int, List[Tuple[int, int, int]]]:
+def _read_p6_header(f):
+    """Nagłówek P6 → (w, h, maxval); plik ustawiony na początku danych."""
+
+    def next_token():
+        ch = f.read(1)
+        while ch:
+            if ch == b"#":
+                # komentarz do końca linii
+                while True:
+                    c2 = f.read(1)
+                    if not c2 or c2 in (b"\n", b"\r"):
+                        break
+            elif ch.isspace():
+                pass
+            else:
+                break
+            ch = f.read(1)
+        if not ch:
+            return None
+        tok = bytearray()
+        tok.extend(ch)
+        while True:
+            c = f.peek(1)[:1]
+            if not c or c.isspace() or c == b"#":
+                break
+            f.read(1)
+            tok.extend(c)
+        return bytes(tok)
+
+    magic = next_token()
+    if magic != b"P6":
+        raise ValueError("To nie jest PPM P6 (magic != P6).")
+    w = int(next_token())
+    h = int(next_token())
+    maxval = int(next_token())
+    if w <= 0 or h <= 0 or maxval <= 0:
+        raise ValueError("Nieprawidłowy nagłówek P6.")
+
+    sep = f.read(1)
+    if not sep or not sep.isspace():
+        raise ValueError("Brak separatora danych po nagłówku P6.")
+    return w, h, maxval
+
+
+def read_ppm_p6(path: str, progress=None) -> Tuple[int, int, List[Tuple[int, int, int]]]:
+    """progress(ułamek 0..1) – wołane co blok wierszy (może przerwać wyjątkiem)."""
     import io
 
     with open(path, "rb") as raw:
         f = io.BufferedReader(raw)
-
-        def next_token():
-            ch = f.read(1)
-            while ch:
-                if ch == b"#":
-                    # komentarz do końca linii
-                    while True:
-                        c2 = f.read(1)
-                        if not c2 or c2 in (b"\n", b"\r"):
-                            break
-                elif ch.isspace():
-                    pass
-                else:
-                    break
-                ch = f.read(1)
-            if not ch:
-                return None
-            tok = bytearray()
-            tok.extend(ch)
-            while True:
-                c = f.peek(1)[:1]
-                if not c or c.isspace() or c == b"#":
-                    break
-                f.read(1)
-                tok.extend(c)
-            return bytes(tok)
-
-        magic = next_token()
-        if magic != b"P6":
-            raise ValueError("To nie jest PPM P6 (magic != P6).")
-        w = int(next_token())
-        h = int(next_token())
-        maxval = int(next_token())
-        if w <= 0 or h <= 0 or maxval <= 0:
-            raise ValueError("Nieprawidłowy nagłówek P6.")
-
-        sep = f.read(1)
-        if not sep or not sep.isspace():
-            raise ValueError("Brak separatora danych po nagłówku P6.")
+        w, h, maxval = _read_p6_header(f)
 
         bps = 1 if maxval <= 255 else 2
         total = w * h * 3 * bps
@@ -147,12 +157,16 @@ def read_ppm_p6(path: str) -> Tuple[int, int, List[Tuple[int, int, int]]]:
             raise ValueError("Za mało danych binarnych w P6.")
         px: List[Tuple[int, int, int]] = []
         if bps == 1:
-            it = iter(buf)
-            for _ in range(w * h):
-                r = _scale_to_255(next(it), maxval)
-                g = _scale_to_255(next(it), maxval)
-                b = _scale_to_255(next(it), maxval)
-                px.append((r, g, b))
+            if maxval != 255:
+                lut = bytes(min(255, _scale_to_255(v, maxval)) for v in range(256))
+                buf = buf.translate(lut)
+            # krotki (r,g,b) budowane w C (zip), blokami wierszy – z raportem postępu
+            step = max(1, h // 32) * w * 3
+            for a in range(0, total, step):
+                it = iter(buf[a : a + step])
+                px.extend(zip(it, it, it))
+                if progress is not None:
+                    progress(min(1.0, (a + step) / total))
         else:
             for i in range(0, len(buf), 6):
                 r16 = (buf[i] << 8) | buf[i + 1]
@@ -168,16 +182,69 @@ def read_ppm_p6(path: str) -> Tuple[int, int, List[Tuple[int, int, int]]]:
         return w, h, px
 
 
+def read_ppm_p6_preview(path: str, max_side: int):
+    """
+    Podgląd P6: co k-ty wiersz (seek) i co k-ty piksel, tak aby dłuższy bok
+    miał ok. max_side. Zwraca (w, h, piksele, pełne_w, pełne_h) albo None
+    dla próbek 16-bitowych.
+    """
+    import io
+
+    with open(path, "rb") as raw:
+        f = io.BufferedReader(raw)
+        w, h, maxval = _read_p6_header(f)
+        if maxval > 255:
+            return None
+        data_start = f.tell()
+        k = max(1, -(-max(w, h) // max_side))
+        row_bytes = w * 3
+        lut = None
+        if maxval != 255:
+            lut = bytes(min(255, _scale_to_255(v, maxval)) for v in range(256))
+        px: List[Tuple[int, int, int]] = []
+        rows = 0
+        for y in range(0, h, k):
+            raw.seek(data_start + y * row_bytes)
+            row = raw.read(row_bytes)
+            if len(row) < row_bytes:
+                break
+            if lut is not None:
+                row = row.translate(lut)
+            px.extend(zip(row[0::3 * k], row[1::3 * k], row[2::3 * k]))
+            rows += 1
+        pw = -(-w // k)
+        return pw, rows, px, w, h
+
+
 # ---------- autodetekcja ----------
 
 
-def read_ppm_auto(path: str):
+def read_ppm_auto(path: str, progress=None):
     with open(path, "rb") as f:
         magic = f.read(2)
     if magic == b"P3":
-        w, h, px = read_ppm_p3(path)
+        w, h, px = read_ppm_p3(path, progress)
         return w, h, px, "P3"
     if magic == b"P6":
-        w, h, px = read_ppm_p6(path)
+        w, h, px = read_ppm_p6(path, progress)
         return w, h, px, "P6"
     raise ValueError("Nieznany format PPM (magic nie P3/P6).")
+
+
+# ---------- zapis ----------
+
+
+def ppm_p6_bytes(w: int, h: int, pixels: List[Tuple[int, int, int]]) -> bytes:
+    """Cały plik PPM P6 (maxval 255) w pamięci – np. dla tk.PhotoImage(data=...)."""
+    if len(pixels) != w * h:
+        raise ValueError("Liczba pikseli nie zgadza się z rozmiarem obrazu.")
+    from itertools import chain
+
+    return b"P6\n%d %d\n255\n" % (w, h) + bytes(chain.from_iterable(pixels))
+
+
+def write_ppm_p6(path: str, w: int, h: int, pixels: List[Tuple[int, int, int]]):
+    """Zapis PPM P6 (maxval 255) – dane pikseli jednym blokiem bajtów."""
+    data = ppm_p6_bytes(w, h, pixels)
+    with open(path, "wb") as f:
+        f.write(data)
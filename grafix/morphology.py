@@ -0,0 +1,144 @@
+# grafix/morphology.py
+"""Morfologia obrazów binarnych (dylatacja, erozja, otwarcie, domknięcie, hit-or-miss)."""
+from .planes import cached_plane
+
+
+def pixels_to_binary(pixels):
+    """Zamienia listę pikseli RGB na obraz binarny 0/1 (średnia >= 128)."""
+    return cached_plane(pixels, "binary", 128)
+
+
+def binary_to_pixels(bin_img):
+    """Zamienia obraz binarny 0/1 na piksele (0 lub 255, RGB)."""
+    pixels = []
+    for v in bin_img:
+        val = 255 if v else 0
+        pixels.append((val, val, val))
+    return pixels
+
+
+def morph_dilate(bin_img, w, h, se):
+    kh = len(se)
+    kw = len(se[0])
+    cy = kh // 2
+    cx = kw // 2
+    out = [0] * (w * h)
+
+    for y in range(h):
+        for x in range(w):
+            val = 0
+            for j in range(kh):
+                for i in range(kw):
+                    if se[j][i] != 1:
+                        continue
+                    xx = x + i - cx
+                    yy = y + j - cy
+                    if 0 <= xx < w and 0 <= yy < h:
+                        if bin_img[yy * w + xx] == 1:
+                            val = 1
+                            break
+                if val:
+                    break
+            out[y * w + x] = val
+    return out
+
+
+def morph_erode(bin_img, w, h, se):
+    kh = len(se)
+    kw = len(se[0])
+    cy = kh // 2
+    cx = kw // 2
+    out = [0] * (w * h)
+
+    for y in range(h):
+        for x in range(w):
+            val = 1
+            for j in range(kh):
+                for i in range(kw):
+                    if se[j][i] != 1:
+                        continue
+                    xx = x + i - cx
+                    yy = y + j - cy
+                    if not (0 <= xx < w and 0 <= yy < h):
+                        val = 0
+                        break
+                    if bin_img[yy * w + xx] == 0:
+                        val = 0
+                        break
+                if val == 0:
+                    break
+            out[y * w + x] = val
+    return out
+
+
+def morph_hit_or_miss(bin_img, w, h, se):
+    """Hit-or-miss z użyciem wartości 1 (obiekt), -1 (tło), 0 (don't care)."""
+    kh = len(se)
+    kw = len(se[0])
+    cy = kh // 2
+    cx = kw // 2
+    out = [0] * (w * h)
+
+    for y in range(h):
+        for x in range(w):
+            match = True
+            for j in range(kh):
+                for i in range(kw):
+                    v = se[j][i]
+                    if v == 0:
+                        continue
+                    xx = x + i - cx
+                    yy = y + j - cy
+
+                    if v == 1:
+                        # musi trafić w 1
+                        if not (0 <= xx < w and 0 <= yy < h):
+                            match = False
+                            break
+                        if bin_img[yy * w + xx] != 1:
+                            match = False
+                            break
+                    elif v == -1:
+                        # musi trafić w tło (0); poza obrazem też traktujemy jako tło
+                        if 0 <= xx < w and 0 <= yy < h:
+                            if bin_img[yy * w + xx] != 0:
+                                match = False
+                                break
+                if not match:
+                    break
+            out[y * w + x] = 1 if match else 0
+    return out
+
+
+MORPH_MODES = ("dilate", "erode", "open", "close", "thin", "thicken")
+
+
+def morph_binary(bin_img, w, h, mode, se):
+    """Operacja morfologiczna `mode` na obrazie binarnym 0/1."""
+    if mode == "dilate":
+        return morph_dilate(bin_img, w, h, se)
+    if mode == "erode":
+        return morph_erode(bin_img, w, h, se)
+    if mode == "open":
+        tmp = morph_erode(bin_img, w, h, se)
+        return morph_dilate(tmp, w, h, se)
+    if mode == "close":
+        tmp = morph_dilate(bin_img, w, h, se)
+        return morph_erode(tmp, w, h, se)
+    if mode == "thin":
+        hm = morph_hit_or_miss(bin_img, w, h, se)
+        return [
+            1 if (bin_img[i] == 1 and hm[i] == 0) else 0 for i in range(len(bin_img))
+        ]
+    if mode == "thicken":
+        hm = morph_hit_or_miss(bin_img, w, h, se)
+        return [
+            1 if (bin_img[i] == 1 or hm[i] == 1) else 0 for i in range(len(bin_img))
+        ]
+    raise ValueError(f"Nieznany tryb morfologii: {mode}")
+
+
+def apply_morphology(pixels, w, h, mode, se):
+    """Binaryzacja (średnia >= 128), operacja morfologiczna i powrót do RGB."""
+    bin_img = pixels_to_binary(pixels)
+    return binary_to_pixels(morph_binary(bin_img, w, h, mode, se))
@@ -0,0 +1,79 @@
+# grafix/pipeline.py
+"""
+Przetwarzanie obrazów bez GUI: wczytanie → lista operacji → zapis.
+
+Operacje to te same rodzaje co w stosie korekt obrazu (`ADJUSTMENTS`: levels,
+gaussian, threshold_otsu, morphology …), zapisywane jak w scenie JSON:
+{"kind": "levels", "params": {"in_min": 20, "in_max": 230}}.
+Łańcuch wykonuje AdjustmentStack – sąsiednie operacje punktowe są składane
+w jedną LUT i stosowane w jednym przebiegu.
+
+Plik potoku (JSON, albo YAML gdy zainstalowany jest PyYAML):
+    {"input": "in.ppm", "output": "out.jpg", "quality": 90,
+     "steps": [{"kind": "gaussian"}, {"kind": "threshold_otsu"}]}
+"""
+import json
+import os
+from typing import List
+
+from .adjustments import ADJUSTMENTS, Adjustment, AdjustmentStack, parse_params_text
+from .io.image_file import read_image, write_image
+
+
+def parse_step(text: str) -> Adjustment:
+    """Krok z tekstu: „gaussian” albo „levels: in_min=20; in_max=230”."""
+    kind, _, params = text.partition(":")
+    op = Adjustment(kind.strip(), parse_params_text(params))
+    op.spec  # walidacja rodzaju
+    return op
+
+
+def steps_from_spec(spec) -> List[Adjustment]:
+    """Kroki z listy albo ze słownika potoku (klucz "steps"); krok – dict albo tekst."""
+    items = spec.get("steps", []) if isinstance(spec, dict) else spec
+    steps = []
+    for item in items:
+        op = parse_step(item) if isinstance(item, str) else Adjustment.from_dict(item)
+        op.spec
+        steps.append(op)
+    return steps
+
+
+def load_pipeline(path: str) -> dict:
+    """Wczytuje plik potoku (.json, .yaml/.yml) → słownik."""
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, "r", encoding="utf-8") as f:
+        if ext in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError as e:
+                raise ImportError(
+                    "Brak biblioteki PyYAML. Zainstaluj: pip install PyYAML"
+                ) from e
+            spec = yaml.safe_load(f)
+        else:
+            spec = json.load(f)
+    if isinstance(spec, list):
+        spec = {"steps": spec}
+    return spec
+
+
+def run_steps(w: int, h: int, pixels, steps: List[Adjustment]):
+    """Wykonuje kroki na pikselach (w×h) i zwraca wynik."""
+    stack = AdjustmentStack(w, h, pixels)
+    for op in steps:
+        stack.push(op.kind, **op.params)
+    return stack.evaluate()
+
+
+def run_pipeline(input_path: str, output_path: str, steps: List[Adjustment], quality=90):
+    """Wczytanie → kroki → zapis. Zwraca (w, h) obrazu."""
+    w, h, pixels = read_image(input_path)
+    pixels = run_steps(w, h, pixels, steps)
+    write_image(output_path, w, h, pixels, quality=quality)
+    return w, h
+
+
+def available_steps():
+    """[(rodzaj, opis)] – operacje dostępne w potoku."""
+    return [(kind, spec.label) for kind, spec in ADJUSTMENTS.items()]
@@ -0,0 +1,99 @@
+# grafix/planes.py
+"""
+Plany pochodne obrazu: jasność (luma), średnia szarość i obraz binarny.
+
+Histogram, progowanie, Sobel i morfologia potrzebują tych samych planów –
+liczymy je raz na obraz i trzymamy w pamięci (klucz: tożsamość listy pikseli;
+listy pikseli nie są modyfikowane w miejscu – każda zmiana tworzy nową listę).
+"""
+from collections import Counter, OrderedDict
+
+# Luma Rec.601 w arytmetyce stałoprzecinkowej: 299R + 587G + 114B (×1000),
+# zaokrąglenie „połówka w górę” – tablice na kanał zamiast mnożeń float.
+_LUMA_R = [299 * v for v in range(256)]
+_LUMA_G = [587 * v for v in range(256)]
+_LUMA_B = [114 * v + 500 for v in range(256)]  # +500 = zaokrąglenie
+_DIV_1000 = bytes(s // 1000 for s in range(255 * 1000 + 501))
+
+# średnia (R+G+B)/3 – suma 0..765 → jasność
+_AVG = bytes(int(round(s / 3.0)) for s in range(766))
+
+
+def luma_plane(pixels) -> bytes:
+    """Jasność 0.299R + 0.587G + 0.114B (0..255) każdego piksela."""
+    R, G, B, D = _LUMA_R, _LUMA_G, _LUMA_B, _DIV_1000
+    return bytes([D[R[r] + G[g] + B[b]] for r, g, b in pixels])
+
+
+def avg_plane(pixels) -> bytes:
+    """Średnia (R+G+B)/3 (0..255) każdego piksela."""
+    A = _AVG
+    return bytes([A[r + g + b] for r, g, b in pixels])
+
+
+def binary_plane(pixels, T=128) -> bytes:
+    """Obraz binarny 0/1: 1 gdy średnia (R+G+B)/3 >= T."""
+    lut = bytes(1 if s >= 3 * T else 0 for s in range(766))
+    return bytes([lut[r + g + b] for r, g, b in pixels])
+
+
+def plane_histogram(plane):
+    """Histogram 256 binów z planu 0..255 (zliczanie w C – Counter)."""
+    counts = Counter(plane)
+    return [counts.get(i, 0) for i in range(256)]
+
+
+PLANES = {
+    "luma": luma_plane,
+    "avg": avg_plane,
+    "binary": binary_plane,
+}
+
+
+def register_plane(kind, func):
+    """Dodaje rodzaj planu: func(pixels, *args) → wynik przechowywany w pamięci planów."""
+    PLANES[kind] = func
+
+
+class PlaneCache:
+    """
+    Plany dla kilku ostatnio używanych list pikseli.
+    Wpis trzyma referencję do listy, więc jej id() nie może zostać użyte ponownie.
+    """
+
+    def __init__(self, size=4):
+        self.size = size
+        self._items = OrderedDict()  # id(pixels) → (pixels, {klucz: plan})
+
+    def get(self, pixels, kind, *args):
+        entry = self._items.get(id(pixels))
+        if entry is None or entry[0] is not pixels:
+            entry = (pixels, {})
+            self._items[id(pixels)] = entry
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+        else:
+            self._items.move_to_end(id(pixels))
+        key = (kind,) + args
+        planes = entry[1]
+        plane = planes.get(key)
+        if plane is None:
+            plane = PLANES[kind](pixels, *args)
+            planes[key] = plane
+        return plane
+
+    def clear(self):
+        self._items.clear()
+
+
+_shared = PlaneCache()
+
+
+def cached_plane(pixels, kind, *args):
+    """Plan `kind` ('luma', 'avg', 'binary' [, T]) – z pamięci, jeśli już liczony."""
+    return _shared.get(pixels, kind, *args)
+
+
+def clear_plane_cache():
+    """Czyści wspólną pamięć planów (np. przed pomiarem czasu albo po dużym obrazie)."""
+    _shared.clear()
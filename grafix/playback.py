@@ -0,0 +1,168 @@
+# grafix/playback.py
+"""
+Odtwarzanie animacji w oknach wizualizacji (obrót kostki/stożka, przesuw cięć).
+
+Klatki planowane są przez after() z zadanym FPS. Animacja postępuje wg czasu
+rzeczywistego (dt), więc gdy rysowanie nie nadąża, klatki są pomijane, a ruch
+zachowuje prędkość. Przy długich klatkach obniżana jest gęstość voxeli.
+Osiągnięty FPS raportowany jest co sekundę.
+"""
+import time
+import tkinter as tk
+from tkinter import ttk
+
+
+class Playback:
+    """
+    frame(dt, density) – przesuwa animację o dt sekund i rysuje klatkę
+    w gęstości density (ułamek liczby voxeli na oś, 1.0 = pełna).
+    """
+
+    DENSITY_LEVELS = (1.0, 0.75, 0.5, 0.35)
+
+    def __init__(self, widget, frame, fps=30, on_stats=None):
+        self.widget = widget
+        self.frame = frame
+        self.fps = fps
+        self.on_stats = on_stats  # callback(playback) co ~1 s
+        self.level = 0  # indeks w DENSITY_LEVELS
+        self.achieved_fps = 0.0
+        self.dropped = 0  # pominięte klatki w ostatnim okresie
+        self.frame_ms = 0.0  # średni czas rysowania klatki
+        self._after_id = None
+        self._avg_cost = None
+        self._calm = 0  # kolejne klatki z dużym zapasem czasu
+
+    @property
+    def running(self):
+        return self._after_id is not None
+
+    @property
+    def density(self):
+        return self.DENSITY_LEVELS[self.level]
+
+    @property
+    def budget(self):
+        """Czas na klatkę [s]."""
+        return 1.0 / max(1, self.fps)
+
+    def start(self):
+        if self.running:
+            return
+        now = time.perf_counter()
+        self._last = now
+        self._period_start = now
+        self._frames = 0
+        self.dropped = 0
+        self._after_id = self.widget.after(1, self._tick)
+
+    def stop(self):
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+        self.level = 0
+        self._avg_cost = None
+        self._calm = 0
+
+    def _tick(self):
+        now = time.perf_counter()
+        dt = now - self._last
+        self._last = now
+        budget = self.budget
+        if dt > 1.5 * budget:
+            self.dropped += int(dt / budget) - 1
+
+        self.frame(dt, self.density)
+        cost = time.perf_counter() - now
+        self._adapt(cost, budget)
+
+        self._frames += 1
+        period = now - self._period_start
+        if period >= 1.0:
+            self.achieved_fps = self._frames / period
+            if self.on_stats is not None:
+                self.on_stats(self)
+            self._period_start = now
+            self._frames = 0
+            self.dropped = 0
+
+        delay = max(1, int((budget - cost) * 1000))
+        self._after_id = self.widget.after(delay, self._tick)
+
+    def _adapt(self, cost, budget):
+        """Średni koszt klatki powyżej budżetu → mniejsza gęstość; dużo zapasu → większa."""
+        avg = cost if self._avg_cost is None else 0.8 * self._avg_cost + 0.2 * cost
+        self._avg_cost = avg
+        self.frame_ms = avg * 1000
+        if avg > 1.1 * budget:
+            self._calm = 0
+            if self.level < len(self.DENSITY_LEVELS) - 1:
+                self.level += 1
+                self._avg_cost = None  # nowa gęstość – mierzymy od nowa
+        elif avg < 0.4 * budget and self.level > 0:
+            # powrót do większej gęstości dopiero po ~1 s zapasu (bez oscylacji)
+            self._calm += 1
+            if self._calm >= self.fps:
+                self.level -= 1
+                self._avg_cost = None
+                self._calm = 0
+        else:
+            self._calm = 0
+
+    def summary(self):
+        return (
+            f"{self.achieved_fps:.1f}/{self.fps} FPS, "
+            f"klatka {self.frame_ms:.0f} ms, gęstość {self.density:.0%}, "
+            f"pominięte {self.dropped}"
+        )
+
+
+class PlaybackBar(ttk.LabelFrame):
+    """
+    Pasek sterowania odtwarzaniem: start/stop, docelowy FPS, opcjonalny wybór
+    trybu (mode_var) i bieżące statystyki.
+    on_stop() – wywoływane po zatrzymaniu (np. przerysowanie w pełnej gęstości).
+    """
+
+    def __init__(self, parent, playback, on_stop=None, modes=None):
+        super().__init__(parent, text="Animacja")
+        self.playback = playback
+        self.on_stop = on_stop
+        playback.on_stats = self._show_stats
+
+        self.fps_var = tk.IntVar(value=playback.fps)
+        self.mode_var = tk.StringVar(value=modes[0] if modes else "")
+        self.info = tk.StringVar(value="")
+
+        self.btn = ttk.Button(self, text="▶ Odtwarzaj", command=self.toggle)
+        self.btn.grid(row=0, column=0, padx=4, pady=(2, 0))
+        if modes:
+            ttk.Combobox(
+                self, textvariable=self.mode_var, values=modes, state="readonly", width=10
+            ).grid(row=0, column=1, padx=4, pady=(2, 0))
+        ttk.Label(self, text="FPS:").grid(row=0, column=2, sticky="e", pady=(2, 0))
+        ttk.Spinbox(self, from_=5, to=60, width=4, textvariable=self.fps_var).grid(
+            row=0, column=3, sticky="w", padx=(2, 4), pady=(2, 0)
+        )
+        ttk.Label(self, textvariable=self.info, anchor="w").grid(
+            row=1, column=0, columnspan=4, sticky="ew", padx=4, pady=(0, 2)
+        )
+
+    def toggle(self):
+        pb = self.playback
+        if pb.running:
+            pb.stop()
+            self.btn.config(text="▶ Odtwarzaj")
+            self.info.set("")
+            if self.on_stop is not None:
+                self.on_stop()
+            return
+        try:
+            pb.fps = max(1, min(120, int(self.fps_var.get())))
+        except (tk.TclError, ValueError):
+            pb.fps = 30
+        pb.start()
+        self.btn.config(text="■ Stop")
+
+    def _show_stats(self, pb):
+        self.info.set(pb.summary())
@@ -0,0 +1,127 @@
+# grafix/profiling.py
+"""
+Lekki pomiar czasu operacji GUI.
+
+Każda operacja (filtr, morfologia, wczytanie, zapis, historia …) to „odcinek”
+(span): nazwa, początek, czas trwania, rozmiar obrazu i opcjonalnie pamięć
+zaalokowana w trakcie (tracemalloc). Ostatnie odcinki trzymane są w buforze
+cyklicznym i mogą zostać zapisane jako Chrome trace JSON
+(chrome://tracing, Perfetto).
+"""
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+
+
+class Profiler:
+    def __init__(self, max_events=5000):
+        self.events = deque(maxlen=max_events)
+        self.trace_memory = False
+        self.last = None  # ostatni zakończony odcinek najwyższego poziomu
+        self.on_span_end = None  # callback(event) dla odcinków najwyższego poziomu
+        self._depth = 0
+        self._t0 = time.perf_counter()
+
+    # ---------- pamięć ----------
+    def set_trace_memory(self, enabled: bool):
+        """Włącza/wyłącza tracemalloc (spowalnia alokacje – tylko na czas diagnozy)."""
+        self.trace_memory = bool(enabled)
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif not self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    # ---------- odcinki ----------
+    @contextmanager
+    def span(self, name, **args):
+        """Mierzy blok kodu; args (np. size=(w, h)) trafiają do zdarzenia."""
+        top = self._depth == 0
+        mem = self.trace_memory and tracemalloc.is_tracing()
+        if mem and top:
+            tracemalloc.reset_peak()
+        mem_start = tracemalloc.get_traced_memory()[0] if mem else 0
+        self._depth += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self._depth -= 1
+            if mem:
+                cur, peak = tracemalloc.get_traced_memory()
+                args["alloc_kb"] = round((cur - mem_start) / 1024, 1)
+                if top:
+                    args["peak_kb"] = round((peak - mem_start) / 1024, 1)
+            event = {
+                "name": name,
+                "ts": (start - self._t0) * 1e6,  # µs od startu profilera
+                "dur": (end - start) * 1e6,
+                "depth": self._depth,
+                "args": args,
+            }
+            self.events.append(event)
+            if top:
+                self.last = event
+                if self.on_span_end is not None:
+                    self.on_span_end(event)
+
+    def wrap(self, func, name=None, args_of=None):
+        """Funkcja owinięta odcinkiem; args_of() → dodatkowe argumenty zdarzenia."""
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*a, **kw):
+            with self.span(label, **(args_of() if args_of else {})):
+                return func(*a, **kw)
+
+        return wrapper
+
+    def instrument(self, obj, names, args_of=None):
+        """Podmienia metody instancji `obj` o podanych nazwach na wersje mierzone."""
+        for attr in names:
+            method = getattr(obj, attr, None)
+            if callable(method):
+                setattr(obj, attr, self.wrap(method, attr, args_of))
+
+    # ---------- eksport ----------
+    def to_chrome_trace(self):
+        """Zdarzenia w formacie Chrome trace (zdarzenia „X” – pełne odcinki)."""
+        pid, tid = os.getpid(), threading.get_ident()
+        return {
+            "traceEvents": [
+                {
+                    "name": e["name"],
+                    "cat": "grafix",
+                    "ph": "X",
+                    "ts": round(e["ts"], 1),
+                    "dur": round(e["dur"], 1),
+                    "pid": pid,
+                    "tid": tid,
+                    "args": e["args"],
+                }
+                for e in self.events
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def dump_chrome_trace(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f, ensure_ascii=False)
+
+    def summary(self, event=None) -> str:
+        """Krótki opis odcinka do paska stanu."""
+        e = event or self.last
+        if e is None:
+            return ""
+        txt = f"{e['name']}: {e['dur'] / 1000:.0f} ms"
+        size = e["args"].get("size")
+        if size:
+            txt += f" ({size[0]}×{size[1]})"
+        if "peak_kb" in e["args"]:
+            txt += f", pamięć {e['args']['peak_kb'] / 1024:.1f} MB"
+        return txt
@@ -3,5 +3,6 @@ from .surface_canvas import CanvasSurface
 
 # PhotoImage wariant jest opcjonalny:
 from .surface_photoimage import PhotoSurface  # nieużywany domyślnie
+from .splat_buffer import SplatBuffer
 
-__all__ = ["Surface", "CanvasSurface", "PhotoSurface"]
+__all__ = ["Surface", "CanvasSurface", "PhotoSurface", "SplatBuffer"]
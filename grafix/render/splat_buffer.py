@@ -0,0 +1,65 @@
+import tkinter as tk
+
+
+class SplatBuffer:
+    """
+    Bufor pikseli RGB dla wizualizacji 3D (kostka RGB, stożek HSV).
+
+    Zamiast tysięcy prostokątów Canvas każdy voxel to kwadratowy „splat”
+    wpisywany wierszami (przypisanie wycinka bytearray) do bufora w pamięci.
+    Cały obraz trafia na Canvas jako jeden PhotoImage (dane PPM).
+
+    Głębokość: splaty mają stałą głębokość na całej powierzchni, więc
+    rysowanie od najdalszego do najbliższego (nadpisywanie) daje ten sam
+    obraz co test z-bufora na piksel – bez porównań w pętli Pythona.
+    """
+
+    def __init__(self, w, h, bg=(255, 255, 255)):
+        self.w = w
+        self.h = h
+        self._blank = bytes(bg) * (w * h)
+        self.buf = bytearray(self._blank)
+        self._header = b"P6 %d %d 255\n" % (w, h)
+
+    def clear(self):
+        self.buf[:] = self._blank
+
+    def draw(self, splats, size):
+        """
+        splats: (sx, sy, rgb) posortowane od najdalszego; rgb = bytes((r, g, b)).
+        size: bok kwadratu w pikselach (jak prostokąt sx±size/2 na Canvas).
+        """
+        self.draw_sized((sx, sy, size, rgb) for sx, sy, rgb in splats)
+
+    def draw_sized(self, splats):
+        """Jak draw, ale każdy splat ma własny rozmiar: (sx, sy, size, rgb)."""
+        w, h, buf = self.w, self.h, self.buf
+        stride = 3 * w
+        for sx, sy, size, rgb in splats:
+            half = size / 2
+            x0 = int(round(sx - half))
+            x1 = int(round(sx + half))
+            y0 = int(round(sy - half))
+            y1 = int(round(sy + half))
+            if x0 < 0:
+                x0 = 0
+            if x1 > w:
+                x1 = w
+            if y0 < 0:
+                y0 = 0
+            if y1 > h:
+                y1 = h
+            if x0 >= x1 or y0 >= y1:
+                continue
+            run = rgb * (x1 - x0)
+            n = len(run)
+            start = y0 * stride + 3 * x0
+            for o in range(start, start + (y1 - y0) * stride, stride):
+                buf[o : o + n] = run
+
+    def ppm(self) -> bytes:
+        return self._header + bytes(self.buf)
+
+    def photo(self) -> tk.PhotoImage:
+        """Zawartość bufora jako nowy PhotoImage (jedno wczytanie danych PPM)."""
+        return tk.PhotoImage(width=self.w, height=self.h, data=self.ppm(), format="PPM")
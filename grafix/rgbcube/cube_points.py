@@ -1,7 +1,18 @@
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, messagebox
 import math
 
+from ..playback import Playback, PlaybackBar
+from ..render.splat_buffer import SplatBuffer
+from ..voxels import (
+    PickIndex,
+    color_bins,
+    image_cube_cloud,
+    rgb_cube_grid,
+    rgb_slice_ppm,
+    rotation_matrix,
+)
+
 
 class RGBCubePointsWindow(tk.Toplevel):
     """
@@ -11,6 +22,8 @@ class RGBCubePointsWindow(tk.Toplevel):
     - kliknięcie pokazuje przekrój (stałe R) po prawej.
     """
 
+    ROTATE_SPEED = 45.0  # °/s – obrót przy odtwarzaniu
+
     def __init__(self, master):
         super().__init__(master)
         self.master_app = master
@@ -25,15 +38,35 @@ class RGBCubePointsWindow(tk.Toplevel):
         self.angle_y = tk.DoubleVar(value=-30.0)
         self.angle_z = tk.DoubleVar(value=0.0)
 
-        # lista voxelów po rzutowaniu: (sx, sy, i, j, k)
+        # lista voxelów po rzutowaniu: (sx, sy, (i, j, k))
         self._points = []
 
+        # indeks wyboru punktów (budowany leniwie po obrocie) i podgląd pod kursorem
+        self._pick = None
+        self._slice_index = None
+        self.hover_var = tk.BooleanVar(value=False)
+
+        # bufor pikseli widoku 3D i jego PhotoImage na Canvas
+        self._splats = None
+        self._photo = None
+        self._image_item = None
+        self._slice_photo = None  # obraz przekroju (dane z pamięci przekrojów)
+
+        # źródło punktów: siatka przestrzeni barw albo kolory zaznaczonego obrazu
+        self.source_var = tk.StringVar(value="grid")
+        self.cloud_info = tk.StringVar(value="")
+        self._cloud_image = None
+
+        # odtwarzanie (obrót) – klatki przez after()
+        self.playback = Playback(self, self._play_frame)
+
         self._build_ui()
         self._redraw_cube()
 
         self.protocol("WM_DELETE_WINDOW", self._on_close)
 
     def _on_close(self):
+        self.playback.stop()
         if hasattr(self.master_app, "rgb_cube_points_win"):
             self.master_app.rgb_cube_points_win = None
         self.destroy()
@@ -92,7 +125,31 @@ class RGBCubePointsWindow(tk.Toplevel):
 
         rot.columnconfigure(1, weight=1)
 
+        self.playback_bar = PlaybackBar(left, self.playback, on_stop=self._redraw_cube)
+        self.playback_bar.pack(fill="x", pady=(6, 0))
+
+        src = ttk.LabelFrame(left, text="Źródło punktów")
+        src.pack(fill="x", pady=(6, 0))
+        ttk.Radiobutton(
+            src,
+            text="Siatka",
+            value="grid",
+            variable=self.source_var,
+            command=self._on_source_change,
+        ).grid(row=0, column=0, sticky="w", padx=4)
+        ttk.Radiobutton(
+            src,
+            text="Kolory obrazu (zaznaczony)",
+            value="image",
+            variable=self.source_var,
+            command=self._on_source_change,
+        ).grid(row=0, column=1, sticky="w", padx=4)
+        ttk.Label(src, textvariable=self.cloud_info, anchor="w").grid(
+            row=1, column=0, columnspan=2, sticky="ew", padx=4, pady=(0, 2)
+        )
+
         self.canvas_cube.bind("<Button-1>", self._on_click_cube)
+        self.canvas_cube.bind("<Motion>", self._on_hover_cube)
 
         # --- PRAWA: przekrój ---
         right = ttk.Frame(main)
@@ -102,6 +159,9 @@ class RGBCubePointsWindow(tk.Toplevel):
             right, text="Przekrój: kliknij w kostkę, aby wybrać R", anchor="w"
         )
         self.slice_info.pack(fill="x", pady=(0, 4))
+        ttk.Checkbutton(
+            right, text="Podgląd pod kursorem", variable=self.hover_var
+        ).pack(anchor="w", pady=(0, 4))
 
         self.canvas_slice = tk.Canvas(
             right,
@@ -115,135 +175,130 @@ class RGBCubePointsWindow(tk.Toplevel):
 
     # --- 3D ---
 
-    def _rotate_point(self, x, y, z, ax, ay, az):
-        # — obrót wokół osi X —
-        cosx = math.cos(ax)
-        sinx = math.sin(ax)
-        y1 = y * cosx - z * sinx
-        z1 = y * sinx + z * cosx
-        x1 = x
-
-        # — obrót wokół osi Y —
-        cosy = math.cos(ay)
-        siny = math.sin(ay)
-        x2 = x1 * cosy + z1 * siny
-        z2 = -x1 * siny + z1 * cosy
-        y2 = y1
-
-        # — obrót wokół osi Z —
-        cosz = math.cos(az)
-        sinz = math.sin(az)
-        x3 = x2 * cosz - y2 * sinz
-        y3 = x2 * sinz + y2 * cosz
-        z3 = z2
-
-        return x3, y3, z3
-
-    def _redraw_cube(self):
-        self.canvas_cube.delete("all")
-        self._points.clear()
-
+    def _redraw_cube(self, density=1.0):
+        """density < 1 – rzadsza siatka (odtwarzanie pod obciążeniem)."""
         w = int(self.canvas_cube["width"])
         h = int(self.canvas_cube["height"])
-        cx = w / 2
-        cy = h / 2
         scale = min(w, h) * 0.4
 
-        ax = math.radians(self.angle_x.get())
-        ay = math.radians(self.angle_y.get())
-        az = math.radians(self.angle_z.get())
-
-        voxels = []
-
-        for i in range(self.steps):
-            r = int(round(i / (self.steps - 1) * 255))
-            x = i / (self.steps - 1) - 0.5
-
-            for j in range(self.steps):
-                g = int(round(j / (self.steps - 1) * 255))
-                y = j / (self.steps - 1) - 0.5
-
-                for k in range(self.steps):
-                    b = int(round(k / (self.steps - 1) * 255))
-                    z = k / (self.steps - 1) - 0.5
-
-                    xr, yr, zr = self._rotate_point(x, y, z, ax, ay, az)
-                    sx = cx + xr * scale
-                    sy = cy - yr * scale
-                    color = f"#{r:02x}{g:02x}{b:02x}"
-                    voxels.append((zr, sx, sy, i, j, k, color))
+        rot = rotation_matrix(
+            math.radians(self.angle_x.get()),
+            math.radians(self.angle_y.get()),
+            math.radians(self.angle_z.get()),
+        )
+        if self._cloud_image is not None:
+            self._redraw_cloud(rot, w, h, scale)
+            return
 
-        voxels.sort(key=lambda t: t[0])
+        steps = max(2, int(round(self.steps * density)))
+        grid = rgb_cube_grid(steps)
+        order, sx, sy = grid.project(rot, w / 2, h / 2, scale)
 
         size_pt = 5
-        for zr, sx, sy, i, j, k, color in voxels:
-            self.canvas_cube.create_rectangle(
-                sx - size_pt / 2,
-                sy - size_pt / 2,
-                sx + size_pt / 2,
-                sy + size_pt / 2,
-                fill=color,
-                outline="",
-            )
-            self._points.append((sx, sy, i, j, k))
+        # klucze rzadszej siatki nie pasują do self.steps – wtedy bez wyboru przekroju
+        self._points = grid.points(order, sx, sy) if steps == self.steps else []
+        self._pick = None
+        self._blit_cube(grid.splats(order, sx, sy), size_pt)
+
+    def _redraw_cloud(self, rot, w, h, scale):
+        """Chmura kolorów obrazu: przedziały 32³, rozmiar i krycie wg liczności."""
+        img = self._cloud_image
+        grid = image_cube_cloud(img.src_pixels, img.src_w, self.steps)
+        order, sx, sy = grid.project(rot, w / 2, h / 2, scale)
+        self._points = grid.points(order, sx, sy)
+        self._pick = None
+        self._blit_cube(grid.sized_splats(order, sx, sy, 2, 14))
+
+    def _selected_image(self):
+        from ..shapes.image import RasterImage
+
+        obj = self.master_app.sel.obj
+        return obj if isinstance(obj, RasterImage) else None
+
+    def _on_source_change(self):
+        self._cloud_image = None
+        self.cloud_info.set("")
+        if self.source_var.get() == "image":
+            img = self._selected_image()
+            if img is None:
+                messagebox.showinfo("Chmura kolorów", "Zaznacz obraz w głównym oknie.")
+                self.source_var.set("grid")
+            else:
+                self._cloud_image = img
+                cb = color_bins(img.src_pixels, img.src_w)
+                self.cloud_info.set(
+                    f"{img.src_w}×{img.src_h}: {cb.samples} próbek (co {cb.step}. piksel), "
+                    f"{len(cb.counts)} przedziałów"
+                )
+        self._redraw_cube()
+
+    def _play_frame(self, dt, density):
+        """Klatka animacji: obrót wokół osi Y."""
+        a = self.angle_y.get() + self.ROTATE_SPEED * dt
+        self.angle_y.set((a + 180.0) % 360.0 - 180.0)
+        self._redraw_cube(density)
+
+    def _blit_cube(self, splats, size=None):
+        """Splaty → bufor pikseli → jeden PhotoImage (size=None: rozmiar podany w splacie)."""
+        canvas = self.canvas_cube
+        w = int(canvas["width"])
+        h = int(canvas["height"])
+        if self._splats is None or (self._splats.w, self._splats.h) != (w, h):
+            self._splats = SplatBuffer(w, h)
+        self._splats.clear()
+        if size is None:
+            self._splats.draw_sized(splats)
+        else:
+            self._splats.draw(splats, size)
+        self._photo = self._splats.photo()  # referencja – inaczej Tk zwolni obraz
+        if self._image_item is None:
+            self._image_item = canvas.create_image(0, 0, image=self._photo, anchor="nw")
+        else:
+            canvas.itemconfigure(self._image_item, image=self._photo)
 
     # --- klik i przekrój ---
 
     def _on_click_cube(self, event):
-        if not self._points:
+        """Przekrój dla voxela najbliższego kliknięciu."""
+        ijk = self._pick_at(event.x, event.y)
+        if ijk is not None:
+            self._draw_slice(ijk[0])
+
+    def _on_hover_cube(self, event):
+        """Podgląd przekroju pod kursorem (gdy włączony) – tylko przy zmianie warstwy."""
+        if not self.hover_var.get():
             return
+        ijk = self._pick_at(event.x, event.y)
+        if ijk is not None and ijk[0] != self._slice_index:
+            self._draw_slice(ijk[0])
 
-        ex, ey = event.x, event.y
-        best = None
-        best_d2 = 1e9
-
-        for sx, sy, i, j, k in self._points:
-            dx = sx - ex
-            dy = sy - ey
-            d2 = dx * dx + dy * dy
-            if d2 < best_d2:
-                best_d2 = d2
-                best = (i, j, k)
-
-        if best is None:
-            return
-
-        r_index = best[0]
-        self._draw_slice(r_index)
+    def _pick_at(self, x, y):
+        """Klucz voxela najbliższego punktowi ekranu albo None."""
+        if not self._points:
+            return None
+        if self._pick is None:
+            self._pick = PickIndex(self._points)
+        return self._pick.nearest(x, y)
 
     def _draw_slice(self, r_index):
+        self._slice_index = r_index
         self.canvas_slice.delete("all")
 
         steps = self.steps
         w = int(self.canvas_slice["width"])
         h = int(self.canvas_slice["height"])
         size = min(w, h) - 20
-        cell = size / steps
         offset_x = (w - size) / 2
         offset_y = (h - size) / 2
 
         r_val = int(round(r_index / (steps - 1) * 255))
         self.slice_info.config(text=f"Przekrój dla R = {r_val} (0–255)")
 
-        for j in range(steps):
-            g_val = int(round(j / (steps - 1) * 255))
-            for k in range(steps):
-                b_val = int(round(k / (steps - 1) * 255))
-
-                x1 = offset_x + k * cell
-                y1 = offset_y + j * cell
-                x2 = x1 + cell
-                y2 = y1 + cell
-
-                color = f"#{r_val:02x}{g_val:02x}{b_val:02x}"
-                self.canvas_slice.create_rectangle(
-                    x1,
-                    y1,
-                    x2,
-                    y2,
-                    fill=color,
-                    outline="",
-                )
+        # płaszczyzna G×B liczona na piksel i trzymana w pamięci (klucz: R i rozmiar)
+        self._slice_photo = tk.PhotoImage(data=rgb_slice_ppm(r_val, size), format="PPM")
+        self.canvas_slice.create_image(
+            offset_x, offset_y, image=self._slice_photo, anchor="nw"
+        )
 
         self.canvas_slice.create_rectangle(
             offset_x,
@@ -2,6 +2,10 @@ import tkinter as tk
 from tkinter import ttk
 import math
 
+from ..playback import Playback, PlaybackBar
+from ..render.splat_buffer import SplatBuffer
+from ..voxels import PickIndex, rgb_cube_grid, rgb_slice_ppm, rotation_matrix
+
 
 class RGBCubeSliceWindow(tk.Toplevel):
     """
@@ -12,6 +16,9 @@ class RGBCubeSliceWindow(tk.Toplevel):
     - kliknięcie pokazuje przekrój (stałe R) po prawej.
     """
 
+    ROTATE_SPEED = 45.0  # °/s – obrót przy odtwarzaniu
+    SWEEP_PERIOD = 4.0  # s – pełny przesuw cięcia tam i z powrotem
+
     def __init__(self, master):
         super().__init__(master)
         self.master_app = master
@@ -30,12 +37,28 @@ class RGBCubeSliceWindow(tk.Toplevel):
 
         self._points = []
 
+        # indeks wyboru punktów (budowany leniwie po obrocie) i podgląd pod kursorem
+        self._pick = None
+        self._slice_index = None
+        self.hover_var = tk.BooleanVar(value=False)
+
+        # bufor pikseli widoku 3D i jego PhotoImage na Canvas
+        self._splats = None
+        self._photo = None
+        self._image_item = None
+        self._slice_photo = None  # obraz przekroju (dane z pamięci przekrojów)
+
+        # odtwarzanie (obrót / przesuw cięć) – klatki przez after()
+        self.playback = Playback(self, self._play_frame)
+        self._sweep_t = 0.5  # faza przesuwu (0.5 = pełna kostka)
+
         self._build_ui()
         self._redraw_cube()
 
         self.protocol("WM_DELETE_WINDOW", self._on_close)
 
     def _on_close(self):
+        self.playback.stop()
         if hasattr(self.master_app, "rgb_cube_slice_win"):
             self.master_app.rgb_cube_slice_win = None
         self.destroy()
@@ -131,7 +154,16 @@ class RGBCubeSliceWindow(tk.Toplevel):
 
         clip.columnconfigure(1, weight=1)
 
+        self.playback_bar = PlaybackBar(
+            left,
+            self.playback,
+            on_stop=self._redraw_cube,
+            modes=("Obrót", "Cięcie R", "Cięcie G", "Cięcie B"),
+        )
+        self.playback_bar.pack(fill="x", pady=(6, 0))
+
         self.canvas_cube.bind("<Button-1>", self._on_click_cube)
+        self.canvas_cube.bind("<Motion>", self._on_hover_cube)
 
         # --- PRAWA: przekrój ---
         right = ttk.Frame(main)
@@ -141,6 +173,9 @@ class RGBCubeSliceWindow(tk.Toplevel):
             right, text="Przekrój: kliknij w kostkę, aby wybrać R", anchor="w"
         )
         self.slice_info.pack(fill="x", pady=(0, 4))
+        ttk.Checkbutton(
+            right, text="Podgląd pod kursorem", variable=self.hover_var
+        ).pack(anchor="w", pady=(0, 4))
 
         self.canvas_slice = tk.Canvas(
             right,
@@ -154,151 +189,120 @@ class RGBCubeSliceWindow(tk.Toplevel):
 
     # --- 3D ---
 
-    def _rotate_point(self, x, y, z, ax, ay, az):
-        # obrót wokół X
-        cosx = math.cos(ax)
-        sinx = math.sin(ax)
-        y1 = y * cosx - z * sinx
-        z1 = y * sinx + z * cosx
-        x1 = x
-
-        # obrót wokół Y
-        cosy = math.cos(ay)
-        siny = math.sin(ay)
-        x2 = x1 * cosy + z1 * siny
-        z2 = -x1 * siny + z1 * cosy
-        y2 = y1
-
-        # obrót wokół Z
-        cosz = math.cos(az)
-        sinz = math.sin(az)
-        x3 = x2 * cosz - y2 * sinz
-        y3 = x2 * sinz + y2 * cosz
-        z3 = z2
-
-        return x3, y3, z3
-
-    def _redraw_cube(self):
-        self.canvas_cube.delete("all")
-        self._points.clear()
-
+    def _redraw_cube(self, density=1.0):
+        """density < 1 – rzadsza siatka (odtwarzanie pod obciążeniem)."""
         w = int(self.canvas_cube["width"])
         h = int(self.canvas_cube["height"])
-        cx = w / 2
-        cy = h / 2
         scale = min(w, h) * 0.45
 
-        ax = math.radians(self.angle_x.get())
-        ay = math.radians(self.angle_y.get())
-        az = math.radians(self.angle_z.get())
+        rot = rotation_matrix(
+            math.radians(self.angle_x.get()),
+            math.radians(self.angle_y.get()),
+            math.radians(self.angle_z.get()),
+        )
 
         steps = self.steps
         max_i = max(0, min(steps, int(self.clip_x.get())))
         max_j = max(0, min(steps, int(self.clip_y.get())))
         max_k = max(0, min(steps, int(self.clip_z.get())))
 
-        voxels = []
-
-        for i in range(steps):
-            if i >= max_i:
-                continue
-            r = int(round(i / (steps - 1) * 255))
-            x = i / (steps - 1) - 0.5
-
-            for j in range(steps):
-                if j >= max_j:
-                    continue
-                g = int(round(j / (steps - 1) * 255))
-                y = j / (steps - 1) - 0.5
-
-                for k in range(steps):
-                    if k >= max_k:
-                        continue
-                    b = int(round(k / (steps - 1) * 255))
-                    z = k / (steps - 1) - 0.5
-
-                    xr, yr, zr = self._rotate_point(x, y, z, ax, ay, az)
-                    sx = cx + xr * scale
-                    sy = cy - yr * scale
-                    color = f"#{r:02x}{g:02x}{b:02x}"
-                    voxels.append((zr, sx, sy, i, j, k, color))
-
-        voxels.sort(key=lambda t: t[0])
+        # siatka n³ (n = steps przy pełnej gęstości); cięcia w jednostkach self.steps:
+        # voxel i leży w i/(n-1), czyli odpowiada indeksowi i·(steps-1)/(n-1)
+        n = max(2, int(round(steps * density)))
+        lim_i, lim_j, lim_k = (m * (n - 1) for m in (max_i, max_j, max_k))
+        grid = rgb_cube_grid(n)
+        order, sx, sy = grid.project(
+            rot,
+            w / 2,
+            h / 2,
+            scale,
+            keep=lambda ijk: ijk[0] * (steps - 1) < lim_i
+            and ijk[1] * (steps - 1) < lim_j
+            and ijk[2] * (steps - 1) < lim_k,
+        )
 
-        if steps > 1:
-            base_size = scale / (steps - 1)
+        if n > 1:
+            base_size = scale / (n - 1)
         else:
             base_size = scale
         size_pt = max(4, base_size * 1.3)
 
-        for zr, sx, sy, i, j, k, color in voxels:
-            self.canvas_cube.create_rectangle(
-                sx - size_pt / 2,
-                sy - size_pt / 2,
-                sx + size_pt / 2,
-                sy + size_pt / 2,
-                fill=color,
-                outline="",
-            )
-            self._points.append((sx, sy, i, j, k))
+        # klucze rzadszej siatki nie pasują do self.steps – wtedy bez wyboru przekroju
+        self._points = grid.points(order, sx, sy) if n == steps else []
+        self._pick = None
+        self._blit_cube(grid.splats(order, sx, sy), size_pt)
+
+    def _play_frame(self, dt, density):
+        """Klatka animacji: obrót wokół osi Y albo przesuw wybranego cięcia tam i z powrotem."""
+        mode = self.playback_bar.mode_var.get()
+        clip = {"Cięcie R": self.clip_x, "Cięcie G": self.clip_y, "Cięcie B": self.clip_z}
+        if mode in clip:
+            self._sweep_t = (self._sweep_t + dt / self.SWEEP_PERIOD) % 1.0
+            tri = 1.0 - abs(2.0 * self._sweep_t - 1.0)  # 0 → 1 → 0
+            clip[mode].set(int(round(tri * self.steps)))
+        else:
+            a = self.angle_y.get() + self.ROTATE_SPEED * dt
+            self.angle_y.set((a + 180.0) % 360.0 - 180.0)
+        self._redraw_cube(density)
+
+    def _blit_cube(self, splats, size):
+        """Rysuje splaty do bufora pikseli i pokazuje go jako jeden PhotoImage."""
+        canvas = self.canvas_cube
+        w = int(canvas["width"])
+        h = int(canvas["height"])
+        if self._splats is None or (self._splats.w, self._splats.h) != (w, h):
+            self._splats = SplatBuffer(w, h)
+        self._splats.clear()
+        self._splats.draw(splats, size)
+        self._photo = self._splats.photo()  # referencja – inaczej Tk zwolni obraz
+        if self._image_item is None:
+            self._image_item = canvas.create_image(0, 0, image=self._photo, anchor="nw")
+        else:
+            canvas.itemconfigure(self._image_item, image=self._photo)
 
     # --- klik + przekrój ---
 
     def _on_click_cube(self, event):
-        if not self._points:
+        """Przekrój dla voxela najbliższego kliknięciu."""
+        ijk = self._pick_at(event.x, event.y)
+        if ijk is not None:
+            self._draw_slice(ijk[0])
+
+    def _on_hover_cube(self, event):
+        """Podgląd przekroju pod kursorem (gdy włączony) – tylko przy zmianie warstwy."""
+        if not self.hover_var.get():
             return
+        ijk = self._pick_at(event.x, event.y)
+        if ijk is not None and ijk[0] != self._slice_index:
+            self._draw_slice(ijk[0])
 
-        ex, ey = event.x, event.y
-        best = None
-        best_d2 = 1e9
-
-        for sx, sy, i, j, k in self._points:
-            dx = sx - ex
-            dy = sy - ey
-            d2 = dx * dx + dy * dy
-            if d2 < best_d2:
-                best_d2 = d2
-                best = (i, j, k)
-
-        if best is None:
-            return
-
-        r_index = best[0]
-        self._draw_slice(r_index)
+    def _pick_at(self, x, y):
+        """Klucz voxela najbliższego punktowi ekranu albo None."""
+        if not self._points:
+            return None
+        if self._pick is None:
+            self._pick = PickIndex(self._points)
+        return self._pick.nearest(x, y)
 
     def _draw_slice(self, r_index):
+        self._slice_index = r_index
         self.canvas_slice.delete("all")
 
         steps = self.steps
         w = int(self.canvas_slice["width"])
         h = int(self.canvas_slice["height"])
         size = min(w, h) - 20
-        cell = size / steps
         offset_x = (w - size) / 2
         offset_y = (h - size) / 2
 
         r_val = int(round(r_index / (steps - 1) * 255))
         self.slice_info.config(text=f"Przekrój dla R = {r_val} (0–255)")
 
-        for j in range(steps):
-            g_val = int(round(j / (steps - 1) * 255))
-            for k in range(steps):
-                b_val = int(round(k / (steps - 1) * 255))
-
-                x1 = offset_x + k * cell
-                y1 = offset_y + j * cell
-                x2 = x1 + cell
-                y2 = y1 + cell
-
-                color = f"#{r_val:02x}{g_val:02x}{b_val:02x}"
-                self.canvas_slice.create_rectangle(
-                    x1,
-                    y1,
-                    x2,
-                    y2,
-                    fill=color,
-                    outline="",
-                )
+        # płaszczyzna G×B liczona na piksel i trzymana w pamięci (klucz: R i rozmiar)
+        self._slice_photo = tk.PhotoImage(data=rgb_slice_ppm(r_val, size), format="PPM")
+        self.canvas_slice.create_image(
+            offset_x, offset_y, image=self._slice_photo, anchor="nw"
+        )
 
         self.canvas_slice.create_rectangle(
             offset_x,
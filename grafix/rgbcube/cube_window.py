@@ -2,6 +2,9 @@ import tkinter as tk
 from tkinter import ttk
 import math
 
+from ..render.splat_buffer import SplatBuffer
+from ..voxels import PickIndex, rgb_cube_grid, rgb_slice_ppm, rotation_matrix
+
 
 class RGBCubeWindow(tk.Toplevel):
     """
@@ -24,9 +27,20 @@ class RGBCubeWindow(tk.Toplevel):
         self.angle_x = tk.DoubleVar(value=30.0)  # obrót wokół osi X (pitch)
         self.angle_y = tk.DoubleVar(value=-30.0)  # obrót wokół osi Y (yaw)
 
-        # lista voxelów po rzutowaniu: (sx, sy, i, j, k)
+        # lista voxelów po rzutowaniu: (sx, sy, (i, j, k))
         self._points = []
 
+        # indeks wyboru punktów (budowany leniwie po obrocie) i podgląd pod kursorem
+        self._pick = None
+        self._slice_index = None
+        self.hover_var = tk.BooleanVar(value=False)
+
+        # bufor pikseli widoku 3D i jego PhotoImage na Canvas
+        self._splats = None
+        self._photo = None
+        self._image_item = None
+        self._slice_photo = None  # obraz przekroju (dane z pamięci przekrojów)
+
         self._build_ui()
         self._redraw_cube()
 
@@ -89,6 +103,7 @@ class RGBCubeWindow(tk.Toplevel):
 
         # kliknięcie w kostkę → przekrój
         self.canvas_cube.bind("<Button-1>", self._on_click_cube)
+        self.canvas_cube.bind("<Motion>", self._on_hover_cube)
 
         # --- PRAWA: przekrój ---
         right = ttk.Frame(main)
@@ -98,6 +113,9 @@ class RGBCubeWindow(tk.Toplevel):
             right, text="Przekrój: kliknij w kostkę, aby wybrać R", anchor="w"
         )
         self.slice_info.pack(fill="x", pady=(0, 4))
+        ttk.Checkbutton(
+            right, text="Podgląd pod kursorem", variable=self.hover_var
+        ).pack(anchor="w", pady=(0, 4))
 
         self.canvas_slice = tk.Canvas(
             right,
@@ -111,106 +129,72 @@ class RGBCubeWindow(tk.Toplevel):
 
     # --- Logika rysowania kostki ---
 
-    def _rotate_point(self, x, y, z, ax, ay):
-        """Obrót punktu (x,y,z) wokół osi X i Y o kąty ax, ay (radiany)."""
-        # obrót wokół X
-        cosx = math.cos(ax)
-        sinx = math.sin(ax)
-        y1 = y * cosx - z * sinx
-        z1 = y * sinx + z * cosx
-
-        # obrót wokół Y
-        cosy = math.cos(ay)
-        siny = math.sin(ay)
-        x2 = x * cosy + z1 * siny
-        z2 = -x * siny + z1 * cosy
-
-        return x2, y1, z2
-
     def _redraw_cube(self):
-        """Przelicza i rysuje kostkę RGB dla aktualnych kątów."""
-        self.canvas_cube.delete("all")
-        self._points.clear()
-
+        """Rzutuje i rysuje kostkę RGB dla aktualnych kątów."""
         w = int(self.canvas_cube["width"])
         h = int(self.canvas_cube["height"])
-        cx = w / 2
-        cy = h / 2
         scale = min(w, h) * 0.4  # skala dla 3D → 2D
 
-        ax = math.radians(self.angle_x.get())
-        ay = math.radians(self.angle_y.get())
-
-        voxels = []
-
-        # Generujemy wszystkie punkty (R,G,B)
-        for i in range(self.steps):
-            r = int(round(i / (self.steps - 1) * 255))
-            x = i / (self.steps - 1) - 0.5  # -0.5..0.5
-
-            for j in range(self.steps):
-                g = int(round(j / (self.steps - 1) * 255))
-                y = j / (self.steps - 1) - 0.5
-
-                for k in range(self.steps):
-                    b = int(round(k / (self.steps - 1) * 255))
-                    z = k / (self.steps - 1) - 0.5
-
-                    xr, yr, zr = self._rotate_point(x, y, z, ax, ay)
-                    sx = cx + xr * scale
-                    sy = cy - yr * scale
-                    color = f"#{r:02x}{g:02x}{b:02x}"
-                    voxels.append((zr, sx, sy, i, j, k, color))
-
-        # Sortujemy po głębi (zr) – od najdalszych do najbliższych
-        voxels.sort(key=lambda t: t[0])
+        rot = rotation_matrix(
+            math.radians(self.angle_x.get()), math.radians(self.angle_y.get())
+        )
+        # siatka (R,G,B) liczona raz; order – od najdalszych do najbliższych
+        grid = rgb_cube_grid(self.steps)
+        order, sx, sy = grid.project(rot, w / 2, h / 2, scale)
 
         size_pt = 5  # wielkość „punktu” (kwadracik)
-        for zr, sx, sy, i, j, k, color in voxels:
-            self.canvas_cube.create_rectangle(
-                sx - size_pt / 2,
-                sy - size_pt / 2,
-                sx + size_pt / 2,
-                sy + size_pt / 2,
-                fill=color,
-                outline="",
-            )
-            self._points.append((sx, sy, i, j, k))
+        self._points = grid.points(order, sx, sy)
+        self._pick = None
+        self._blit_cube(grid.splats(order, sx, sy), size_pt)
+
+    def _blit_cube(self, splats, size):
+        """Rysuje splaty do bufora pikseli i pokazuje go jako jeden PhotoImage."""
+        canvas = self.canvas_cube
+        w = int(canvas["width"])
+        h = int(canvas["height"])
+        if self._splats is None or (self._splats.w, self._splats.h) != (w, h):
+            self._splats = SplatBuffer(w, h)
+        self._splats.clear()
+        self._splats.draw(splats, size)
+        self._photo = self._splats.photo()  # referencja – inaczej Tk zwolni obraz
+        if self._image_item is None:
+            self._image_item = canvas.create_image(0, 0, image=self._photo, anchor="nw")
+        else:
+            canvas.itemconfigure(self._image_item, image=self._photo)
 
     # --- Kliknięcie i przekrój ---
 
     def _on_click_cube(self, event):
         """Znajdź najbliższy voxel do kliknięcia i pokaż przekrój dla danego R (i)."""
-        if not self._points:
-            return
-
-        ex, ey = event.x, event.y
-        best = None
-        best_d2 = 1e9
-
-        for sx, sy, i, j, k in self._points:
-            dx = sx - ex
-            dy = sy - ey
-            d2 = dx * dx + dy * dy
-            if d2 < best_d2:
-                best_d2 = d2
-                best = (i, j, k)
+        ijk = self._pick_at(event.x, event.y)
+        if ijk is not None:
+            self._draw_slice(ijk[0])
 
-        if best is None:
+    def _on_hover_cube(self, event):
+        """Podgląd przekroju pod kursorem (gdy włączony) – tylko przy zmianie warstwy."""
+        if not self.hover_var.get():
             return
+        ijk = self._pick_at(event.x, event.y)
+        if ijk is not None and ijk[0] != self._slice_index:
+            self._draw_slice(ijk[0])
 
-        r_index = best[0]
-        self._draw_slice(r_index)
+    def _pick_at(self, x, y):
+        """Klucz voxela najbliższego punktowi ekranu albo None."""
+        if not self._points:
+            return None
+        if self._pick is None:
+            self._pick = PickIndex(self._points)
+        return self._pick.nearest(x, y)
 
     def _draw_slice(self, r_index):
         """Rysuje przekrój dla danego indeksu R (stałe R, płaszczyzna G×B)."""
+        self._slice_index = r_index
         self.canvas_slice.delete("all")
 
         steps = self.steps
         w = int(self.canvas_slice["width"])
         h = int(self.canvas_slice["height"])
         size = min(w, h) - 20  # margines
-        cell = size / steps
         offset_x = (w - size) / 2
         offset_y = (h - size) / 2
 
@@ -218,25 +202,11 @@ class RGBCubeWindow(tk.Toplevel):
         r_val = int(round(r_index / (steps - 1) * 255))
         self.slice_info.config(text=f"Przekrój dla R = {r_val} (0–255)")
 
-        for j in range(steps):  # G
-            g_val = int(round(j / (steps - 1) * 255))
-            for k in range(steps):  # B
-                b_val = int(round(k / (steps - 1) * 255))
-
-                x1 = offset_x + k * cell
-                y1 = offset_y + j * cell
-                x2 = x1 + cell
-                y2 = y1 + cell
-
-                color = f"#{r_val:02x}{g_val:02x}{b_val:02x}"
-                self.canvas_slice.create_rectangle(
-                    x1,
-                    y1,
-                    x2,
-                    y2,
-                    fill=color,
-                    outline="",
-                )
+        # płaszczyzna G×B liczona na piksel i trzymana w pamięci (klucz: R i rozmiar)
+        self._slice_photo = tk.PhotoImage(data=rgb_slice_ppm(r_val, size), format="PPM")
+        self.canvas_slice.create_image(
+            offset_x, offset_y, image=self._slice_photo, anchor="nw"
+        )
 
         # delikatna ramka dookoła
         self.canvas_slice.create_rectangle(
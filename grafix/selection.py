@@ -83,6 +83,8 @@ class Selection:
             for t in tags:
                 if t in ("p1", "p2", "tl", "tr", "br", "bl", "center", "radius"):
                     hk = t
+                elif t.startswith("cp"):  # punkty kontrolne krzywej Béziera
+                    hk = t
             self.resizing = True
             self.handle_kind = hk
             return True
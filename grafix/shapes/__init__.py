@@ -3,6 +3,7 @@ from .base import Shape
 from .line import Line
 from .rect import Rect
 from .circle import Circle
+from .bezier import BezierCurve
 
 
 def shape_from_dict(d: dict) -> Shape:
@@ -13,18 +14,20 @@ def shape_from_dict(d: dict) -> Shape:
         return Rect(d["x1"], d["y1"], d["x2"], d["y2"])
     if t == "circle":
         return Circle(d["cx"], d["cy"], d["r"])
+    if t == "bezier":
+        return BezierCurve([tuple(p) for p in d["points"]], int(d.get("degree", 3)))
     if t == "image":
-        # wczytaj PPM jako źródło
+        # wczytaj PPM/JPEG jako źródło
         src = d.get("src")
         if src:
             try:
-                from ..io.ppm import read_ppm_auto
+                from ..io.image_file import read_image
 
-                sw, sh, spx, _fmt = read_ppm_auto(src)
+                sw, sh, spx = read_image(src)
                 # docelowe w/h (jeśli brak – 1:1)
                 w = int(d.get("w", sw))
                 h = int(d.get("h", sh))
-                return RasterImage(
+                img = RasterImage(
                     x=int(d.get("x", 0)),
                     y=int(d.get("y", 0)),
                     src_w=sw,
@@ -34,6 +37,8 @@ def shape_from_dict(d: dict) -> Shape:
                     h=h,
                     src=src,
                 )
+                img.load_adjustments(d.get("adjustments", []))
+                return img
             except Exception:
                 pass
         # fallback: „szary place-holder” jeśli nie ma src
@@ -54,4 +59,12 @@ def shape_from_dict(d: dict) -> Shape:
     raise ValueError(f"Nieznany typ: {t}")
 
 
-__all__ = ["Shape", "Line", "Rect", "Circle", "RasterImage", "shape_from_dict"]
+__all__ = [
+    "Shape",
+    "Line",
+    "Rect",
+    "Circle",
+    "BezierCurve",
+    "RasterImage",
+    "shape_from_dict",
+]
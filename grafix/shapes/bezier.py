@@ -0,0 +1,98 @@
+from dataclasses import dataclass, field
+from ..algos import bresenham_line
+from ..bezier.curves import FLATNESS_TOLERANCE, flatten
+from ..constants import COL_BEZIER
+from .base import Shape, OidMixin
+
+
+@dataclass
+class BezierCurve(Shape, OidMixin):
+    """
+    Krzywa kawałkami Béziera stopnia `degree` (punkty P0..P(d·k)) w scenie –
+    łamana z podziału adaptacyjnego rasteryzowana odcinkami Bresenhama.
+    Liczba punktów musi być równa degree·k + 1 (k ≥ 1 odcinków).
+    """
+
+    points: list = field(default_factory=list)
+    degree: int = 3
+    oid: str = ""
+
+    def __post_init__(self):
+        if not self.oid:
+            self.oid = self._new_oid()
+        self.degree = int(self.degree)
+        if self.degree < 1:
+            raise ValueError("Stopień krzywej musi być ≥ 1")
+        self.points = [(int(round(x)), int(round(y))) for x, y in self.points]
+        self._check_count(len(self.points))
+
+    def _check_count(self, n):
+        if n < self.degree + 1 or (n - 1) % self.degree:
+            raise ValueError(
+                f"Liczba punktów musi być równa {self.degree}·k + 1 (jest {n})"
+            )
+
+    def _segments(self):
+        d = self.degree
+        for s in range((len(self.points) - 1) // d):
+            yield self.points[s * d : s * d + d + 1]
+
+    def _pixels(self):
+        poly = []
+        for seg in self._segments():
+            pts = flatten(seg, FLATNESS_TOLERANCE)
+            poly.extend(pts if not poly else pts[1:])
+        ipts = [(int(round(x)), int(round(y))) for x, y in poly]
+        pix = []
+        for (x1, y1), (x2, y2) in zip(ipts, ipts[1:]):
+            pix += bresenham_line(x1, y1, x2, y2)
+        return dict.fromkeys(pix)
+
+    def _draw_pixels(self, surface):
+        surface.clear_tag(self.oid)
+        tags = ("shape", self.oid, "bezier")
+        for x, y in self._pixels():
+            surface.plot(x, y, COL_BEZIER, tags)
+        surface.flush()
+
+    def draw(self, surface, canvas):
+        self._draw_pixels(surface)
+
+    def update_canvas(self, surface, canvas):
+        self._draw_pixels(surface)
+
+    def move(self, dx, dy):
+        self.points = [(x + dx, y + dy) for x, y in self.points]
+
+    def handles(self):
+        return [(x, y, f"cp{i}") for i, (x, y) in enumerate(self.points)]
+
+    def apply_handle(self, kind, x, y):
+        if kind.startswith("cp"):
+            i = int(kind[2:])
+            if 0 <= i < len(self.points):
+                self.points[i] = (x, y)
+
+    def params_text(self):
+        return ";".join(f"{x},{y}" for x, y in self.points)
+
+    def set_params_text(self, txt):
+        """Punkty "x,y;x,y;..." – dowolna liczba pasująca do stopnia (d·k + 1)."""
+        ps = [p.strip() for p in txt.replace(";", ",").split(",") if p.strip()]
+        if len(ps) % 2:
+            raise ValueError("Podaj pary liczb x,y")
+        vals = list(map(int, ps))
+        self._check_count(len(vals) // 2)
+        self.points = list(zip(vals[0::2], vals[1::2]))
+
+    def to_dict(self):
+        return {
+            "type": "bezier",
+            "degree": self.degree,
+            "points": [[x, y] for x, y in self.points],
+        }
+
+    def bbox(self):
+        xs = [x for x, _y in self.points]
+        ys = [y for _x, y in self.points]
+        return (min(xs), min(ys), max(xs), max(ys))
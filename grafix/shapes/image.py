@@ -2,6 +2,9 @@ from dataclasses import dataclass
 from typing import List, Tuple, Optional
 import tkinter as tk
 from .base import Shape, OidMixin
+from ..adjustments import AdjustmentStack
+from ..io.ppm import ppm_p6_bytes
+from ..planes import cached_plane
 
 Color = Tuple[int, int, int]
 
@@ -27,6 +30,9 @@ class RasterImage(Shape, OidMixin):
     cid: Optional[int] = None  # canvas item id
     _photo: Optional[tk.PhotoImage] = None
 
+    # Nieniszczący stos korekt (None = obraz bez operacji)
+    adjustments: Optional[AdjustmentStack] = None
+
     def __post_init__(self):
         if not self.oid:
             self.oid = self._new_oid()
@@ -35,6 +41,90 @@ class RasterImage(Shape, OidMixin):
             self.w = self.src_w
         if self.h is None:
             self.h = self.src_h
+        self._photo_key = None
+        # ostatni policzony wycinek wyniku stosu: (wersja, prostokąt źródła, szer., piksele)
+        self._region_cache = None
+        # gotowe dane PPM pikseli 1:1 (np. zakodowane w wątku wczytywania): (wersja, bajty)
+        self._ppm_seed = None
+
+    # ---------- piksele / stos korekt ----------
+    def __setattr__(self, name, value):
+        if name == "src_pixels":
+            # bezpośrednie podstawienie pikseli „utrwala” obraz – stos korekt znika
+            self.__dict__["adjustments"] = None
+            self._touch_pixels()
+        object.__setattr__(self, name, value)
+
+    def __getattr__(self, name):
+        # src_pixels liczone leniwie ze stosu korekt (dopiero przy pierwszym użyciu)
+        if name == "src_pixels":
+            stack = self.__dict__.get("adjustments")
+            if stack is not None:
+                pixels = stack.evaluate()
+                self.__dict__["src_pixels"] = pixels
+                return pixels
+        raise AttributeError(name)
+
+    def _touch_pixels(self):
+        """Zmiana pikseli → nowa wersja (unieważnia zbudowany PhotoImage)."""
+        self.__dict__["_pixels_version"] = self.__dict__.get("_pixels_version", 0) + 1
+
+    @property
+    def pixels_version(self) -> int:
+        return self.__dict__.get("_pixels_version", 0)
+
+    # ---------- plany pochodne (luma / średnia / binarny) ----------
+    def plane(self, kind, *args) -> bytes:
+        """
+        Plan pochodny pikseli ('luma', 'avg', 'binary' [, T]) – liczony raz
+        na wersję pikseli; zmiana pikseli (wersji) unieważnia wszystkie plany.
+        """
+        version, planes = self.__dict__.get("_planes", (None, None))
+        if version != self.pixels_version:
+            planes = {}
+            self.__dict__["_planes"] = (self.pixels_version, planes)
+        key = (kind,) + args
+        plane = planes.get(key)
+        if plane is None:
+            plane = cached_plane(self.src_pixels, kind, *args)
+            planes[key] = plane
+        return plane
+
+    def luma_plane(self) -> bytes:
+        return self.plane("luma")
+
+    def gray_avg_plane(self) -> bytes:
+        return self.plane("avg")
+
+    def binary_plane(self, T=128) -> bytes:
+        return self.plane("binary", T)
+
+    def _stack_changed(self):
+        self.__dict__.pop("src_pixels", None)
+        self._touch_pixels()
+
+    def push_adjustment(self, kind, **params) -> int:
+        """Dodaje operację na koniec stosu (bez liczenia – wynik jest leniwy)."""
+        if self.adjustments is None:
+            self.__dict__["adjustments"] = AdjustmentStack(
+                self.src_w, self.src_h, self.src_pixels
+            )
+        idx = self.adjustments.push(kind, **params)
+        self._stack_changed()
+        return idx
+
+    def set_adjustment_params(self, index, **params):
+        """Zmiana parametrów etapu – przeliczenie nastąpi od tego etapu."""
+        self.adjustments.set_params(index, **params)
+        self._stack_changed()
+
+    def remove_adjustment(self, index):
+        self.adjustments.remove(index)
+        self._stack_changed()
+
+    def load_adjustments(self, items):
+        for d in items:
+            self.push_adjustment(d["kind"], **d.get("params", {}))
 
     # ---------- narzędzia ----------
     def _clamp_dims(self):
@@ -45,56 +135,162 @@ class RasterImage(Shape, OidMixin):
         self.x = int(self.x)
         self.y = int(self.y)
 
+    def seed_ppm(self, data: bytes):
+        """
+        Dane PPM P6 bieżących pikseli przygotowane gdzie indziej (wątek wczytywania) –
+        pierwszy PhotoImage 1:1 powstaje z nich bez kodowania pikseli w wątku GUI.
+        """
+        self._ppm_seed = (self.pixels_version, data)
+
+    def _put_pixels(self, img, w: int, h: int, pixels: List[Color], ox=0, oy=0):
+        """Wpisuje piksele (w,h) do PhotoImage od punktu (ox,oy) – kopia z PhotoImage z danych P6."""
+        part = self._photo_from_pixels(w, h, pixels)
+        img.tk.call(img.name, "copy", part.name, "-to", ox, oy)
+
     def _photo_from_pixels(self, w: int, h: int, pixels: List[Color]) -> tk.PhotoImage:
-        """Buduje PhotoImage z listy pikseli (w,h) → put() wierszami."""
-        img = tk.PhotoImage(width=w, height=h)
-        # budujemy wiersz po wierszu
-        base = 0
-        for y in range(h):
-            row_hex = (
-                "{"
-                + " ".join(
-                    f"#{r:02x}{g:02x}{b:02x}" for (r, g, b) in pixels[base : base + w]
-                )
-                + "}"
-            )
-            img.put(row_hex, to=(0, y))
-            base += w
-        return img
+        """
+        Buduje PhotoImage z listy pikseli (w,h): piksele → bajty P6 (w C),
+        dekodowanie przez Tk. Zamiast napisów „#rrggbb” dla każdego piksela.
+        """
+        return tk.PhotoImage(data=ppm_p6_bytes(w, h, pixels), format="PPM")
 
     def _scale_nearest(self, dst_w: int, dst_h: int) -> List[Color]:
         """Skalowanie nearest-neighbor z src_pixels (src_w×src_h) → dst_w×dst_h."""
-        sw, sh = self.src_w, self.src_h
-        spx = self.src_pixels
-        out: List[Color] = [(0, 0, 0)] * (dst_w * dst_h)
+        return self._scale_nearest_region(
+            self.src_pixels, 0, 0, self.src_w, dst_w, dst_h, 0, 0, dst_w, dst_h
+        )
+
+    def _scale_nearest_region(self, spx, sx0, sy0, sw, dst_w, dst_h, dx0, dy0, dx1, dy1):
+        """
+        Nearest-neighbor dla fragmentu [dx0,dx1)×[dy0,dy1) obrazu docelowego dst_w×dst_h.
+        spx to wycinek źródła o szerokości sw zaczynający się w (sx0,sy0).
+        """
+        src_w, src_h = self.src_w, self.src_h
+        cols = [(dx * src_w) // dst_w - sx0 for dx in range(dx0, dx1)]
+        out: List[Color] = []
 
         # mapowanie: dst (dx,dy) -> src (sx,sy)
         # używamy wersji „floor”, która nie wychodzi poza zakres
-        for dy in range(dst_h):
-            sy = (dy * sh) // dst_h
-            row_base = dy * dst_w
-            sy_base = sy * sw
-            for dx in range(dst_w):
-                sx = (dx * sw) // dst_w
-                out[row_base + dx] = spx[sy_base + sx]
+        for dy in range(dy0, dy1):
+            sy_base = ((dy * src_h) // dst_h - sy0) * sw
+            out.extend([spx[sy_base + sx] for sx in cols])
         return out
 
-    def _rebuild_photo(self):
+    def _visible_region(self, canvas):
+        """
+        Widoczny fragment obrazu we współrzędnych wyświetlanych (dx0,dy0,dx1,dy1)
+        albo None, jeśli widać całość (lub Canvas nie jest jeszcze rozmieszczony).
+        """
+        if canvas is None:
+            return None
+        cw, ch = canvas.winfo_width(), canvas.winfo_height()
+        if cw <= 1 or ch <= 1:
+            return None
+        dx0, dy0 = max(0, -self.x), max(0, -self.y)
+        dx1, dy1 = min(self.w, cw - self.x), min(self.h, ch - self.y)
+        if (dx0, dy0, dx1, dy1) == (0, 0, self.w, self.h):
+            return None
+        if dx1 <= dx0 or dy1 <= dy0:
+            return (0, 0, 0, 0)
+        return (dx0, dy0, dx1, dy1)
+
+    def _rebuild_photo(self, canvas=None):
         """Przeskaluj i odśwież PhotoImage zgodnie z (w,h)."""
         self._clamp_dims()
-        if self.w == self.src_w and self.h == self.src_h:
-            # 1:1 — bezpośrednio z oryginału
-            self._photo = self._photo_from_pixels(
-                self.src_w, self.src_h, self.src_pixels
-            )
+        # gdy wynik stosu korekt nie jest jeszcze policzony – liczymy tylko widoczny fragment
+        lazy = "src_pixels" not in self.__dict__
+        region = self._visible_region(canvas) if lazy else None
+        key = (self.w, self.h, self.pixels_version, region)
+        if self._photo is not None and key == self._photo_key:
+            return
+        self._photo_key = key
+
+        if region is not None:
+            self._photo = self._photo_from_region(*region)
+        elif self.w == self.src_w and self.h == self.src_h:
+            # 1:1 — bezpośrednio z oryginału (lub z gotowych danych PPM)
+            seed, self._ppm_seed = self._ppm_seed, None
+            if seed is not None and seed[0] == self.pixels_version:
+                self._photo = tk.PhotoImage(data=seed[1], format="PPM")
+            else:
+                self._photo = self._photo_from_pixels(
+                    self.src_w, self.src_h, self.src_pixels
+                )
         else:
             # skalowanie nearest-neighbor
             dst = self._scale_nearest(self.w, self.h)
             self._photo = self._photo_from_pixels(self.w, self.h, dst)
 
+    def _source_rect(self, dx0, dy0, dx1, dy1):
+        """Prostokąt źródła (sx0,sy0,sx1,sy1) pokrywający fragment wyświetlany."""
+        return (
+            (dx0 * self.src_w) // self.w,
+            (dy0 * self.src_h) // self.h,
+            ((dx1 - 1) * self.src_w) // self.w + 1,
+            ((dy1 - 1) * self.src_h) // self.h + 1,
+        )
+
+    def region_photo(self, canvas, pixels_of):
+        """
+        PhotoImage tylko dla widocznej części obrazu (np. nakładka).
+        pixels_of(sx0, sy0, sx1, sy1) → piksele wycinka źródła.
+        Zwraca (photo, dx0, dy0) – przesunięcie względem (x, y) – albo None,
+        gdy obraz jest poza ekranem.
+        """
+        self._clamp_dims()
+        dx0, dy0, dx1, dy1 = self._visible_region(canvas) or (0, 0, self.w, self.h)
+        if dx1 <= dx0 or dy1 <= dy0:
+            return None
+        sx0, sy0, sx1, sy1 = self._source_rect(dx0, dy0, dx1, dy1)
+        crop = pixels_of(sx0, sy0, sx1, sy1)
+        dst = self._scale_nearest_region(
+            crop, sx0, sy0, sx1 - sx0, self.w, self.h, dx0, dy0, dx1, dy1
+        )
+        return self._photo_from_pixels(dx1 - dx0, dy1 - dy0, dst), dx0, dy0
+
+    REGION_PAD = 0.5  # zapas liczonego wycinka wokół widocznego (ułamek jego boku)
+
+    def _region_pixels(self, sx0, sy0, sx1, sy1):
+        """
+        Wynik stosu korekt dla prostokąta źródła → (ox, oy, szerokość, piksele)
+        wycinka, który go zawiera. Liczony jest fragment z zapasem i zapamiętywany:
+        przewijanie/przeciąganie w jego obrębie nie uruchamia stosu ponownie.
+        """
+        cached = self._region_cache
+        if cached is not None:
+            version, (cx0, cy0, cx1, cy1), cw, crop = cached
+            if (
+                version == self.pixels_version
+                and cx0 <= sx0
+                and cy0 <= sy0
+                and sx1 <= cx1
+                and sy1 <= cy1
+            ):
+                return cx0, cy0, cw, crop
+        padx = int((sx1 - sx0) * self.REGION_PAD)
+        pady = int((sy1 - sy0) * self.REGION_PAD)
+        cx0, cy0 = max(0, sx0 - padx), max(0, sy0 - pady)
+        cx1, cy1 = min(self.src_w, sx1 + padx), min(self.src_h, sy1 + pady)
+        cw, _ch, crop = self.adjustments.evaluate_region(cx0, cy0, cx1, cy1)
+        self._region_cache = (self.pixels_version, (cx0, cy0, cx1, cy1), cw, crop)
+        return cx0, cy0, cw, crop
+
+    def _photo_from_region(self, dx0, dy0, dx1, dy1):
+        """PhotoImage (w,h) z wypełnionym tylko fragmentem [dx0,dx1)×[dy0,dy1)."""
+        img = tk.PhotoImage(width=self.w, height=self.h)
+        if dx1 <= dx0 or dy1 <= dy0:
+            return img
+        sx0, sy0, sx1, sy1 = self._source_rect(dx0, dy0, dx1, dy1)
+        cx0, cy0, cw, crop = self._region_pixels(sx0, sy0, sx1, sy1)
+        dst = self._scale_nearest_region(
+            crop, cx0, cy0, cw, self.w, self.h, dx0, dy0, dx1, dy1
+        )
+        self._put_pixels(img, dx1 - dx0, dy1 - dy0, dst, dx0, dy0)
+        return img
+
     # ---------- Shape API ----------
     def draw(self, surface, canvas: tk.Canvas):
-        self._rebuild_photo()
+        self._rebuild_photo(canvas)
         self.cid = canvas.create_image(
             self.x,
             self.y,
@@ -108,8 +304,8 @@ class RasterImage(Shape, OidMixin):
             # jeśli przypadkiem nie narysowane — narysuj
             self.draw(surface, canvas)
             return
-        # Zmieniał się rozmiar? trzeba odbudować photo i podmienić obraz
-        self._rebuild_photo()
+        # Zmieniał się rozmiar/piksele? trzeba odbudować photo i podmienić obraz
+        self._rebuild_photo(canvas)
         canvas.itemconfigure(self.cid, image=self._photo)
         canvas.coords(self.cid, self.x, self.y)
 
@@ -173,6 +369,8 @@ class RasterImage(Shape, OidMixin):
         d = {"type": "image", "x": self.x, "y": self.y, "w": self.w, "h": self.h}
         if self.src:
             d["src"] = self.src
+        if self.adjustments is not None and len(self.adjustments):
+            d["adjustments"] = self.adjustments.to_list()
         # nie zapisujemy src_w/src_h/src_pixels — odczytamy z pliku przy wczytywaniu
         return d
 
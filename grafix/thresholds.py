@@ -1,18 +1,88 @@
 import math
+from itertools import accumulate
+from operator import add
 
+from .planes import cached_plane, plane_histogram
 
-def _luma(r, g, b):
-    y = 0.299 * r + 0.587 * g + 0.114 * b
-    if y < 0:
-        y = 0
-    elif y > 255:
-        y = 255
-    return int(round(y))
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
 
 
-def _to_gray_list(pixels):
-    """Zwraca listę jasności 0..255 dla wszystkich pikseli."""
-    return [_luma(r, g, b) for (r, g, b) in pixels]
+def _gray_plane(pixels):
+    """Plan jasności 0..255 (bytes) – liczony raz na obraz (pamięć planów)."""
+    return cached_plane(pixels, "luma")
+
+
+def gray_histogram(gray):
+    """Histogram 256 binów z planu jasności (zliczanie w C – Counter)."""
+    return plane_histogram(gray)
+
+
+def _prefix_sums(hist):
+    """
+    Sumy prefiksowe: cum_n[i] = liczba pikseli o jasności <= i,
+    cum_s[i] = suma jasności tych pikseli (i·count).
+    """
+    cum_n = list(accumulate(hist))
+    cum_s = list(accumulate(i * c for i, c in enumerate(hist)))
+    return cum_n, cum_s
+
+
+class GrayHistogram:
+    """
+    Histogram jasności z tablicami skumulowanymi (momenty, p, p·log p).
+    Tablice liczone są raz i współdzielone przez wszystkie metody progowania.
+    """
+
+    def __init__(self, hist):
+        self.hist = list(hist)
+        self.cum_n, self.cum_s = _prefix_sums(self.hist)
+        self.n = self.cum_n[-1]
+        self._cum_p = None
+        self._cum_plogp = None
+
+    def entropy_tables(self):
+        """cum_p[i] = Σ p_k, cum_plogp[i] = Σ p_k·log p_k dla k <= i."""
+        if self._cum_p is None:
+            total = float(self.n) or 1.0
+            p = [h / total for h in self.hist]
+            self._cum_p = list(accumulate(p))
+            self._cum_plogp = list(accumulate(v * math.log(v) if v > 0 else 0.0 for v in p))
+        return self._cum_p, self._cum_plogp
+
+    def range_stats(self, a, b):
+        """(liczba pikseli, suma jasności) dla przedziału jasności [a..b]."""
+        if a > b:
+            return 0, 0
+        n = self.cum_n[b] - (self.cum_n[a - 1] if a > 0 else 0)
+        s = self.cum_s[b] - (self.cum_s[a - 1] if a > 0 else 0)
+        return n, s
+
+
+def _stats(hist):
+    return hist if isinstance(hist, GrayHistogram) else GrayHistogram(hist)
+
+
+# Histogram ostatnio analizowanego planu jasności – kilka metod na tym samym
+# obrazie kosztuje jeden przebieg po pikselach (plan jest współdzielony).
+_last_hist = None  # (gray, GrayHistogram)
+
+
+def image_histogram(pixels):
+    """Zwraca (plan jasności, GrayHistogram) – z pamięci, jeśli to ten sam obraz."""
+    global _last_hist
+    gray = _gray_plane(pixels)
+    if _last_hist is not None and _last_hist[0] is gray:
+        return gray, _last_hist[1]
+    stats = GrayHistogram(gray_histogram(gray))
+    _last_hist = (gray, stats)
+    return gray, stats
+
+
+def _apply_threshold_to_gray(gray, T):
+    """Binaryzacja planu jasności jedną LUT (256 wpisów): y < T → czarny, y >= T → biały."""
+    lut = [BLACK if i < T else WHITE for i in range(256)]
+    return list(map(lut.__getitem__, gray))
 
 
 def _apply_threshold_to_pixels(pixels, T):
@@ -20,125 +90,322 @@ def _apply_threshold_to_pixels(pixels, T):
     Zastosowanie progu T (0..255) do całego obrazu:
     y < T → czarny, y >= T → biały. Zwraca (R,G,B) z 0/255.
     """
-    out = []
-    for r, g, b in pixels:
-        y = _luma(r, g, b)
-        v = 0 if y < T else 255
-        out.append((v, v, v))
-    return out
+    return _apply_threshold_to_gray(_gray_plane(pixels), T)
 
 
-def threshold_manual(pixels, T):
-    """Ręczna binaryzacja – użytkownik podaje próg T."""
-    if T < 0:
-        T = 0
-    elif T > 255:
-        T = 255
-    return _apply_threshold_to_pixels(pixels, T)
+# ---------- wybór progu z histogramu (O(256)) ----------
 
 
-def threshold_percent_black(pixels, percent_black):
-    """
-    Percent Black Selection – wybieramy próg taki, by ~percent_black% pikseli było czarnych.
-    percent_black w [0,100].
-    """
+def percent_black_threshold(hist, percent_black):
+    """Najmniejszy próg T, dla którego ≥ percent_black% pikseli ma jasność <= T."""
     if percent_black < 0:
         percent_black = 0.0
     elif percent_black > 100:
         percent_black = 100.0
-
-    vals = _to_gray_list(pixels)
-    n = len(vals)
-    if n == 0:
-        return pixels[:]
-
-    # histogram + kumulacja
-    hist = [0] * 256
-    for v in vals:
-        hist[v] += 1
-
-    target = n * (percent_black / 100.0)
-    cumsum = 0
-    T = 0
+    cum_n = _stats(hist).cum_n
+    target = cum_n[-1] * (percent_black / 100.0)
     for i in range(256):
-        cumsum += hist[i]
-        if cumsum >= target:
-            T = i
-            break
-
-    return _apply_threshold_to_pixels(pixels, T)
+        if cum_n[i] >= target:
+            return i
+    return 0
 
 
-def threshold_mean_iterative(pixels, max_iter=100, eps=0.5):
+def mean_iterative_threshold(hist, max_iter=100, eps=0.5):
     """
-    Mean Iterative Selection – iteracyjny próg średniej.
+    Mean Iterative Selection na histogramie: średnie klas liczone
+    z sum prefiksowych, więc każda iteracja to O(1).
     """
-    vals = _to_gray_list(pixels)
-    n = len(vals)
+    st = _stats(hist)
+    cum_n, cum_s = st.cum_n, st.cum_s
+    n, total = st.n, cum_s[-1]
     if n == 0:
-        return pixels[:]
+        return 0
 
     # początkowy próg – globalna średnia
-    T = sum(vals) / n
+    T = total / n
 
     for _ in range(max_iter):
-        g1 = [v for v in vals if v <= T]
-        g2 = [v for v in vals if v > T]
-        if not g1 or not g2:
+        k = min(255, int(math.floor(T)))  # klasa 1: jasność <= T
+        n1, s1 = cum_n[k], cum_s[k]
+        n2, s2 = n - n1, total - s1
+        if n1 == 0 or n2 == 0:
             break
-        m1 = sum(g1) / len(g1)
-        m2 = sum(g2) / len(g2)
+        m1 = s1 / n1
+        m2 = s2 / n2
         new_T = (m1 + m2) / 2.0
         if abs(new_T - T) < eps:
             T = new_T
             break
         T = new_T
 
-    T_int = int(round(T))
-    return _apply_threshold_to_pixels(pixels, T_int)
+    return int(round(T))
 
 
-def threshold_entropy(pixels):
+def entropy_threshold(hist):
     """
-    Selekcja entropii (Kapur) – maksymalizacja sumy entropii tła i obiektu.
+    Próg Kapura – maksymalizacja sumy entropii tła [0..T] i obiektu [T+1..255].
+    Z sum skumulowanych P(T) = Σp oraz Q(T) = Σ p·log p:
+        H_tło(T) = log P(T) − Q(T) / P(T)
+    (analogicznie dla obiektu), więc każdy kandydat T to O(1).
     """
-    vals = _to_gray_list(pixels)
-    n = len(vals)
-    if n == 0:
-        return pixels[:]
-
-    hist = [0] * 256
-    for v in vals:
-        hist[v] += 1
-
-    total = float(n)
-    p = [h / total for h in hist]
+    st = _stats(hist)
+    if st.n == 0:
+        return 0
+    cum_p, cum_plogp = st.entropy_tables()
+    p_all, q_all = cum_p[-1], cum_plogp[-1]
 
     best_T = 0
     best_H = -1e9
 
     for T in range(0, 255):
-        # tło: [0..T], obiekt: [T+1..255]
-        p1 = sum(p[0 : T + 1])
-        p2 = sum(p[T + 1 : 256])
-        if p1 <= 0.0 or p2 <= 0.0:
+        p1 = cum_p[T]
+        p2 = p_all - p1
+        if p1 <= 1e-12 or p2 <= 1e-12:
             continue
-
-        H1 = 0.0
-        for i in range(0, T + 1):
-            if p[i] > 0.0:
-                pi = p[i] / p1
-                H1 -= pi * math.log(pi + 1e-12)
-
-        H2 = 0.0
-        for i in range(T + 1, 256):
-            if p[i] > 0.0:
-                pi = p[i] / p2
-                H2 -= pi * math.log(pi + 1e-12)
-
-        H = H1 + H2
+        q1 = cum_plogp[T]
+        q2 = q_all - q1
+        H = math.log(p1) - q1 / p1 + math.log(p2) - q2 / p2
         if H > best_H:
             best_H = H
             best_T = T
 
-    return _apply_threshold_to_pixels(pixels, best_T)
+    return best_T
+
+
+def otsu_threshold(hist):
+    """
+    Próg Otsu – maksymalizacja wariancji międzyklasowej.
+    Zwraca T w konwencji binaryzacji: jasność < T → czarny.
+    """
+    st = _stats(hist)
+    n = st.n
+    if n == 0:
+        return 0
+    mu_total = st.cum_s[-1] / n
+
+    best_T = 0
+    best_var = -1.0
+    for k in range(0, 255):
+        w0 = st.cum_n[k] / n
+        if w0 <= 0.0 or w0 >= 1.0:
+            continue
+        mu_k = st.cum_s[k] / n
+        var_b = (mu_total * w0 - mu_k) ** 2 / (w0 * (1.0 - w0))
+        if var_b > best_var:
+            best_var = var_b
+            best_T = k + 1
+    return best_T
+
+
+def multi_otsu_thresholds(hist, classes=3):
+    """
+    Wielopoziomowe Otsu: podział na `classes` klas maksymalizujący
+    wariancję międzyklasową (Σ S_c² / N_c). Programowanie dynamiczne
+    na sumach prefiksowych – O(classes · L²) zamiast O(L^(classes-1)).
+    Zwraca rosnącą listę progów (początki klas 2..classes).
+    """
+    st = _stats(hist)
+    classes = max(2, min(8, int(classes)))
+    if st.n == 0:
+        return [0] * (classes - 1)
+
+    def score(a, b):
+        n, s = st.range_stats(a, b)
+        return s * s / n if n else 0.0
+
+    L = 256
+    NEG = float("-inf")
+    # best[c][b] – najlepszy wynik dla c+1 klas pokrywających [0..b]
+    best = [[score(0, b) for b in range(L)]]
+    arg = [[-1] * L]
+    for c in range(1, classes):
+        prev = best[-1]
+        row = [NEG] * L
+        row_arg = [-1] * L
+        for b in range(c, L):
+            bv, ba = NEG, -1
+            for a in range(c, b + 1):  # klasa c zaczyna się od a
+                v = prev[a - 1] + score(a, b)
+                if v > bv:
+                    bv, ba = v, a
+            row[b] = bv
+            row_arg[b] = ba
+        best.append(row)
+        arg.append(row_arg)
+
+    # odtworzenie granic od końca
+    cuts = []
+    b = L - 1
+    for c in range(classes - 1, 0, -1):
+        a = arg[c][b]
+        cuts.append(a)
+        b = a - 1
+    return sorted(cuts)
+
+
+# ---------- progowanie lokalne (tablice sum – integral image) ----------
+
+ADAPTIVE_METHODS = ("bradley", "niblack", "sauvola")
+
+# domyślne współczynniki: Bradley – t (ułamek poniżej średniej),
+# Niblack – k przy odchyleniu, Sauvola – k (R = 128)
+ADAPTIVE_DEFAULT_K = {"bradley": 0.15, "niblack": -0.2, "sauvola": 0.2}
+
+_SQUARES = [v * v for v in range(256)]
+
+
+def integral_images(gray, w, h):
+    """
+    Tablice sum (summed-area tables) jasności i kwadratów jasności,
+    rozmiar (w+1)×(h+1) z zerowym pierwszym wierszem i kolumną:
+    S[y][x] = Σ gray[j][i] dla j < y, i < x.
+    """
+    W = w + 1
+    sat = [0] * (W * (h + 1))
+    sat2 = [0] * (W * (h + 1))
+    for y in range(h):
+        row = gray[y * w : (y + 1) * w]
+        run = accumulate(row)
+        run2 = accumulate(map(_SQUARES.__getitem__, row))
+        prev = y * W + 1
+        cur = (y + 1) * W + 1
+        sat[cur : cur + w] = map(add, sat[prev : prev + w], run)
+        sat2[cur : cur + w] = map(add, sat2[prev : prev + w], run2)
+    return sat, sat2
+
+
+def adaptive_threshold(gray, w, h, method="sauvola", window=15, k=None):
+    """
+    Binaryzacja lokalna: próg liczony ze średniej (i odchylenia) w oknie
+    window×window wokół piksela. Sumy w oknie z tablic sum – stały koszt
+    na piksel niezależnie od rozmiaru okna.
+    - bradley: czarny, gdy y < m·(1 − k),
+    - niblack: T = m + k·σ,
+    - sauvola: T = m·(1 + k·(σ/128 − 1)).
+    Zwraca bytes (0 / 255) długości w·h.
+    """
+    if method not in ADAPTIVE_METHODS:
+        raise ValueError(f"Nieznana metoda progowania lokalnego: {method}")
+    if window < 1:
+        raise ValueError("Rozmiar okna musi być >= 1.")
+    if k is None:
+        k = ADAPTIVE_DEFAULT_K[method]
+    r = int(window) // 2
+    W = w + 1
+    sat, sat2 = integral_images(gray, w, h)
+
+    # granice okna w poziomie – wspólne dla wszystkich wierszy
+    xs0 = [max(0, x - r) for x in range(w)]
+    xs1 = [min(w, x + r + 1) for x in range(w)]
+    widths = [b - a for a, b in zip(xs0, xs1)]
+
+    out = bytearray(w * h)
+    for y in range(h):
+        y0, y1 = max(0, y - r), min(h, y + r + 1)
+        top, bot = y0 * W, y1 * W
+        dy = y1 - y0
+        row = gray[y * w : (y + 1) * w]
+        res = []
+        for v, a, b, cw in zip(row, xs0, xs1, widths):
+            n = cw * dy
+            s = sat[bot + b] - sat[top + b] - sat[bot + a] + sat[top + a]
+            if method == "bradley":
+                res.append(0 if v * n < s * (1.0 - k) else 255)
+                continue
+            s2 = sat2[bot + b] - sat2[top + b] - sat2[bot + a] + sat2[top + a]
+            m = s / n
+            var = s2 / n - m * m
+            sd = math.sqrt(var) if var > 0 else 0.0
+            if method == "niblack":
+                T = m + k * sd
+            else:
+                T = m * (1.0 + k * (sd / 128.0 - 1.0))
+            res.append(0 if v < T else 255)
+        out[y * w : (y + 1) * w] = bytes(res)
+    return bytes(out)
+
+
+# ---------- binaryzacja obrazu ----------
+
+
+def threshold_manual(pixels, T):
+    """Ręczna binaryzacja – użytkownik podaje próg T."""
+    if T < 0:
+        T = 0
+    elif T > 255:
+        T = 255
+    return _apply_threshold_to_pixels(pixels, T)
+
+
+def threshold_adaptive(pixels, w, h, method="sauvola", window=15, k=None):
+    """Binaryzacja lokalna (Bradley / Niblack / Sauvola) dla nierównomiernie oświetlonych obrazów."""
+    if not pixels:
+        return pixels[:]
+    gray = _gray_plane(pixels)
+    bw = adaptive_threshold(gray, w, h, method, window, k)
+    lut = [BLACK] * 256
+    lut[255] = WHITE
+    return list(map(lut.__getitem__, bw))
+
+
+def _apply_levels_to_gray(gray, cuts):
+    """Obraz wielopoziomowy: klasa c (między kolejnymi progami) → szarość c·255/(K−1)."""
+    k = len(cuts)
+    lut = []
+    c = 0
+    for i in range(256):
+        while c < k and i >= cuts[c]:
+            c += 1
+        v = int(round(c * 255 / k)) if k else 0
+        lut.append((v, v, v))
+    return list(map(lut.__getitem__, gray))
+
+
+def threshold_percent_black(pixels, percent_black):
+    """
+    Percent Black Selection – wybieramy próg taki, by ~percent_black% pikseli było czarnych.
+    percent_black w [0,100].
+    """
+    if not pixels:
+        return pixels[:]
+    gray, stats = image_histogram(pixels)
+    T = percent_black_threshold(stats, percent_black)
+    return _apply_threshold_to_gray(gray, T)
+
+
+def threshold_mean_iterative(pixels, max_iter=100, eps=0.5):
+    """
+    Mean Iterative Selection – iteracyjny próg średniej.
+    """
+    if not pixels:
+        return pixels[:]
+    gray, stats = image_histogram(pixels)
+    T = mean_iterative_threshold(stats, max_iter, eps)
+    return _apply_threshold_to_gray(gray, T)
+
+
+def threshold_entropy(pixels):
+    """
+    Selekcja entropii (Kapur) – maksymalizacja sumy entropii tła i obiektu.
+    """
+    if not pixels:
+        return pixels[:]
+    gray, stats = image_histogram(pixels)
+    T = entropy_threshold(stats)
+    return _apply_threshold_to_gray(gray, T)
+
+
+def threshold_otsu(pixels):
+    """Binaryzacja metodą Otsu (maksymalna wariancja międzyklasowa)."""
+    if not pixels:
+        return pixels[:]
+    gray, stats = image_histogram(pixels)
+    return _apply_threshold_to_gray(gray, otsu_threshold(stats))
+
+
+def threshold_multi_otsu(pixels, classes=3):
+    """Wielopoziomowe Otsu – obraz o `classes` poziomach szarości."""
+    if not pixels:
+        return pixels[:]
+    gray, stats = image_histogram(pixels)
+    return _apply_levels_to_gray(gray, multi_otsu_thresholds(stats, classes))
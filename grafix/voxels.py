@@ -0,0 +1,359 @@
+# grafix/voxels.py
+"""
+Geometria voxelowych widoków przestrzeni barw (kostka RGB, stożek HSV).
+
+Siatka voxeli (pozycje, kolory, indeksy) liczona jest raz na zestaw parametrów
+(steps) i trzymana w pamięci. Obrót to jedna złożona macierz 3×3 stosowana do
+wszystkich punktów w jednym przebiegu, a kolejność rysowania (od najdalszego)
+daje sortowanie indeksów po głębi.
+"""
+import colorsys
+import math
+from collections import Counter
+from functools import lru_cache
+
+from .planes import cached_plane, register_plane
+
+
+def rotation_matrix(ax, ay, az=0.0):
+    """Macierz Rz·Ry·Rx (kąty w radianach) – obrót najpierw wokół X, potem Y, potem Z."""
+    cx, sx = math.cos(ax), math.sin(ax)
+    cy, sy = math.cos(ay), math.sin(ay)
+    cz, sz = math.cos(az), math.sin(az)
+    return (
+        (cz * cy, cz * sy * sx - sz * cx, cz * sy * cx + sz * sx),
+        (sz * cy, sz * sy * sx + cz * cx, sz * sy * cx - cz * sx),
+        (-sy, cy * sx, cy * cx),
+    )
+
+
+class VoxelGrid:
+    """
+    Punkty w przestrzeni [-0.5, 0.5]³:
+    - xs, ys, zs – współrzędne,
+    - colors – kolor voxela jako bytes((r, g, b)),
+    - keys – co oznacza voxel (kostka: (i, j, k), stożek: indeks V),
+    - weights – opcjonalna waga 0..1 (chmura kolorów obrazu: liczność przedziału).
+    """
+
+    def __init__(self, xs, ys, zs, colors, keys, weights=None):
+        self.xs = xs
+        self.ys = ys
+        self.zs = zs
+        self.colors = colors
+        self.keys = keys
+        self.weights = weights
+
+    def __len__(self):
+        return len(self.xs)
+
+    def project(self, matrix, cx, cy, scale, keep=None):
+        """
+        Rzut po obrocie: (order, sx, sy).
+        order – indeksy voxeli od najdalszego do najbliższego (tylko te z keep(key)),
+        sx, sy – współrzędne ekranowe wszystkich voxeli (wg indeksu siatki).
+        """
+        (a, b, c), (d, e, f), (g, h, i) = matrix
+        pts = list(zip(self.xs, self.ys, self.zs))
+        sx = [cx + (a * x + b * y + c * z) * scale for x, y, z in pts]
+        sy = [cy - (d * x + e * y + f * z) * scale for x, y, z in pts]
+        depth = [g * x + h * y + i * z for x, y, z in pts]
+        if keep is None:
+            order = sorted(range(len(depth)), key=depth.__getitem__)
+        else:
+            keys = self.keys
+            order = sorted(
+                (n for n in range(len(depth)) if keep(keys[n])), key=depth.__getitem__
+            )
+        return order, sx, sy
+
+    def splats(self, order, sx, sy):
+        """(sx, sy, rgb) w kolejności rysowania – wejście SplatBuffer.draw."""
+        colors = self.colors
+        return [(sx[n], sy[n], colors[n]) for n in order]
+
+    def sized_splats(self, order, sx, sy, size_min, size_max):
+        """(sx, sy, size, rgb) – rozmiar rośnie z wagą voxela (SplatBuffer.draw_sized)."""
+        colors, weights = self.colors, self.weights
+        span = size_max - size_min
+        return [(sx[n], sy[n], size_min + span * weights[n], colors[n]) for n in order]
+
+    def points(self, order, sx, sy):
+        """(sx, sy, key) rzutowanych voxeli – do wyboru przekroju kliknięciem."""
+        keys = self.keys
+        return [(sx[n], sy[n], keys[n]) for n in order]
+
+
+def _levels(steps):
+    """Wartości 0..1 dla indeksów 0..steps-1."""
+    if steps <= 1:
+        return [0.0] * steps
+    return [i / (steps - 1) for i in range(steps)]
+
+
+@lru_cache(maxsize=8)
+def rgb_cube_grid(steps) -> VoxelGrid:
+    """Kostka RGB steps³ (oś X = R, Y = G, Z = B)."""
+    lv = _levels(steps)
+    byte = [int(round(t * 255)) for t in lv]
+    xs, ys, zs, colors, keys = [], [], [], [], []
+    for i in range(steps):
+        for j in range(steps):
+            for k in range(steps):
+                xs.append(lv[i] - 0.5)
+                ys.append(lv[j] - 0.5)
+                zs.append(lv[k] - 0.5)
+                colors.append(bytes((byte[i], byte[j], byte[k])))
+                keys.append((i, j, k))
+    return VoxelGrid(xs, ys, zs, colors, keys)
+
+
+@lru_cache(maxsize=8)
+def hsv_cone_grid(steps_v, steps_s, steps_h) -> VoxelGrid:
+    """Stożek HSV: wysokość = V, promień = S·V, kąt = H (klucz voxela: indeks V)."""
+    lv_v = _levels(steps_v)
+    lv_s = _levels(steps_s)
+    hues = [hi / steps_h for hi in range(steps_h)]
+    angles = [(h_norm, 2 * math.pi * h_norm) for h_norm in hues]
+    xs, ys, zs, colors, keys = [], [], [], [], []
+    for vi, v in enumerate(lv_v):
+        z = v - 0.5  # stożek wyśrodkowany na osi Z
+        for s in lv_s:
+            r_cone = s * v
+            for h_norm, angle in angles:
+                xs.append(r_cone * math.cos(angle))
+                ys.append(r_cone * math.sin(angle))
+                zs.append(z)
+                r, g, b = colorsys.hsv_to_rgb(h_norm, s, v)
+                colors.append(bytes((int(r * 255), int(g * 255), int(b * 255))))
+                keys.append(vi)
+    return VoxelGrid(xs, ys, zs, colors, keys)
+
+
+class PickIndex:
+    """
+    Siatka kubełków w przestrzeni ekranu nad rzutowanymi voxelami
+    (points: (sx, sy, key) w kolejności rysowania). Najbliższy punkt szukany
+    jest pierścieniami komórek wokół kursora – zwykle wystarczy kilka komórek
+    zamiast przeglądania wszystkich punktów.
+    """
+
+    def __init__(self, points, cell=16):
+        self.points = points
+        self.cell = cell
+        buckets = {}
+        for n, (sx, sy, _key) in enumerate(points):
+            buckets.setdefault((int(sx // cell), int(sy // cell)), []).append(n)
+        self._buckets = buckets
+        if buckets:
+            cols = [c for c, _r in buckets]
+            rows = [r for _c, r in buckets]
+            self._bounds = (min(cols), min(rows), max(cols), max(rows))
+
+    def nearest(self, x, y, max_dist=None):
+        """
+        Klucz punktu najbliższego (x, y) albo None (brak punktów / dalej niż max_dist).
+        Przy równej odległości wygrywa punkt rysowany później (bliżej widza).
+        """
+        if not self._buckets:
+            return None
+        cell, buckets, points = self.cell, self._buckets, self.points
+        qc, qr = int(x // cell), int(y // cell)
+        c0, r0, c1, r1 = self._bounds
+        max_ring = max(qc - c0, c1 - qc, qr - r0, r1 - qr)
+        best, best_d2 = -1, float("inf")
+        if max_dist is not None:
+            best_d2 = max_dist * max_dist
+            max_ring = min(max_ring, int(max_dist // cell) + 1)
+        for ring in range(max_ring + 1):
+            # komórki pierścienia są co najmniej (ring-1)·cell od kursora
+            reach = (ring - 1) * cell
+            if ring > 0 and reach * reach >= best_d2:
+                break
+            for c in range(qc - ring, qc + ring + 1):
+                edge = c in (qc - ring, qc + ring)
+                for r in range(qr - ring, qr + ring + 1):
+                    if not edge and r not in (qr - ring, qr + ring):
+                        continue
+                    for n in buckets.get((c, r), ()):
+                        sx, sy, _key = points[n]
+                        d2 = (sx - x) * (sx - x) + (sy - y) * (sy - y)
+                        if d2 < best_d2 or (d2 == best_d2 and n > best):
+                            best, best_d2 = n, d2
+        return points[best][2] if best >= 0 else None
+
+
+# ---------- przekroje (obrazy PPM) ----------
+
+
+@lru_cache(maxsize=4)
+def _gb_plane(size):
+    """Płaszczyzna G×B size×size (G w dół, B w prawo) z R = 0."""
+    lv = [int(round(t * 255)) for t in _levels(size)]
+    rows = []
+    for g in lv:
+        rows.append(b"".join(bytes((0, g, b)) for b in lv))
+    return b"".join(rows)
+
+
+@lru_cache(maxsize=64)
+def rgb_slice_ppm(r, size) -> bytes:
+    """Przekrój kostki dla stałego R: obraz PPM size×size, kolor liczony na piksel."""
+    buf = bytearray(_gb_plane(size))
+    buf[0::3] = bytes((r,)) * (size * size)
+    return b"P6 %d %d 255\n" % (size, size) + bytes(buf)
+
+
+_OUTSIDE = 255  # wartość planu poza dyskiem (tło)
+
+
+@lru_cache(maxsize=4)
+def _hsv_disk_plane(side):
+    """
+    Dysk H×S o średnicy side (H = kąt, S = odległość od środka).
+    Dla każdego piksela i kanału: s·a, gdzie kanał HSV→RGB = V·(1 − s·a),
+    a ∈ {0, 1, f, 1−f} zależy tylko od odcienia. Zapis 0..254, 255 = poza dyskiem.
+    """
+    radius = side / 2
+    out = bytearray([_OUTSIDE]) * (3 * side * side)
+    o = 0
+    for y in range(side):
+        dy = y + 0.5 - radius
+        for x in range(side):
+            dx = x + 0.5 - radius
+            s = math.hypot(dx, dy) / radius
+            if s <= 1.0:
+                h6 = (math.atan2(dy, dx) / (2 * math.pi)) % 1.0 * 6.0
+                i = int(h6)
+                f = h6 - i
+                # sektory odcienia jak w colorsys.hsv_to_rgb (v, t, p), (q, v, p), …
+                a = (
+                    (0, 1 - f, 1),
+                    (f, 0, 1),
+                    (1, 0, 1 - f),
+                    (1, f, 0),
+                    (1 - f, 1, 0),
+                    (0, 1, f),
+                )[i % 6]
+                out[o] = int(round(s * a[0] * 254))
+                out[o + 1] = int(round(s * a[1] * 254))
+                out[o + 2] = int(round(s * a[2] * 254))
+            o += 3
+    return bytes(out)
+
+
+@lru_cache(maxsize=64)
+def hsv_slice_ppm(v, side) -> bytes:
+    """Przekrój stożka dla stałego V: dysk HSV jako obraz PPM side×side (tło białe)."""
+    table = bytes(int(v * (1 - m / 254) * 255) for m in range(255)) + b"\xff"
+    return b"P6 %d %d 255\n" % (side, side) + _hsv_disk_plane(side).translate(table)
+
+
+# ---------- chmura kolorów obrazu ----------
+
+CLOUD_BINS = 32  # przedziałów na kanał (32³)
+CLOUD_MAX_SAMPLES = 300_000  # więcej pikseli → próbkowanie co k-ty
+
+
+def sample_step(n, w, max_samples=CLOUD_MAX_SAMPLES):
+    """
+    Krok próbkowania co k-tego piksela, tak by próbek było najwyżej max_samples.
+    Krok jest względnie pierwszy z szerokością – przy wspólnym dzielniku d
+    brana byłaby tylko co d-ta kolumna (np. w=1000, krok 6 → same parzyste).
+    """
+    step = max(1, -(-n // max_samples))
+    while step > 1 and math.gcd(step, w) != 1:
+        step += 1
+    return step
+
+
+class ColorBins:
+    """
+    Histogram 3D kolorów obrazu: bins³ przedziałów RGB (bins = potęga 2).
+    Indeks przedziału piksela to suma trzech tablic (po jednej na kanał),
+    zliczanie – Counter (w C). Dla niepustych przedziałów: (i, j, k),
+    liczność i kolor środka przedziału.
+    """
+
+    def __init__(self, pixels, w, bins=CLOUD_BINS, max_samples=CLOUD_MAX_SAMPLES):
+        if bins < 1 or bins > 256 or bins & (bins - 1):
+            raise ValueError("Liczba przedziałów musi być potęgą 2 (1..256).")
+        self.bins = bins
+        self.step = sample_step(len(pixels), w, max_samples)
+        sample = pixels[:: self.step]
+        self.samples = len(sample)
+        bits = bins.bit_length() - 1
+        shift = 8 - bits
+        lut_r = [(v >> shift) << (2 * bits) for v in range(256)]
+        lut_g = [(v >> shift) << bits for v in range(256)]
+        lut_b = [v >> shift for v in range(256)]
+        counts = Counter([lut_r[r] + lut_g[g] + lut_b[b] for r, g, b in sample])
+        mask = bins - 1
+        self.keys = [(n >> (2 * bits), (n >> bits) & mask, n & mask) for n in counts]
+        self.counts = list(counts.values())
+        width = 256 // bins
+        self.colors = [
+            (i * width + width // 2, j * width + width // 2, k * width + width // 2)
+            for i, j, k in self.keys
+        ]
+
+
+register_plane("color_bins", ColorBins)
+
+
+def color_bins(pixels, w, bins=CLOUD_BINS) -> ColorBins:
+    """Histogram 3D kolorów – z pamięci planów, jeśli już liczony dla tych pikseli."""
+    return cached_plane(pixels, "color_bins", w, bins)
+
+
+def _cloud_style(bins):
+    """Wagi 0..1 (pierwiastek z udziału – widać też rzadkie kolory) i kolory z „kryciem”."""
+    top = max(bins.counts, default=1)
+    weights = [math.sqrt(c / top) for c in bins.counts]
+    colors = []
+    for (r, g, b), wt in zip(bins.colors, weights):
+        a = 0.25 + 0.75 * wt  # krycie: rzadkie przedziały blakną w stronę białego tła
+        colors.append(
+            bytes((int(255 - (255 - r) * a), int(255 - (255 - g) * a), int(255 - (255 - b) * a)))
+        )
+    return weights, colors
+
+
+def _cube_cloud(pixels, w, steps, bins=CLOUD_BINS):
+    cb = color_bins(pixels, w, bins)
+    weights, colors = _cloud_style(cb)
+    xs = [(i + 0.5) / bins - 0.5 for i, _j, _k in cb.keys]
+    ys = [(j + 0.5) / bins - 0.5 for _i, j, _k in cb.keys]
+    zs = [(k + 0.5) / bins - 0.5 for _i, _j, k in cb.keys]
+    # klucz jak w siatce kostki: indeksy (i, j, k) w steps³ najbliższe kolorowi przedziału
+    q = (steps - 1) / 255.0
+    keys = [(round(r * q), round(g * q), round(b * q)) for r, g, b in cb.colors]
+    return VoxelGrid(xs, ys, zs, colors, keys, weights)
+
+
+def _cone_cloud(pixels, w, steps_v, bins=CLOUD_BINS):
+    cb = color_bins(pixels, w, bins)
+    weights, colors = _cloud_style(cb)
+    xs, ys, zs, keys = [], [], [], []
+    for r, g, b in cb.colors:
+        h, s, v = colorsys.rgb_to_hsv(r / 255.0, g / 255.0, b / 255.0)
+        angle = 2 * math.pi * h
+        xs.append(s * v * math.cos(angle))
+        ys.append(s * v * math.sin(angle))
+        zs.append(v - 0.5)
+        keys.append(round(v * (steps_v - 1)))
+    return VoxelGrid(xs, ys, zs, colors, keys, weights)
+
+
+register_plane("cube_cloud", _cube_cloud)
+register_plane("cone_cloud", _cone_cloud)
+
+
+def image_cube_cloud(pixels, w, steps) -> VoxelGrid:
+    """Kolory obrazu w kostce RGB: przedział = voxel, rozmiar/krycie wg liczności."""
+    return cached_plane(pixels, "cube_cloud", w, steps)
+
+
+def image_cone_cloud(pixels, w, steps_v) -> VoxelGrid:
+    """Kolory obrazu w stożku HSV (przedział RGB w miejscu koloru swojego środka)."""
+    return cached_plane(pixels, "cone_cloud", w, steps_v)